@@ -5,24 +5,28 @@ import logging
 import signal
 import asyncio
 import uuid
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Dict, Any
 from pydantic import BaseModel
 
 from fastapi import FastAPI, Request, Form, UploadFile, File, HTTPException, Depends, Body
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse, JSONResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse, JSONResponse, Response
 import uvicorn
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session
 
 # project imports
-from utils.util import init_logging, get_wav_files, setup_logging
+from utils.util import init_logging, setup_logging
 from utils.open_podcraft import OpenPodCraft
-from database import Base, PodcastDB
-from io import BytesIO
-from pydub import AudioSegment
+from utils.session import PodcastSession, SessionRegistry
+from utils.script_store import ScriptStore, ScriptRow, normalize_emotions, row_to_dict, speaker_label
+from database import (
+    PodcastDB, ScriptLineDB, create_db_engine, create_session_factory, init_db, load_script_lines,
+    replace_script_lines, insert_script_line, update_script_line, delete_script_line,
+)
 
 setup_logging()
 
@@ -31,10 +35,70 @@ open_pc = OpenPodCraft()
 is_shutdown = False
 
 # database configuration (SQLite)
-DATABASE_URL = "sqlite:///./podcasts.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine) # create the table(s)
+engine = create_db_engine(open_pc.config.db_params)
+SessionLocal = create_session_factory(engine)
+init_db(engine, SessionLocal)
+
+def load_podcast_session(podcast_uuid: str) -> PodcastSession:
+    """
+    restore the session of a podcast from the database
+    """
+    db = SessionLocal()
+    try:
+        podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
+        if podcast is None:
+            return None
+
+        session = open_pc.create_session(podcast.id)
+        session.chapters = podcast.chapters
+        session.set_podcast_script_from_dict(load_script_lines(db, podcast.id))
+        session.mark_script_saved(session.script_version)
+
+        if isinstance(podcast.voice_names, dict):
+            for speaker_id, voice_name in podcast.voice_names.items():
+                if voice_name in open_pc.available_voices:
+                    session.set_voice(int(speaker_id), voice_name, open_pc.available_voices)
+
+        settings = podcast.settings or {}
+        session.llm_model_type = settings.get("llmModel", session.llm_model_type)
+        session.user_prompt = settings.get("extra_prompt", session.user_prompt)
+        session.num_speakers = settings.get("num_speakers", session.num_speakers)
+        if "podcast_len" in settings:
+            session.podcast_len = str(settings["podcast_len"]).split(" ")[0]
+
+        if os.path.exists(session.final_audio_path): session.flags["is_podcast_available"] = True
+        return session
+    finally:
+        db.close()
+
+# per-podcast sessions share the single OpenPodCraft engine
+sessions = SessionRegistry(
+    load_podcast_session,
+    max_sessions=open_pc.config.session_params.max_sessions,
+    idle_timeout_s=open_pc.config.session_params.idle_timeout_s,
+    in_use=lambda session: open_pc.scheduler.active_job(session.podcast_uuid) is not None,
+)
+sessions.start_evictor(open_pc.config.session_params.eviction_interval_s)
+
+def get_session(podcast_uuid: str) -> PodcastSession:
+    session = sessions.get(podcast_uuid)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Podcast not found")
+    return session
+
+# blocking db queries and audio conversion of async handlers run here, off the event loop
+io_executor = ThreadPoolExecutor(max_workers=open_pc.config.job_params.io_workers, thread_name_prefix="io-worker")
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """
+    run a blocking function on the io executor and await its result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, partial(fn, *args, **kwargs))
+
+async def get_session_async(podcast_uuid: str) -> PodcastSession:
+    # loading a session that is not in memory queries the database
+    return await run_blocking(get_session, podcast_uuid)
 
 app = FastAPI()
 static_files = StaticFiles(
@@ -53,7 +117,6 @@ async def index_page(request: Request):
     if open_pc is None:
         logging.warning("Open PodCraft not initialized!!!")
         return {"status": "fail"}    
-    open_pc.reset()
 
     return templates.TemplateResponse("index.html", {"request": request})
 
@@ -64,7 +127,6 @@ async def index_page(request: Request):
     if open_pc is None:
         logging.warning("Open PodCraft not initialized!!!")
         return {"status": "fail"}    
-    open_pc.reset()
 
     return templates.TemplateResponse("voices.html", {"request": request})
 
@@ -77,23 +139,30 @@ def get_db():
         db.close()
 
 @app.get("/api/check_flags")
-async def check_flags():
+async def check_flags(podcast_uuid: str):
+    session = await get_session_async(podcast_uuid)
 
-    async def fetch_flags_state(sleep_time_s: float = 0.1):
-        global is_shutdown, open_pc
+    async def fetch_flags_state(keepalive_s: float = 15.0):
+        global is_shutdown
 
-        prev_flag_state = None
-        while not is_shutdown:
-
-            if open_pc is None:
-                await asyncio.sleep(sleep_time_s)
-                continue
-            
-            if prev_flag_state is None or open_pc.flags != prev_flag_state:
-                prev_flag_state = open_pc.flags.copy()
-                yield f"data: {json.dumps(open_pc.flags)}\n\n"
-
-            await asyncio.sleep(sleep_time_s)
+        # subscribed when the stream starts, so a client that disconnects earlier leaves no subscription behind.
+        # subscribing before the state snapshot means no transition is missed in between
+        subscription = open_pc.events.subscribe(session.podcast_uuid)
+        try:
+            # current state first, then the state transitions published by the engine
+            yield f"data: {json.dumps({'event': 'state', **session.flags})}\n\n"
+            while not is_shutdown:
+                try:
+                    event = await subscription.get(timeout=keepalive_s)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event is None:
+                    break
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            open_pc.events.unsubscribe(subscription)
 
     return StreamingResponse(fetch_flags_state(), media_type="text/event-stream")
 
@@ -103,16 +172,12 @@ class PodcastTitle(BaseModel):
 
 @app.get("/podcasts/{podcast_id}")
 def read_podcast(request: Request, podcast_id: str, db: Session = Depends(get_db)):
-    global open_pc
     podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_id).first()
     if not podcast:
         raise HTTPException(status_code=404, detail="Podcast not found")
     
-    open_pc.curr_podcast_uuid = podcast.id
-    open_pc.chapters = podcast.chapters
-    open_pc.set_podcast_script_from_dict(podcast.transcript)
-    podcasts_audio_file_path = os.path.join("static", "audio_outputs", "podcast-" + str(open_pc.curr_podcast_uuid), "final.wav")
-    if os.path.exists(podcasts_audio_file_path): open_pc.flags["is_podcast_available"] = True
+    session = get_session(podcast.id)
+    if os.path.exists(session.final_audio_path): session.flags["is_podcast_available"] = True
         
     return templates.TemplateResponse("podcasts.html", {"request": request, "podcast": podcast})
     
@@ -123,7 +188,6 @@ def create_podcast(podcast: PodcastTitle, db: Session = Depends(get_db)):
         title=podcast.title,
         description="",
         chapters="",
-        transcript=[],
         voice_names=[],
         settings={}
     )
@@ -135,21 +199,37 @@ def create_podcast(podcast: PodcastTitle, db: Session = Depends(get_db)):
 class PodcastDeleteRequest(BaseModel):
     uuid: str
 
+def delete_podcast_db(podcast_uuid: str) -> bool:
+    db = SessionLocal()
+    try:
+        podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
+        if not podcast:
+            return False
+
+        # the lines are deleted explicitly, the foreign key cascade depends on the connection pragmas
+        db.query(ScriptLineDB).filter(ScriptLineDB.podcast_id == podcast_uuid).delete(synchronize_session=False)
+        db.delete(podcast)
+        db.commit()
+        return True
+    finally:
+        db.close()
+
 @app.delete("/api/podcasts/delete")
-async def delete_podcast(data: PodcastDeleteRequest, db: Session = Depends(get_db)):
-    podcast = db.query(PodcastDB).filter(PodcastDB.id == data.uuid).first()
-    if not podcast:
+async def delete_podcast(data: PodcastDeleteRequest):
+    if not await run_blocking(delete_podcast_db, data.uuid):
         raise HTTPException(status_code=404, detail="Podcast not found")
     
-    db.delete(podcast)
-    db.commit()
+    sessions.remove(data.uuid)
     
     return {"message": "Podcast deleted successfully"}
 
 @app.get("/api/podcasts/get")
-def read_podcasts(db: Session = Depends(get_db)):
-    podcasts = db.query(PodcastDB).all()
-    return podcasts
+def read_podcasts(limit: int = None, offset: int = 0, db: Session = Depends(get_db)):
+    # only the columns the podcast list shows, the chapters and scripts are loaded per podcast
+    query = db.query(PodcastDB.id, PodcastDB.title, PodcastDB.description).offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return [{"id": podcast_id, "title": title, "description": description} for podcast_id, title, description in query]
 
 @app.post("/api/podcasts/generate-script")
 async def generate_podcast_script(
@@ -161,7 +241,7 @@ async def generate_podcast_script(
         llmModel: str = Form(...), 
         num_speakers: str = Form(...), 
         podcast_len: str = Form(...), 
-        db: Session = Depends(get_db)
+        force_regenerate: bool = Form(False),
     ):
     global open_pc
 
@@ -173,42 +253,73 @@ async def generate_podcast_script(
         logging.warning("Open PodCraft not initialized!!!")
         return {"status": "fail"}    
     
-    if open_pc.flags["is_generating_script"]:
-        logging.warning("Script generation already in progress !!")
-        return {"status": "fail"}   
-
-    podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
-    if not podcast:
-        raise HTTPException(status_code=404, detail="Podcast not found")
-
-     # Update the podcast fields with the new data
-    podcast.title = title.strip()
-    podcast.description = description.strip()
-    podcast.chapters = content.strip()
-    podcast.settings = {
+    settings = {
         "extra_prompt": extra_prompt,
         "llmModel": llmModel,
         "num_speakers": num_speakers,
         "podcast_len": podcast_len
     }
+    if not await run_blocking(update_podcast_details, podcast_uuid, title, description, content, settings):
+        raise HTTPException(status_code=404, detail="Podcast not found")
 
-    # Save the updates to the database.
-    db.commit()
-    db.refresh(podcast)    
+    session = await get_session_async(podcast_uuid)
+    session.chapters = content
+    session.llm_model_type = llmModel
+    session.user_prompt = extra_prompt
+    session.num_speakers = num_speakers
+    session.podcast_len = podcast_len.split(" ")[0]
+    job = open_pc.submit_job(session, "script", on_script_ready=save_podcast_transcript, force_regenerate=force_regenerate)
+    if job is None:
+        logging.warning("Script generation already in progress !!")
+        return {"status": "fail"}   
+
+    return {"status": "success", "job_id": job.id}   
+
+def update_podcast_details(podcast_uuid: str, title: str, description: str, content: str, settings: Dict) -> bool:
+    db = SessionLocal()
+    try:
+        podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
+        if not podcast:
+            return False
+
+        # Update the podcast fields with the new data
+        podcast.title = title.strip()
+        podcast.description = description.strip()
+        podcast.chapters = content.strip()
+        podcast.settings = settings
+
+        # Save the updates to the database.
+        db.commit()
+        return True
+    finally:
+        db.close()
 
-    open_pc.chapters = content
-    open_pc.llm_model_type = llmModel
-    open_pc.user_prompt = extra_prompt
-    open_pc.num_speakers = num_speakers
-    open_pc.podcast_len = podcast_len.split(" ")[0]
-    open_pc.run_in_thread("generate_podcast_script")
+def save_podcast_transcript(podcast_uuid: str, speaker_queue: List) -> None:
+    """
+    persist a generated script. called from the script job worker thread.
+    """
+    db = SessionLocal()
+    try:
+        podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
+        if podcast is None:
+            logging.warning(f"Podcast: {podcast_uuid} was deleted before its script was generated")
+            return
+
+        if not isinstance(speaker_queue, ScriptStore):
+            speaker_queue = ScriptStore.from_lines(speaker_queue)
+        version = speaker_queue.store_id, speaker_queue.version
+        replace_script_lines(db, podcast.id, speaker_queue.to_dicts())
+        db.commit()
+    finally:
+        db.close()
 
-    return {"status": "success"}   
+    session = sessions.peek(podcast_uuid)
+    if session is not None and session.podcast_speaker_queue is speaker_queue:
+        session.mark_script_saved(version)
 
 @app.post("/api/podcasts/generate-podcast")
 async def generate_podcast_script(
         podcast_uuid: str = Body(..., media_type="text/plain"),
-        db: Session = Depends(get_db)
     ):
     global open_pc
 
@@ -216,137 +327,307 @@ async def generate_podcast_script(
         logging.info("Open PodCraft not initialized!!!")
         return {"status": "fail"}  
 
-    podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
-    if not podcast:
-        raise HTTPException(status_code=404, detail="Podcast not found")     
-
-    open_pc.run_in_thread("generate_podcast")
-    return {"status": "success"}    
+    session = await get_session_async(podcast_uuid)
+    job = open_pc.submit_job(session, "render")
+    if job is None:
+        return {"status": "fail"}
+    return {"status": "success", "job_id": job.id}    
 
 @app.get("/api/podcasts/get-audio-url")
-async def get_audio_url():
-    global open_pc
-    audio_url = os.path.join("static", "audio_outputs", "podcast-"+str(open_pc.curr_podcast_uuid), "final.wav")  
+async def get_audio_url(podcast_uuid: str):
+    session = await get_session_async(podcast_uuid)
+    audio_url = session.final_audio_path
     audio_url = os.sep+audio_url  
     if not audio_url:
         raise HTTPException(status_code=404, detail="Audio not found")
     
     return JSONResponse(content={"audio_url": audio_url})
 
+@app.get("/api/podcasts/stream-audio")
+async def stream_audio(podcast_uuid: str):
+    """
+    Stream the podcast audio while it is being rendered. The response is a chunked
+    wav stream that grows line by line until the podcast is complete.
+    """
+    session = await get_session_async(podcast_uuid)
+    if session.audio_stream is None:
+        raise HTTPException(status_code=404, detail="Audio stream not found")
+
+    return StreamingResponse(session.audio_stream.iter_wav(), media_type="audio/wav")
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
 @app.get("/api/podcasts/get-script")
-async def get_podcast_script(db: Session = Depends(get_db)):
-    global open_pc
+async def get_podcast_script(podcast_uuid: str, request: Request):
+    session = await get_session_async(podcast_uuid)
+    script = session.podcast_speaker_queue
+    headers = {"ETag": script.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, script.etag):
+        return Response(status_code=304, headers=headers)
+
+    # the transcript is only written when the script changed since it was last saved
+    if session.is_script_dirty:
+        try:
+            await run_blocking(save_podcast_transcript, session.podcast_uuid, script)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error updating transcript: {e}")
 
-    if open_pc is None or open_pc.curr_podcast_uuid is None:
-        return {"status": "not found"}
-    
-    podcast = db.query(PodcastDB).filter(PodcastDB.id == open_pc.curr_podcast_uuid).first()
-    if not podcast:
-        raise HTTPException(status_code=404, detail="Podcast not found")      
-    
-    
-    podcast.transcript = open_pc.get_podcast_script_as_dict()
-    
+    # the encoded script is cached on the store, no per-line validation or copies
+    return Response(content=script.to_json(), media_type="application/json", headers=headers)
+
+class ScriptLineRequest(BaseModel):
+    podcast_uuid: str
+    speaker_id: int
+    content: str
+    emotion_arr: List[float] = []
+
+class ScriptLineInsertRequest(ScriptLineRequest):
+    position: int
+
+def edit_podcast_script_line(edit_fn: Callable) -> bool:
+    """
+    apply a line level edit to the script_lines of a podcast. called from the io executor.
+    """
+    db = SessionLocal()
     try:
+        if edit_fn(db) is False:
+            db.rollback()
+            return False
         db.commit()
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error updating transcript: {e}")
-    
-    db.refresh(podcast)    
-    return open_pc.get_podcast_script_as_dict()
+        return True
+    finally:
+        db.close()
+
+async def get_editable_session(podcast_uuid: str) -> PodcastSession:
+    session = await get_session_async(podcast_uuid)
+    if session.flags["is_generating_script"]:
+        raise HTTPException(status_code=409, detail="Script is being generated")
+    # line positions refer to the saved script
+    if session.is_script_dirty:
+        await run_blocking(save_podcast_transcript, session.podcast_uuid, session.podcast_speaker_queue)
+    return session
+
+def to_script_row(data: ScriptLineRequest) -> ScriptRow:
+    # normalized once, the database row and the session script hold the same values
+    return ScriptRow(
+        speaker=speaker_label(data.speaker_id),
+        speaker_id=data.speaker_id,
+        content=data.content,
+        emotions_arr=normalize_emotions(data.emotion_arr),
+    )
+
+@app.post("/api/podcasts/script/lines")
+async def insert_podcast_script_line(data: ScriptLineInsertRequest):
+    session = await get_editable_session(data.podcast_uuid)
+    script = session.podcast_speaker_queue
+    if not 0 <= data.position <= len(script):
+        raise HTTPException(status_code=404, detail="Script line not found")
+
+    line = to_script_row(data)
+    await run_blocking(
+        edit_podcast_script_line,
+        lambda db: insert_script_line(db, data.podcast_uuid, data.position, row_to_dict(line)),
+    )
+    script.insert(data.position, line)
+    session.mark_script_saved(session.script_version)
+    return {"message": "Script line inserted", "position": data.position}
+
+@app.put("/api/podcasts/script/lines/{position}")
+async def update_podcast_script_line(position: int, data: ScriptLineRequest):
+    session = await get_editable_session(data.podcast_uuid)
+    script = session.podcast_speaker_queue
+    if not 0 <= position < len(script):
+        raise HTTPException(status_code=404, detail="Script line not found")
+
+    line = to_script_row(data)
+    if not await run_blocking(
+        edit_podcast_script_line,
+        lambda db: update_script_line(db, data.podcast_uuid, position, row_to_dict(line)),
+    ):
+        raise HTTPException(status_code=404, detail="Script line not found")
+    script.update(position, line)
+    session.mark_script_saved(session.script_version)
+    return {"message": "Script line updated", "position": position}
+
+@app.delete("/api/podcasts/script/lines/{position}")
+async def delete_podcast_script_line(position: int, podcast_uuid: str):
+    session = await get_editable_session(podcast_uuid)
+    script = session.podcast_speaker_queue
+    if not 0 <= position < len(script):
+        raise HTTPException(status_code=404, detail="Script line not found")
+
+    if not await run_blocking(
+        edit_podcast_script_line,
+        lambda db: delete_script_line(db, podcast_uuid, position),
+    ):
+        raise HTTPException(status_code=404, detail="Script line not found")
+    script.delete(position)
+    session.mark_script_saved(session.script_version)
+    return {"message": "Script line deleted", "position": position}
+
+#### jobs api ####
+class JobCancelRequest(BaseModel):
+    job_id: str
+
+@app.get("/api/jobs/get")
+async def get_jobs(podcast_uuid: str):
+    """
+    Get the status and progress of all script and render jobs of a podcast.
+    """
+    global open_pc
+    return [job.to_dict() for job in open_pc.scheduler.jobs_for_podcast(podcast_uuid)]
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    global open_pc
+    job = open_pc.scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.post("/api/jobs/cancel")
+async def cancel_job(data: JobCancelRequest):
+    global open_pc
+    if not open_pc.cancel_job(data.job_id):
+        raise HTTPException(status_code=404, detail="No active job found")
+    return {"status": "success"}
+
+#### llm api ####
+@app.get("/api/llm/metrics")
+async def get_llm_metrics():
+    """
+    Latency and token usage of the recent script generation requests, per model.
+    """
+    global open_pc
+    return open_pc.llm_client.metrics_summary()
 
 #### voices api ####
 @app.get("/api/voices/get-info")
-async def get_voices_info() -> Dict[str, List[Dict[str, str]]]:
+async def get_voices_info() -> Dict[str, List[Dict[str, Any]]]:
     """
-    Get information on .wav files from both the 'static/voices' and 'static/voices/custom' directories.
+    Get information on the voice files in both the 'static/voices' and 'static/voices/custom' directories.
 
     Returns:
-        Dict[str, List[Dict[str, str]]]: A JSON object with two keys:
-            - "voices": List of .wav files from 'static/voices'
-            - "custom_voices": List of .wav files from 'static/voices/custom'
+        Dict[str, List[Dict[str, Any]]]: A JSON object with two keys:
+            - "voices": List of voices (filename, filepath and metadata) from 'static/voices'
+            - "custom_voices": List of voices from 'static/voices/custom'
     """
     voices_dir = Path("static") / "voices"
     custom_voices_dir = voices_dir / "custom"
 
-    voices = get_wav_files(voices_dir)
-    custom_voices = get_wav_files(custom_voices_dir)
+    # served from the in-memory voice index, no directory listing per request.
+    # the index also holds .mp3 voices for rendering, the ui lists wav files only
+    voices = open_pc.voices.list_voices(voices_dir, suffixes=(".wav",))
+    custom_voices = open_pc.voices.list_voices(custom_voices_dir, suffixes=(".wav",))
 
     return {"voices": voices, "custom_voices": custom_voices}
 
+async def save_upload(file: UploadFile, file_location: Path, chunk_size: int, max_bytes: int) -> int:
+    """
+    stream an uploaded file to disk in chunks instead of reading it into memory
+
+    Returns:
+        int: no. of bytes written
+    """
+    num_bytes = 0
+    try:
+        with open(file_location, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                num_bytes += len(chunk)
+                if num_bytes > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Voice file is larger than {max_bytes // (1024 * 1024)}MB")
+                await run_blocking(f.write, chunk)
+    except BaseException:
+        file_location.unlink(missing_ok=True)
+        raise
+    return num_bytes
+
 @app.post("/api/voices/upload")
 async def upload_voice(file: UploadFile = File(...), voiceName: str = Form(...)) -> JSONResponse:
     """
-    Upload an audio file, convert it to a WAV file, and store it in the 
-    'static/voices/custom' directory. If a file with the same voice name exists,
-    a counter is appended to the filename to ensure uniqueness.
+    Upload an audio file and queue its ingestion into the 'static/voices/custom' directory.
+    The upload is streamed to disk and a voice job converts it to a normalized WAV file and
+    precomputes its speaker embedding. If a voice with the same name exists, a counter is
+    appended to the filename to ensure uniqueness. Returns the filename and the id of the
+    voice job, poll /api/jobs/{job_id} for its status.
     """
+    voice_params = open_pc.config.voice_params
     voices_dir = Path("static") / "voices" / "custom"
     voices_dir.mkdir(parents=True, exist_ok=True)
+    upload_dir = Path(voice_params.upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
 
     # Clean and format the voice name
     base_name = voiceName.strip().replace(" ", "_")
     if not base_name:
         base_name = str(uuid.uuid4())
 
-    # Prepare a unique filename with .wav extension
+    # Prepare a unique filename with .wav extension, voices still being ingested are taken too
     filename = f"{base_name}.wav"
     file_location = voices_dir / filename
     counter = 1
-    while file_location.exists():
+    while file_location.exists() or open_pc.scheduler.active_job(filename, "voice") is not None:
         filename = f"{base_name}_{counter}.wav"
         file_location = voices_dir / filename
         counter += 1
 
+    # no extension, ffmpeg probes the format (browser recordings are webm named .wav)
+    upload_location = upload_dir / str(uuid.uuid4())
     try:
-        # Read file content from the uploaded file
-        content = await file.read()
-        audio_bytes = BytesIO(content)
-
-        # Convert the audio file to WAV regardless of original format.
-        # pydub will attempt to infer the format automatically.
-        try:
-            audio = AudioSegment.from_file(audio_bytes)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Unsupported or invalid audio format: {e}")
-
-        # Export the audio in WAV format to the designated file location.
-        audio.export(file_location, format="wav")
+        await save_upload(file, upload_location, voice_params.upload_chunk_kb * 1024, voice_params.max_upload_mb * 1024 * 1024)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
 
-    return JSONResponse({"filename": filename})
+    job = open_pc.submit_voice_ingest(str(upload_location), str(file_location))
+    if job is None:
+        upload_location.unlink(missing_ok=True)
+        raise HTTPException(status_code=409, detail=f"Voice {filename} is already being ingested")
+
+    return JSONResponse({"filename": filename, "job_id": job.id}, status_code=202)
 
 class VoiceUpdate(BaseModel):
     podcast_uuid: str
     speaker_id: str
     voice_name: str
 
+def save_podcast_voice(podcast_uuid: str, speaker_id: str, voice_name: str) -> None:
+    db = SessionLocal()
+    try:
+        podcast = db.query(PodcastDB).filter(PodcastDB.id == podcast_uuid).first()
+        if not podcast:
+            raise HTTPException(status_code=404, detail="Podcast not found")
+
+        # assign a new dict, in-place changes of JSON columns are not tracked
+        voice_names = dict(podcast.voice_names) if isinstance(podcast.voice_names, dict) else {}
+        voice_names[str(speaker_id)] = voice_name
+        podcast.voice_names = voice_names
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Error updating transcript: {e}")
+    finally:
+        db.close()
+
 @app.post("/api/voices/set")
-async def update_voice(data: VoiceUpdate, db: Session = Depends(get_db)):   
+async def update_voice(data: VoiceUpdate):   
     global open_pc
 
     if open_pc is None:
         return {"status": "not found"}
     
-    podcast = db.query(PodcastDB).filter(PodcastDB.id == data.podcast_uuid).first()
-    if not podcast:
-        raise HTTPException(status_code=404, detail="Podcast not found")      
-    
-    if not isinstance(podcast.voice_names, dict):
-        podcast.voice_names = {}
-    
-    podcast.voice_names[int(data.speaker_id)] = data.voice_name   
+    session = await get_session_async(data.podcast_uuid)
+    session.set_voice(int(data.speaker_id), data.voice_name, open_pc.available_voices)
+
+    await run_blocking(save_podcast_voice, data.podcast_uuid, data.speaker_id, data.voice_name)
     logging.info(f"Speaker: {data.speaker_id} is set to voice: {data.voice_name}") 
-    try:
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error updating transcript: {e}")
-    
-    db.refresh(podcast)    
-    open_pc.set_voice(int(data.speaker_id), data.voice_name)
 
     return {"status": "success"}
 
@@ -362,6 +643,7 @@ def delete_voice(request: DeleteVoiceRequest):
     if os.path.exists(filepath):
         try:
             os.remove(filepath)
+            open_pc.voices.remove(filepath)
             logging.info(f"Deleted voice: {filepath}") 
         except Exception as e:
             raise HTTPException(status_code=500, detail="Could not delete file.")
@@ -374,12 +656,16 @@ def handle_interrupt(signum, frame) -> None:
 
     logging.info("Interrupt received, terminating app !!")
     is_shutdown = True
+    sessions.stop_evictor()
     open_pc.stop_all_threads()
+    io_executor.shutdown(wait=False, cancel_futures=True)
 
 def run_web_app() -> None:
     global open_pc
 
     signal.signal(signal.SIGINT, handle_interrupt)
+    # jobs that were queued or running when the app last stopped
+    open_pc.resume_jobs(sessions.get, on_script_ready=save_podcast_transcript)
     uvicorn.run(app, host="0.0.0.0", port=8000, timeout_keep_alive=2)
 
 if __name__ == "__main__":   
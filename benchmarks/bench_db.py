@@ -0,0 +1,156 @@
+"""
+load benchmark of the podcast database under concurrent api traffic.
+
+Reader threads list the podcasts and load scripts (/api/podcasts/get, opening a podcast) while
+writer threads save voices, transcripts and single script lines (/api/voices/set,
+/api/podcasts/get-script, line edits). The same load runs against the default sqlite setup
+and the tuned engine of database.py and the read / write latencies are compared.
+
+usage: python benchmarks/bench_db.py --readers 8 --writers 4 --duration 10
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+# project imports
+from configs.default import DefaultDatabaseParams
+from database import (
+    PodcastDB, create_db_engine, create_session_factory, init_db, load_script_lines,
+    replace_script_lines, update_script_line,
+)
+
+
+def make_script(num_lines: int) -> List[Dict]:
+    return [
+        {
+            "speaker": f"Speaker {idx % 2 + 1}",
+            "speaker_id": idx % 2 + 1,
+            "content": f"line {idx} " + "lorem ipsum dolor sit amet " * 8,
+            "emotion_arr": [0.3, 0.05, 0.05, 0.05, 0.05, 0.05],
+        }
+        for idx in range(num_lines)
+    ]
+
+def seed(session_factory, num_podcasts: int, num_lines: int) -> List[str]:
+    podcast_ids = []
+    with session_factory() as db:
+        for idx in range(num_podcasts):
+            podcast = PodcastDB(title=f"Podcast {idx}", description="benchmark", chapters="", voice_names={}, settings={})
+            db.add(podcast)
+            db.flush()
+            replace_script_lines(db, podcast.id, make_script(num_lines))
+            podcast_ids.append(podcast.id)
+        db.commit()
+    return podcast_ids
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def run_load(session_factory, podcast_ids: List[str], num_readers: int, num_writers: int, duration_s: float, num_lines: int) -> Dict:
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+
+    def list_podcasts(db):
+        db.query(PodcastDB.id, PodcastDB.title, PodcastDB.description).all()
+
+    def open_podcast(db):
+        podcast_id = random.choice(podcast_ids)
+        db.query(PodcastDB).filter(PodcastDB.id == podcast_id).first()
+        load_script_lines(db, podcast_id)
+
+    def set_voice(db):
+        podcast = db.query(PodcastDB).filter(PodcastDB.id == random.choice(podcast_ids)).first()
+        podcast.voice_names = {"1": f"voice_{random.randint(0, 9)}"}
+        db.commit()
+
+    def save_transcript(db):
+        replace_script_lines(db, random.choice(podcast_ids), make_script(num_lines))
+        db.commit()
+
+    def edit_line(db):
+        line = make_script(1)[0]
+        update_script_line(db, random.choice(podcast_ids), random.randrange(num_lines), line)
+        db.commit()
+
+    def worker(kind: str, ops: List[Callable]):
+        while not stop.is_set():
+            op = random.choice(ops)
+            start = time.perf_counter()
+            try:
+                with session_factory() as db:
+                    op(db)
+            except OperationalError:
+                with lock:
+                    errors[kind] += 1
+                continue
+            with lock:
+                latencies[kind].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=("read", [list_podcasts, open_podcast])) for _ in range(num_readers)]
+    threads += [threading.Thread(target=worker, args=("write", [set_voice, save_transcript, edit_line])) for _ in range(num_writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration_s)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    results = {}
+    for kind in ("read", "write"):
+        values = [latency * 1000 for latency in latencies[kind]]
+        results[kind] = {
+            "ops_per_s": len(values) / duration_s,
+            "p50_ms": percentile(values, 0.5),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+            "errors": errors[kind],
+        }
+    return results
+
+def bench(name: str, make_engine: Callable[[str], object], args) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp_dir, 'podcasts.db')}")
+        session_factory = create_session_factory(engine)
+        init_db(engine, session_factory)
+        podcast_ids = seed(session_factory, args.podcasts, args.lines)
+        results = run_load(session_factory, podcast_ids, args.readers, args.writers, args.duration, args.lines)
+        engine.dispose()
+
+    print(f"\n{name}")
+    for kind, stats in results.items():
+        print(
+            f"  {kind:5s} {stats['ops_per_s']:8.1f} ops/s  p50 {stats['p50_ms']:7.2f} ms  "
+            f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms  errors {stats['errors']}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="podcast database load benchmark")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per configuration")
+    parser.add_argument("--podcasts", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=200, help="script lines per podcast")
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.podcasts} podcasts x {args.lines} lines, {args.duration}s each")
+    # the engine app.py created before the tuning layer
+    bench("default (rollback journal)", lambda url: create_engine(url, connect_args={"check_same_thread": False}), args)
+    bench("tuned (wal, pooled)", lambda url: create_db_engine(DefaultDatabaseParams(url=url)), args)
+
+if __name__ == "__main__":
+    main()
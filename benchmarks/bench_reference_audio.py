@@ -0,0 +1,91 @@
+"""
+benchmark of bounded-length reference audio for make_speaker_embedding.
+
+For every voice the speaker embedding is computed from the full clip, from the reference
+window picked by voice activity (utils/reference_audio.py) and from the first N seconds
+as a naive baseline. Reports load + embedding latency, peak gpu memory and the cosine
+similarity of the windowed embeddings to the full-clip embedding.
+
+usage: python benchmarks/bench_reference_audio.py --window 20 static/voices/*.wav
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+import torchaudio
+from zonos.model import Zonos
+
+# project imports
+from utils.reference_audio import load_reference_audio
+
+
+def time_embedding(model, load_fn: Callable[[], Tuple[torch.Tensor, int]], device: str, repeats: int) -> Dict:
+    latencies = []
+    embedding = None
+    if device == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+    for _ in range(repeats):
+        if device == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        wav, sampling_rate = load_fn()
+        with torch.no_grad():
+            embedding = model.make_speaker_embedding(wav, sampling_rate)
+        if device == "cuda":
+            torch.cuda.synchronize()
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "embedding": embedding.float().flatten().cpu(),
+        "seconds": wav.shape[-1] / sampling_rate,
+        "latency_ms": 1000 * sorted(latencies)[len(latencies) // 2],
+        "peak_mb": torch.cuda.max_memory_allocated() / 2**20 if device == "cuda" else float("nan"),
+    }
+
+def bench_voice(model, filepath: str, window_s: float, device: str, repeats: int) -> None:
+    num_frames = int(window_s * torchaudio.info(filepath).sample_rate)
+    methods = {
+        "full": lambda: torchaudio.load(filepath),
+        "vad window": lambda: load_reference_audio(filepath, window_s),
+        "first window": lambda: torchaudio.load(filepath, num_frames=num_frames),
+    }
+    results = {name: time_embedding(model, load_fn, device, repeats) for name, load_fn in methods.items()}
+
+    full = results["full"]["embedding"]
+    print(f"\n{filepath}")
+    for name, result in results.items():
+        similarity = torch.nn.functional.cosine_similarity(result["embedding"], full, dim=0).item()
+        print(
+            f"  {name:12s} {result['seconds']:7.1f}s audio  {result['latency_ms']:8.1f} ms  "
+            f"peak {result['peak_mb']:8.1f} MB  cosine to full {similarity:.4f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="reference audio window benchmark")
+    parser.add_argument("voices", nargs="*", help="voice files, defaults to static/voices/*.wav")
+    parser.add_argument("--window", type=float, default=20.0, help="reference window in seconds")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--model", default="Zyphra/Zonos-v0.1-hybrid")
+    args = parser.parse_args()
+
+    voices: List[str] = args.voices or sorted(glob.glob("static/voices/*.wav"))
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = Zonos.from_pretrained(args.model, device=device)
+    model.eval()
+
+    # warm up the speaker encoder so the first voice is not penalized
+    wav, sampling_rate = torchaudio.load(voices[0], num_frames=16000)
+    model.make_speaker_embedding(wav, sampling_rate)
+
+    print(f"{len(voices)} voices, {args.window}s window, median of {args.repeats} runs on {device}")
+    for filepath in voices:
+        bench_voice(model, filepath, args.window, device, args.repeats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+truncation check of the silence early stop (generation_params.silence_stop_s).
+
+Every line is generated twice with the same seed: once ending only at the eos token and once
+with the silence early stop. The sampled tokens are identical up to the point where the early
+stop ends the line, so the audio the stop cut off is the tail of the eos-only take. The cut tail
+is checked for speech with the energy based voice activity of utils/reference_audio.py.
+A line counts as truncated when more than --max-cut-ms of speech was cut.
+
+The early stop is off by default, enable it only when this reports no truncated lines on the
+voices in use.
+
+usage: python benchmarks/bench_silence_stop.py --silence-stop 1.0 zonos_americanfemale jay-shetty
+"""
+import os
+import sys
+import argparse
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+# project imports
+from utils.open_podcraft import OpenPodCraft
+from utils.reference_audio import voiced_frames
+from utils.script_store import ScriptRow, default_emotions
+
+# short interjections, pauses inside a line and long sentences
+LINES = [
+    "Oh, wow!",
+    "Right... exactly.",
+    "Hmm. Let me think about that for a second.",
+    "That is the thing, you know? Nobody expected it to work... and then it did.",
+    "Well, it started as a side project, a few scripts on a laptop, and three years later it runs "
+    "the data pipeline of the whole company, which still surprises everyone, including the people who wrote it.",
+    "Wait, wait. Before we move on, can we go back to what you said about the first version?",
+]
+
+
+def generate(open_pc: OpenPodCraft, line: ScriptRow, voice_name: str, silence_stop_s: float, seed: int):
+    open_pc.config.generation_params.silence_stop_s = silence_stop_s
+    prefix_conditioning = open_pc.prepare_line_conditioning(line, voice_name)
+    audio_prefix_codes = open_pc.get_audio_prefix(open_pc.silence_audio_path, 500)
+    torch.manual_seed(seed)
+    codes, lengths = open_pc.generate_codes(
+        prefix_conditioning, audio_prefix_codes, 1, open_pc.line_token_budget(line.content)
+    )
+    return codes[..., :lengths[0]]
+
+def voiced_ms_after(wav: torch.Tensor, cut_sample: int, sampling_rate: int, frame_ms: int = 30) -> float:
+    frame_len = sampling_rate * frame_ms // 1000
+    num_frames = wav.shape[-1] // frame_len
+    if num_frames == 0:
+        return 0.0
+    frames = wav.mean(dim=0)[:num_frames * frame_len].reshape(num_frames, frame_len)
+    energies_db = 10 * torch.log10(frames.pow(2).mean(dim=1) + 1e-10)
+    voiced = voiced_frames(energies_db)
+    return float(voiced[cut_sample // frame_len:].sum()) * frame_ms
+
+def bench_voice(open_pc: OpenPodCraft, voice_name: str, args) -> List[Dict]:
+    open_pc.prepare_voices([voice_name])
+    sampling_rate = open_pc.model.autoencoder.sampling_rate
+    results = []
+    print(f"\n{voice_name}")
+    for line_no, text in enumerate(LINES):
+        line = ScriptRow(speaker="Speaker 1", speaker_id=1, content=text, emotions_arr=default_emotions())
+        full_codes = generate(open_pc, line, voice_name, 0.0, args.seed + line_no)
+        stop_codes = generate(open_pc, line, voice_name, args.silence_stop, args.seed + line_no)
+
+        with torch.no_grad():
+            wav = open_pc.model.autoencoder.decode(full_codes).cpu()[0].float()
+        samples_per_frame = wav.shape[-1] // full_codes.shape[-1]
+        cut_sample = stop_codes.shape[-1] * samples_per_frame
+        cut_ms = voiced_ms_after(wav, cut_sample, sampling_rate)
+
+        result = {
+            "full_s": wav.shape[-1] / sampling_rate,
+            "stop_s": cut_sample / sampling_rate,
+            "cut_speech_ms": cut_ms,
+            "truncated": cut_ms > args.max_cut_ms,
+        }
+        results.append(result)
+        print(
+            f"  line {line_no}: eos {result['full_s']:5.1f}s  early stop {result['stop_s']:5.1f}s  "
+            f"speech cut {cut_ms:6.0f} ms{'  TRUNCATED' if result['truncated'] else ''}"
+        )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="silence early stop truncation check")
+    parser.add_argument("voices", nargs="*", help="voice names, defaults to all voices of the library")
+    parser.add_argument("--silence-stop", type=float, default=1.0, help="silence_stop_s to check")
+    parser.add_argument("--max-cut-ms", type=float, default=90.0, help="speech that may be cut before a line counts as truncated")
+    parser.add_argument("--seed", type=int, default=420)
+    args = parser.parse_args()
+
+    open_pc = OpenPodCraft()
+    voices = args.voices or sorted(open_pc.available_voices)
+    print(f"{len(voices)} voices x {len(LINES)} lines, silence_stop_s {args.silence_stop}")
+
+    results = [result for voice_name in voices for result in bench_voice(open_pc, voice_name, args)]
+    full_s = sum(result["full_s"] for result in results)
+    stop_s = sum(result["stop_s"] for result in results)
+    num_truncated = sum(result["truncated"] for result in results)
+    print(f"\n{num_truncated}/{len(results)} lines truncated, audio {full_s:.1f}s -> {stop_s:.1f}s")
+    open_pc.stop_all_threads()
+
+if __name__ == "__main__":
+    main()
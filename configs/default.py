@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field, asdict
+from typing import List
 
 @dataclass
 class DefaultConditioningParams:
@@ -24,6 +25,12 @@ class DefaultGenerationParams:
     cfg_scale: float = 3.5
     min_p: float = 0.0
     seed: int = 420
+    # token budget of a line: speech length of its text at the speaking rate times the margin
+    phonemes_per_char: float = 0.9
+    token_budget_margin: float = 1.8
+    min_line_s: float = 2.0 # budget floor, short interjections still get room to breathe
+    max_line_s: float = 30.0 # the model default budget
+    silence_stop_s: float = 0.0 # a line ends after this much generated silence, 0 disables. check benchmarks/bench_silence_stop.py before enabling
 
 @dataclass
 class DefaultEmotionParams:
@@ -36,12 +43,89 @@ class DefaultEmotionParams:
     other: float = 0.05
     neutral: float = 0.05
 
+@dataclass
+class DefaultRenderParams:
+    max_batch_size: int = 1
+    length_bucketing: str = "length" # "none": batch lines in script order, "length": batch lines of similar text length
+    max_length_ratio: float = 1.5 # max ratio between the longest and shortest line text in a batch
+    carry_prefix: bool = False # use the tail of the previous line as audio prefix instead of the silence file
+    stream_output: bool = True # stream rendered lines to the web player while the podcast is rendering
+    render_while_scripting: bool = True # start the voice over on the first script line while the llm writes the rest
+    resume: bool = True # skip lines whose inputs are unchanged since their last render
+    assembly: str = "auto" # final.wav assembly. "append": written line by line, "mmap": from seq files at the end, "auto": append when lines render in order
+
+@dataclass
+class DefaultJobParams:
+    script_workers: int = 2 # script generation is network bound
+    render_workers: int = 1 # render workers share a single tts model
+    io_workers: int = 4 # blocking db and audio work of the web handlers
+    voice_workers: int = 1 # normalization and speaker embeddings of uploaded voices
+
+@dataclass
+class DefaultSessionParams:
+    max_sessions: int = 64 # max podcast sessions held in memory
+    idle_timeout_s: float = 1800.0 # idle sessions are evicted after this time
+    eviction_interval_s: float = 60.0 # how often idle sessions are checked, 0 disables
+
+@dataclass
+class DefaultLLMParams:
+    base_url: str = "https://openrouter.ai/api/v1" # overridden by the OPENROUTER_BASE_URL env var
+    timeout_s: float = 300.0 # reasoning models may take several minutes
+    connect_timeout_s: float = 10.0
+    max_connections: int = 8
+    max_retries: int = 3 # retries per model on timeouts, rate limits and server errors
+    backoff_s: float = 2.0
+    max_backoff_s: float = 30.0
+    fallback_models: List[str] = field(default_factory=lambda: [
+        "google/gemini-2.0-flash-exp:free",
+        "deepseek/deepseek-chat:free",
+    ]) # preferred fallbacks, tried in order when the selected model fails
+    max_fallbacks: int = 2 # fallbacks per request, the models of configs/llm_models.yaml fill up the preferred ones
+    max_metrics: int = 1000 # no. of recent requests kept for the metrics
+    section_chars: int = 12000 # longer chapters are split into sections scripted concurrently, 0 disables splitting
+    max_parallel_sections: int = 4 # max concurrent llm requests of a chunked script
+    cache_responses: bool = True # reuse responses of identical script requests
+    cache_ttl_s: float = 604800.0 # cached responses expire after a week
+    cache_max_mb: int = 200
+
+@dataclass
+class DefaultVoiceParams:
+    voice_dirs: List[str] = field(default_factory=lambda: ["static/voices", "static/voices/custom"]) # later dirs override voices of the same name
+    watch_interval_s: float = 10.0 # polls the voice dirs for files changed outside the app, 0 disables
+    upload_dir: str = "cache/voice_uploads" # raw uploads wait here for the ingestion job
+    upload_chunk_kb: int = 1024 # uploads are streamed to disk in chunks of this size
+    max_upload_mb: int = 50
+    sample_rate: int = 44100 # uploaded voices are resampled to mono at this rate
+    loudness_dbfs: float = -20.0 # target loudness of uploaded voices
+    silence_thresh_db: float = -45.0 # leading and trailing audio below this level is trimmed
+    min_duration_s: float = 1.0
+    max_duration_s: float = 30.0 # longer recordings are cut, the speaker embedding needs only a short reference
+    reference_window_s: float = 20.0 # speaker embeddings use the window of the voice with the most speech, 0 uses the full clip
+    vad_frame_ms: int = 30 # frame length of the voice activity analysis
+
+@dataclass
+class DefaultDatabaseParams:
+    url: str = "sqlite:///./podcasts.db"
+    journal_mode: str = "WAL" # readers do not block behind writers
+    synchronous: str = "NORMAL" # safe with WAL, only the last commits may be lost on power failure
+    busy_timeout_ms: int = 5000 # wait for the write lock instead of failing with "database is locked"
+    cache_size_kb: int = 16384 # page cache per connection
+    pool_size: int = 8 # pooled connections kept open
+    max_overflow: int = 16 # extra connections under bursts of requests
+    pool_timeout_s: float = 30.0
+
 @dataclass
 class DefaultConfig:
     uncondition_toggles: DefaultUnconditionParams = field(default_factory=DefaultUnconditionParams)
     conditioning_params: DefaultConditioningParams = field(default_factory=DefaultConditioningParams)
     generation_params: DefaultGenerationParams = field(default_factory=DefaultGenerationParams)
     emotion_params: DefaultEmotionParams = field(default_factory=DefaultEmotionParams)
+    render_params: DefaultRenderParams = field(default_factory=DefaultRenderParams)
+    job_params: DefaultJobParams = field(default_factory=DefaultJobParams)
+    session_params: DefaultSessionParams = field(default_factory=DefaultSessionParams)
+    llm_params: DefaultLLMParams = field(default_factory=DefaultLLMParams)
+    db_params: DefaultDatabaseParams = field(default_factory=DefaultDatabaseParams)
+    voice_params: DefaultVoiceParams = field(default_factory=DefaultVoiceParams)
     language_code: str = "en-us"
     model_type: str =  "Zyphra/Zonos-v0.1-hybrid" #"Zyphra/Zonos-v0.1-transformer"
     speaker_noised_bool: bool = False
\ No newline at end of file
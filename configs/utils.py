@@ -4,7 +4,7 @@ import json
 from dataclasses import dataclass, field, asdict
 
 # project imports
-from configs.default import DefaultConfig, DefaultUnconditionParams, DefaultConditioningParams, DefaultGenerationParams, DefaultEmotionParams
+from configs.default import DefaultConfig, DefaultUnconditionParams, DefaultConditioningParams, DefaultGenerationParams, DefaultEmotionParams, DefaultRenderParams, DefaultJobParams, DefaultSessionParams, DefaultLLMParams, DefaultDatabaseParams, DefaultVoiceParams
 
 def save_config(config: DefaultConfig, filename: str = "configs/default.json"):
     """
@@ -32,6 +32,12 @@ def load_config():
             conditioning_params=DefaultConditioningParams(**data.get("conditioning_params", {})),
             generation_params=DefaultGenerationParams(**data.get("generation_params", {})),
             emotion_params=DefaultEmotionParams(**data.get("emotion_params", {})),
+            render_params=DefaultRenderParams(**data.get("render_params", {})),
+            job_params=DefaultJobParams(**data.get("job_params", {})),
+            session_params=DefaultSessionParams(**data.get("session_params", {})),
+            llm_params=DefaultLLMParams(**data.get("llm_params", {})),
+            db_params=DefaultDatabaseParams(**data.get("db_params", {})),
+            voice_params=DefaultVoiceParams(**data.get("voice_params", {})),
             language_code=data.get("language_code", "en-us"),
             model_type=data.get("model_type", "Zyphra/Zonos-v0.1-hybrid"),
             speaker_noised_bool=data.get("speaker_noised_bool", False)
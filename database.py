@@ -1,19 +1,217 @@
 import uuid
+import logging
+from typing import Dict, List, Optional
 
-from sqlalchemy import create_engine, Column, Integer, String, JSON
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, JSON, ForeignKey, Index
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+
+# project imports
+from configs.default import DefaultDatabaseParams
 
 Base = declarative_base()
 
 # sqlite db
 class PodcastDB(Base):
     __tablename__ = "podcasts"
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    # lookups by id use the primary key, a separate index on it only slows down writes
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
     # Mark other fields as nullable so they can be empty initially
     description = Column(String, nullable=True)
     chapters = Column(String, nullable=True)
-    transcript = Column(JSON, nullable=True)
+    # legacy json transcript, migrated to the script_lines table
+    transcript = Column(JSON(none_as_null=True), nullable=True)
     voice_names = Column(JSON, nullable=True)
-    settings = Column(JSON, nullable=True)
\ No newline at end of file
+    settings = Column(JSON, nullable=True)
+
+class ScriptLineDB(Base):
+    __tablename__ = "script_lines"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    podcast_id = Column(String, ForeignKey("podcasts.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False) # order of the line in the script, 0 based
+    speaker_id = Column(Integer, nullable=False)
+    speaker = Column(String, nullable=True) # label as written in the script, e.g. "Host 1"
+    content = Column(String, nullable=False)
+    emotions = Column(JSON, nullable=True)
+
+    __table_args__ = (
+        # lines are always read and shifted per podcast in script order
+        Index("ix_script_lines_podcast_position", "podcast_id", "position"),
+    )
+
+def line_to_dict(line: ScriptLineDB) -> Dict:
+    return {
+        "speaker": line.speaker or f"Speaker {line.speaker_id}",
+        "speaker_id": line.speaker_id,
+        "content": line.content,
+        "emotion_arr": line.emotions,
+    }
+
+def load_script_lines(db: Session, podcast_id: str) -> List[Dict]:
+    """
+    script of a podcast in the transcript dict format
+    """
+    lines = (
+        db.query(ScriptLineDB)
+        .filter(ScriptLineDB.podcast_id == podcast_id)
+        .order_by(ScriptLineDB.position)
+        .all()
+    )
+    return [line_to_dict(line) for line in lines]
+
+def replace_script_lines(db: Session, podcast_id: str, dict_lines: List[Dict]) -> None:
+    """
+    replace the script of a podcast, the caller commits
+    """
+    db.query(ScriptLineDB).filter(ScriptLineDB.podcast_id == podcast_id).delete(synchronize_session=False)
+    db.bulk_insert_mappings(ScriptLineDB, [
+        {
+            "podcast_id": podcast_id,
+            "position": position,
+            "speaker_id": int(line["speaker_id"]),
+            "speaker": line.get("speaker"),
+            "content": line["content"],
+            "emotions": line.get("emotion_arr"),
+        }
+        for position, line in enumerate(dict_lines)
+    ])
+
+def insert_script_line(db: Session, podcast_id: str, position: int, line: Dict) -> None:
+    """
+    insert a line before position, the lines after it move down by one. the caller commits
+    """
+    db.query(ScriptLineDB).filter(
+        ScriptLineDB.podcast_id == podcast_id, ScriptLineDB.position >= position
+    ).update({ScriptLineDB.position: ScriptLineDB.position + 1}, synchronize_session=False)
+    db.add(ScriptLineDB(
+        podcast_id=podcast_id,
+        position=position,
+        speaker_id=int(line["speaker_id"]),
+        speaker=line.get("speaker"),
+        content=line["content"],
+        emotions=line.get("emotion_arr"),
+    ))
+
+def update_script_line(db: Session, podcast_id: str, position: int, line: Dict) -> bool:
+    """
+    update the line at position, the caller commits
+
+    Returns:
+        bool: False if the line does not exist
+    """
+    num_updated = db.query(ScriptLineDB).filter(
+        ScriptLineDB.podcast_id == podcast_id, ScriptLineDB.position == position
+    ).update({
+        ScriptLineDB.speaker_id: int(line["speaker_id"]),
+        ScriptLineDB.speaker: line.get("speaker"),
+        ScriptLineDB.content: line["content"],
+        ScriptLineDB.emotions: line.get("emotion_arr"),
+    }, synchronize_session=False)
+    return num_updated > 0
+
+def delete_script_line(db: Session, podcast_id: str, position: int) -> bool:
+    """
+    delete the line at position, the lines after it move up by one. the caller commits
+
+    Returns:
+        bool: False if the line does not exist
+    """
+    num_deleted = db.query(ScriptLineDB).filter(
+        ScriptLineDB.podcast_id == podcast_id, ScriptLineDB.position == position
+    ).delete(synchronize_session=False)
+    if num_deleted == 0:
+        return False
+
+    db.query(ScriptLineDB).filter(
+        ScriptLineDB.podcast_id == podcast_id, ScriptLineDB.position > position
+    ).update({ScriptLineDB.position: ScriptLineDB.position - 1}, synchronize_session=False)
+    return True
+
+def migrate_transcripts(db: Session) -> int:
+    """
+    move the json transcripts of existing podcasts into the script_lines table
+
+    Returns:
+        int: no. of migrated podcasts
+    """
+    podcasts = db.query(PodcastDB).filter(PodcastDB.transcript.isnot(None)).all()
+    num_migrated = 0
+    for podcast in podcasts:
+        if isinstance(podcast.transcript, list) and len(podcast.transcript) > 0:
+            replace_script_lines(db, podcast.id, podcast.transcript)
+            num_migrated += 1
+        podcast.transcript = None
+    db.commit()
+
+    if num_migrated > 0:
+        logging.info(f"Migrated the transcripts of {num_migrated} podcasts to the script_lines table")
+    return num_migrated
+
+def create_db_engine(params: Optional[DefaultDatabaseParams] = None) -> Engine:
+    """
+    engine with a sized connection pool. sqlite connections are set up for concurrent api
+    traffic: wal journal so readers do not block behind writers, relaxed syncs and a busy
+    timeout so writers wait for the lock instead of failing.
+    """
+    params = params or DefaultDatabaseParams()
+    is_sqlite = params.url.startswith("sqlite")
+    engine = create_engine(
+        params.url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        poolclass=QueuePool,
+        pool_size=params.pool_size,
+        max_overflow=params.max_overflow,
+        pool_timeout=params.pool_timeout_s,
+    )
+    if not is_sqlite:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={params.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={params.synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(params.busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(params.cache_size_kb)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    return engine
+
+def create_session_factory(engine: Engine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def create_missing_indexes(engine: Engine) -> None:
+    """
+    create_all only creates the indexes of new tables, add the ones missing on tables of older databases
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                logging.info(f"Creating index {index.name} on {table.name}")
+                index.create(bind=engine)
+
+# indexes of older databases that no query needs anymore
+STALE_INDEXES = [
+    "ix_podcasts_id", # duplicated the primary key index of podcasts
+]
+
+def drop_stale_indexes(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for index_name in STALE_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+def init_db(engine: Engine, session_factory: sessionmaker) -> None:
+    """
+    create the tables and indexes and migrate data of older databases
+    """
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    drop_stale_indexes(engine)
+    with session_factory() as db:
+        migrate_transcripts(db) # move json transcripts of older databases into script_lines
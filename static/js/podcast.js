@@ -1,3 +1,6 @@
+// uuid of the podcast opened on this page
+const currentPodcastUuid = document.getElementById("generatePodcastBtn").getAttribute("data-uuid");
+
 
 document.getElementById('generatePodcastScriptBtn')
 .addEventListener('click', async (event) => {
@@ -22,33 +25,36 @@ async function populatePodcastScript(){
 
   try {
 
-      const response = await fetch("/api/podcasts/get-script");
+      const response = await fetch(`/api/podcasts/get-script?podcast_uuid=${currentPodcastUuid}`);
       const dataList = await response.json();
 
       container.innerHTML = "";
-      dataList.forEach(data => {
-        const newContent = `
-            <div class="d-flex">
-              <div style="min-width:100px">
-                <strong>${data.speaker}</strong>
-              </div>
-
-              <div>
-                <p>${data.content}</p>
-              </div>
-            </div>
-            
-        `;
-        container.insertAdjacentHTML("beforeend", newContent);
-    });
+      dataList.forEach(data => appendPodcastScriptLine(data));
   } catch (error) {
       console.error("Error getting script lines", error);
   }
 };
 
+function appendPodcastScriptLine(data) {
+  const container = document.getElementById("podcastLinesDisplay");
+  const newContent = `
+      <div class="d-flex">
+        <div style="min-width:100px">
+          <strong>${data.speaker}</strong>
+        </div>
+
+        <div>
+          <p>${data.content}</p>
+        </div>
+      </div>
+      
+  `;
+  container.insertAdjacentHTML("beforeend", newContent);
+};
+
 function checkPodcastScriptStatus() {
 
-  const flagsCheckEventSource = new EventSource('/api/check_flags');
+  const flagsCheckEventSource = new EventSource(`/api/check_flags?podcast_uuid=${currentPodcastUuid}`);
   flagsCheckEventSource.onmessage = function(event) {
       const data = JSON.parse(event.data);     
 
@@ -70,19 +76,48 @@ function checkPodcastScriptStatus() {
           scriptLinesDisplay.classList.add("d-none");
 
       } 
-      if (data.is_script_available) {
+      // lines are shown while the llm is still writing the script
+      if (data.event === "script_line") {
+          if (data.line === 0) {
+            document.getElementById("podcastLinesDisplay").innerHTML = "";
+          }
+          spinnerDisplay.classList.add("d-none");
+          notFoundMsgDisplay.classList.add("d-none");
+          scriptLinesDisplay.classList.remove("d-none");
+          appendPodcastScriptLine(data);
+      }
+
+      // the script only changes when it was (re)generated
+      if (data.is_script_available && (data.event === "state" || data.event === "script_finished")) {
           spinnerDisplay.classList.add("d-none");
           notFoundMsgDisplay.classList.add("d-none");
           scriptLinesDisplay.classList.remove("d-none");
           populatePodcastScript();
       }    
       
-      if (data.is_generating_podcast) {            
+      if (data.is_generating_podcast && !data.is_podcast_streaming) {            
           showGeneratingAnimationPodcastAudio();
       }     
 
-      if (data.is_podcast_available) {
-          fetchAndUpdateAudioUrl();
+      if (data.event === "render_failed") {
+          console.error(`Podcast render failed: ${data.error}`);
+      }
+
+      if (data.event === "line_rendered") {
+          console.log(`Rendered ${data.num_rendered} of ${data.num_lines} lines, ETA: ${data.eta_s}s`);
+      }
+
+      if (data.is_podcast_streaming) {
+          startAudioStream();
+      }
+
+      if (data.is_podcast_available && (data.event === "state" || data.event === "render_finished")) {
+          // keep playing the stream, it already contains the whole podcast
+          const audioPlayer = document.getElementById("audioPlayer");
+          if (!isAudioStreamStarted || audioPlayer.paused) {
+            fetchAndUpdateAudioUrl();
+          }
+          isAudioStreamStarted = false;
       }
   };
 
@@ -194,7 +229,7 @@ function fetchAndUpdateAudioUrl() {
 
 
   // Send a GET request to fetch the audio URL.
-  fetch("/api/podcasts/get-audio-url")
+  fetch(`/api/podcasts/get-audio-url?podcast_uuid=${currentPodcastUuid}`)
     .then(response => {
       if (!response.ok) {
         throw new Error("Failed to fetch audio URL");
@@ -226,6 +261,30 @@ function fetchAndUpdateAudioUrl() {
     });
 }
 
+let isAudioStreamStarted = false;
+
+function startAudioStream() {
+  // start playback of the lines rendered so far, only once per render
+  if (isAudioStreamStarted) {
+    return;
+  }
+  isAudioStreamStarted = true;
+
+  const playPauseBtn = document.getElementById("playPauseBtn");
+  const progressContainer = document.getElementById("progressContainer");
+  const stopBtn = document.getElementById("stopBtn");
+  const audioPlayer = document.getElementById("audioPlayer");
+  const podcastAudioPlayerProgressBar = document.getElementById("podcastAudioPlayerProgressBar");
+
+  audioPlayer.src = `/api/podcasts/stream-audio?podcast_uuid=${currentPodcastUuid}`;
+  audioPlayer.load();
+
+  podcastAudioPlayerProgressBar.classList.add("d-none");
+  progressContainer.classList.remove("d-none");
+  playPauseBtn.classList.remove("d-none");
+  stopBtn.classList.remove("d-none");
+}
+
 function showGeneratingAnimationPodcastAudio() {
 
   const playPauseBtn = document.getElementById("playPauseBtn");
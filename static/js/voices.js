@@ -168,6 +168,18 @@ document.addEventListener("DOMContentLoaded", () => {
 
 
 // --------- Audio Recording & Upload ---------
+// poll a job until it is no longer queued or running
+async function waitForJob(jobId, intervalMs = 1000) {
+  while (true) {
+    const response = await fetch(`/api/jobs/${jobId}`);
+    const job = await response.json();
+    if (job.status !== "queued" && job.status !== "running") {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+}
+
 let mediaRecorder;
 let audioChunks = [];
 const startBtn = document.getElementById('startBtn');
@@ -220,7 +232,12 @@ stopBtn.addEventListener('click', () => {
       })
       .then(response => response.json())
       .then(data => {
-          recordingStatus.textContent = "Recording saved!";          
+          // the voice is normalized and embedded by a background job
+          recordingStatus.textContent = "Processing voice...";
+          return waitForJob(data.job_id);
+      })
+      .then(job => {
+          recordingStatus.textContent = job.status === "completed" ? "Recording saved!" : `Error saving recording: ${job.error || job.status}`;
           fetchVoices(); // refresh the voice files list
       })
       .catch(error => {
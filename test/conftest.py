@@ -0,0 +1,2 @@
+# test_implementation.py is a manual end to end run on the gpu, run it with python
+collect_ignore = ["test_implementation.py"]
@@ -0,0 +1,37 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+# project imports
+from utils.batching import bucket_lines_by_length, stack_conditioning
+
+
+def test_no_policy_keeps_script_order():
+    assert bucket_lines_by_length(["a"] * 5, 2, policy="none") == [[0, 1], [2, 3], [4]]
+
+def test_length_policy_groups_similar_lengths():
+    texts = ["x" * 10, "x" * 100, "x" * 12, "x" * 110, "x" * 11]
+    batches = bucket_lines_by_length(texts, 4, max_length_ratio=1.5)
+
+    assert batches == [[0, 4, 2], [1, 3]]
+    assert sorted(idx for batch in batches for idx in batch) == list(range(len(texts)))
+    assert all(len(batch) <= 2 for batch in bucket_lines_by_length(texts, 2))
+    assert bucket_lines_by_length([], 4) == []
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        bucket_lines_by_length(["a"], 0)
+    with pytest.raises(ValueError):
+        bucket_lines_by_length(["a"], 2, policy="random")
+
+def test_stack_conditioning_left_pads():
+    short = torch.ones(2, 3, 4)
+    long = torch.full((2, 5, 4), 2.0)
+    short[1] = 3.0
+    stacked = stack_conditioning([short, long])
+
+    assert stacked.shape == (4, 5, 4)
+    # cond rows first, then uncond rows
+    assert torch.equal(stacked[0, 2:], short[0]) and torch.equal(stacked[2, 2:], short[1])
+    assert torch.equal(stacked[1], long[0]) and torch.equal(stacked[3], long[1])
+    assert stacked[0, :2].abs().sum() == 0 and stacked[2, :2].abs().sum() == 0
@@ -13,36 +13,20 @@ from zonos.model import Zonos
 from zonos.conditioning import make_cond_dict
 
 # project imports
-from utils.utils import process_script, check_available_voices, ScriptLine
+from utils.util import ScriptLine
+from utils.script_parser import process_script_from_txt
+from utils.voice_registry import VoiceRegistry
 from configs.utils import load_config
 from configs.default import DefaultConfig
 
-config = load_config()
-
-script_queue = []
-process_script("assets/sample_podcast_script.txt", script_queue)
-
-voices = check_available_voices("assets/voices")
-
-# Use the hybrid with "Zyphra/Zonos-v0.1-hybrid"
-# model_type = ["Zyphra/Zonos-v0.1-hybrid", "Zyphra/Zonos-v0.1-transformer"]
-model = Zonos.from_pretrained(config.model_type, device="cuda")
-# TODO: test this
-model.bfloat16()
-model.eval()
-
-output_dir = "outputs/" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-os.makedirs(output_dir, exist_ok=True)
+# manual end to end run of the voice over on the gpu, not collected by pytest:
+# python test/test_implementation.py [script.txt]
 
 # dev only
-for script_line in script_queue:
-    if script_line.speaker == "Speaker 1":
-        # script_line.speaker = "zonos_britishfemale"
-        script_line.speaker = "zonos_americanmale"
-    
-    if script_line.speaker == "Speaker 2":
-        # script_line.speaker = "zonos_americanmale"
-        script_line.speaker = "zonos_britishfemale"
+SPEAKER_VOICES = {
+    "Speaker 1": "zonos_americanmale", # "zonos_britishfemale"
+    "Speaker 2": "zonos_britishfemale", # "zonos_americanmale"
+}
 
 
 def generate_script_voice_overs(
@@ -174,12 +158,35 @@ def generate_script_voice_overs(
     torchaudio.save(os.path.join(output_dir, "final.wav"), final_audio, model.autoencoder.sampling_rate)
 
 
-generate_script_voice_overs(
-    script_queue=script_queue,
-    model=model,
-    voices=voices,
-    config=config,
-    output_dir=output_dir,
-    verbose=True,
-    device="cuda"
-)
\ No newline at end of file
+def main():
+    config = load_config()
+
+    script_queue = []
+    script_path = sys.argv[1] if len(sys.argv) > 1 else "assets/sample_podcast_script.txt"
+    process_script_from_txt(script_path, script_queue)
+
+    available_voices = VoiceRegistry(["assets/voices"])
+    voices = {speaker: available_voices[voice_name] for speaker, voice_name in SPEAKER_VOICES.items()}
+
+    # Use the hybrid with "Zyphra/Zonos-v0.1-hybrid"
+    # model_type = ["Zyphra/Zonos-v0.1-hybrid", "Zyphra/Zonos-v0.1-transformer"]
+    model = Zonos.from_pretrained(config.model_type, device="cuda")
+    # TODO: test this
+    model.bfloat16()
+    model.eval()
+
+    output_dir = "outputs/" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    os.makedirs(output_dir, exist_ok=True)
+
+    generate_script_voice_overs(
+        script_queue=script_queue,
+        model=model,
+        voices=voices,
+        config=config,
+        output_dir=output_dir,
+        verbose=True,
+        device="cuda"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import json
+import threading
+
+import pytest
+
+# project imports
+from utils.job_queue import (
+    CANCELLED, COMPLETED, FAILED, INTERRUPTED, QUEUED, RESUMED, JobScheduler,
+)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "jobs.json")
+
+def wait_until_cancelled(job):
+    while not job.cancel_event.wait(0.01):
+        pass
+
+def wait_for(job, timeout: float = 5.0):
+    for _ in range(int(timeout / 0.01)):
+        if not job.is_active:
+            return
+        threading.Event().wait(0.01)
+    raise TimeoutError(f"job {job.id} still {job.status}")
+
+
+def test_runs_jobs_and_persists_them(store_path):
+    scheduler = JobScheduler({"script": 1}, store_path=store_path)
+    done = scheduler.submit("script", "podcast", lambda job: job.update(0.5, "halfway"), params={"force_regenerate": True})
+    failed = scheduler.submit("script", "other", lambda job: 1 / 0)
+    wait_for(done)
+    wait_for(failed)
+    scheduler.shutdown()
+
+    assert (done.status, done.progress, done.message) == (COMPLETED, 1.0, "halfway")
+    assert failed.status == FAILED and "division" in failed.error
+    with open(store_path) as f:
+        records = {record["id"]: record for record in json.load(f)}
+    assert records[done.id]["status"] == COMPLETED
+    assert records[done.id]["params"] == {"force_regenerate": True}
+    assert "cancel_event" not in records[done.id]
+
+def test_one_active_job_per_podcast_and_kind(store_path):
+    scheduler = JobScheduler({"script": 1, "render": 1}, store_path=store_path)
+    release = threading.Event()
+    first = scheduler.submit("script", "podcast", lambda job: release.wait(5))
+
+    assert scheduler.submit("script", "podcast", lambda job: None) is None
+    assert scheduler.submit("render", "podcast", lambda job: None) is not None
+    assert scheduler.active_job("podcast", "script") is first
+    with pytest.raises(ValueError):
+        scheduler.submit("unknown", "podcast", lambda job: None)
+
+    release.set()
+    wait_for(first)
+    assert scheduler.submit("script", "podcast", lambda job: None) is not None
+    scheduler.shutdown(cancel=False)
+
+def test_concurrent_submits_queue_one_job(store_path):
+    scheduler = JobScheduler({"render": 2}, store_path=store_path)
+    release = threading.Event()
+    jobs = []
+    threads = [
+        threading.Thread(target=lambda: jobs.append(scheduler.submit("render", "podcast", lambda job: release.wait(5))))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len([job for job in jobs if job is not None]) == 1
+    release.set()
+    scheduler.shutdown(cancel=False)
+
+def test_cancel(store_path):
+    scheduler = JobScheduler({"render": 1}, store_path=store_path)
+    running = scheduler.submit("render", "a", wait_until_cancelled)
+    queued = scheduler.submit("render", "b", lambda job: None)
+
+    assert scheduler.cancel(queued.id) and scheduler.cancel(running.id)
+    wait_for(running)
+    wait_for(queued)
+    assert running.status == CANCELLED and queued.status == CANCELLED
+    assert not scheduler.cancel(running.id)
+    scheduler.shutdown()
+
+def test_shutdown_interrupts_and_resume_requeues(store_path):
+    scheduler = JobScheduler({"render": 1}, store_path=store_path)
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        wait_until_cancelled(job)
+
+    running = scheduler.submit("render", "a", run, params={"live": False})
+    started.wait(5)
+    queued = scheduler.submit("render", "b", run)
+    cancelled = scheduler.submit("render", "c", run)
+    scheduler.cancel(cancelled.id)
+    scheduler.shutdown()
+
+    assert (running.status, queued.status, cancelled.status) == (INTERRUPTED, INTERRUPTED, CANCELLED)
+
+    # after a restart
+    restarted = JobScheduler({"render": 1}, store_path=store_path)
+    resubmitted = []
+
+    def resubmit(job):
+        resubmitted.append((job.podcast_uuid, job.params))
+        if job.podcast_uuid == "b":
+            return None
+        return restarted.submit(job.kind, job.podcast_uuid, lambda new_job: None, job.params)
+
+    assert restarted.resume(resubmit) == 1
+    assert resubmitted == [("a", {"live": False}), ("b", {})]
+    assert restarted.get(running.id).status == RESUMED
+    assert restarted.get(queued.id).status == FAILED
+    restarted.shutdown(cancel=False)
+
+    # resumed and failed records are not resumed again
+    assert JobScheduler({"render": 1}, store_path=store_path).resume(resubmit) == 0
+
+def test_jobs_of_a_crashed_app_are_interrupted(store_path):
+    scheduler = JobScheduler({"script": 1}, store_path=store_path)
+    job = scheduler.submit("script", "podcast", lambda job: None)
+    wait_for(job)
+    with open(store_path) as f:
+        records = json.load(f)
+    records[0]["status"] = QUEUED
+    with open(store_path, "w") as f:
+        json.dump(records, f)
+
+    restarted = JobScheduler({"script": 1}, store_path=store_path)
+    assert restarted.get(job.id).status == INTERRUPTED
+    assert restarted.active_job("podcast") is None
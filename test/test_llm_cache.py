@@ -0,0 +1,55 @@
+import os
+import json
+import time
+
+# project imports
+from utils.llm_cache import LLMResponseCache, request_key
+
+
+def msgs(idx: int):
+    return [{"role": "user", "content": f"chapters {idx}"}]
+
+
+def test_request_key():
+    assert request_key(msgs(1), "model") == request_key([dict(msgs(1)[0])], "model")
+    assert request_key(msgs(1), "model") != request_key(msgs(2), "model")
+    assert request_key(msgs(1), "model") != request_key(msgs(1), "other model")
+
+def test_put_and_get(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    assert cache.get(msgs(1), "model") is None
+
+    cache.put(msgs(1), "model", "Speaker 1: hi", served_by="fallback")
+    assert cache.get(msgs(1), "model") == "Speaker 1: hi"
+    assert cache.get(msgs(1), "fallback") is None
+
+    cache.clear()
+    assert cache.get(msgs(1), "model") is None
+
+def test_expired_entries_are_removed(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), ttl_s=60)
+    cache.put(msgs(1), "model", "old")
+    path = tmp_path / f"{request_key(msgs(1), 'model')}.json"
+    entry = json.loads(path.read_text())
+    entry["created_at"] -= 1000
+    path.write_text(json.dumps(entry))
+
+    assert cache.get(msgs(1), "model") is None
+    assert not path.exists()
+
+def test_evicts_the_least_recently_used(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    for idx in range(3):
+        cache.put(msgs(idx), "model", "x" * 1000)
+        # distinct access times
+        path = tmp_path / f"{request_key(msgs(idx), 'model')}.json"
+        os.utime(path, (time.time() - 100 + idx, time.time() - 100 + idx))
+
+    # the oldest entry is used again
+    assert cache.get(msgs(0), "model") is not None
+    entry_bytes = os.path.getsize(tmp_path / f"{request_key(msgs(0), 'model')}.json")
+    # room for 3 entries, the timestamps make the entry sizes differ by a few bytes
+    cache.max_bytes = 3 * entry_bytes + entry_bytes // 2
+    cache.put(msgs(3), "model", "x" * 1000)
+
+    assert [cache.get(msgs(idx), "model") is not None for idx in range(4)] == [True, False, True, True]
@@ -0,0 +1,192 @@
+import json
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+openai = pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+# project imports
+from configs.default import DefaultLLMParams
+from utils.llm_cache import LLMResponseCache
+from utils.llm_client import BASE_URL_ENV, LLMCancelled, LLMClient, LLMError
+
+MSGS = [{"role": "user", "content": "write a podcast script"}]
+
+
+class StubServer:
+    """
+    local OpenAI compatible chat completions server. the responses of each model are
+    scripted as a queue of (status, text) pairs, the last one is repeated.
+    """
+
+    def __init__(self):
+        self.responses = defaultdict(lambda: deque([(200, "Speaker 1: hello\n")]))
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(body)
+                queue = stub.responses[body["model"]]
+                status, text = queue.popleft() if len(queue) > 1 else queue[0]
+                if status != 200:
+                    self._send(status, "application/json", json.dumps({"error": {"message": text}}).encode())
+                elif body.get("stream"):
+                    self._stream(body["model"], text)
+                else:
+                    self._send(200, "application/json", json.dumps({
+                        "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+                    }).encode())
+
+            def _send(self, status, content_type, data):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                chunks = [
+                    {"choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                    for word in text.split(" ")
+                ]
+                for idx in range(len(chunks) - 1):
+                    chunks[idx]["choices"][0]["delta"]["content"] += " "
+                chunks.append({"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": len(chunks), "total_tokens": 7 + len(chunks)}})
+                try:
+                    for chunk in chunks:
+                        chunk.update({"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": model})
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+@pytest.fixture
+def make_client(stub, monkeypatch):
+    monkeypatch.setenv(BASE_URL_ENV, stub.url)
+    clients = []
+
+    def make(cache=None, **params):
+        params = {"max_retries": 2, "backoff_s": 0.01, "max_backoff_s": 0.02, "fallback_models": ["fallback"], "max_fallbacks": 1, **params}
+        client = LLMClient(DefaultLLMParams(**params), api_key="test", cache=cache)
+        client.available_models = ["primary", "fallback"]
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_complete_records_latency_and_tokens(stub, make_client):
+    client = make_client()
+    result = client.complete(MSGS, "primary")
+
+    assert result.content == "Speaker 1: hello\n"
+    assert result.model == "primary"
+    assert (result.prompt_tokens, result.completion_tokens, result.attempts) == (7, 3, 1)
+    summary = client.metrics_summary()["models"]["primary"]
+    assert summary["requests"] == 1 and summary["errors"] == 0
+    assert summary["prompt_tokens"] == 7 and summary["completion_tokens"] == 3
+
+def test_transient_errors_are_retried_with_backoff(stub, make_client):
+    stub.responses["primary"] = deque([(500, "overloaded"), (429, "rate limited"), (200, "Speaker 1: hi there\n")])
+    client = make_client()
+    result = client.complete(MSGS, "primary")
+
+    assert result.content == "Speaker 1: hi there\n"
+    assert result.attempts == 3
+    assert [metric.status for metric in client.metrics] == ["retry", "retry", "ok"]
+    assert client.metrics_summary()["models"]["primary"]["errors"] == 2
+
+def test_falls_back_to_the_next_model(stub, make_client):
+    stub.responses["primary"] = deque([(400, "bad request")])
+    stub.responses["fallback"] = deque([(200, "Speaker 2: from the fallback\n")])
+    client = make_client()
+    result = client.complete(MSGS, "primary")
+
+    assert result.model == "fallback"
+    # client errors are not retried on the same model
+    assert [request["model"] for request in stub.requests] == ["primary", "fallback"]
+
+def test_no_response_from_any_model(stub, make_client):
+    stub.responses["primary"] = deque([(500, "down")])
+    stub.responses["fallback"] = deque([(500, "down")])
+    client = make_client(max_retries=1)
+    with pytest.raises(LLMError):
+        client.complete(MSGS, "primary")
+    assert len(stub.requests) == 4
+
+def test_streams_deltas(stub, make_client):
+    stub.responses["primary"] = deque([(200, "Speaker 1: one two three\n")])
+    client = make_client()
+    deltas = []
+    result = client.complete(MSGS, "primary", on_delta=deltas.append)
+
+    assert "".join(deltas) == result.content == "Speaker 1: one two three\n"
+    assert len(deltas) > 1
+    assert result.completion_tokens == len(deltas)
+
+def test_cancelled_stream_is_closed_and_not_retried(stub, make_client, monkeypatch):
+    stub.responses["primary"] = deque([(200, "Speaker 1: " + "word " * 50)])
+    client = make_client()
+    closed = []
+    close = openai.AsyncStream.close
+
+    async def track_close(stream):
+        closed.append(stream)
+        await close(stream)
+
+    monkeypatch.setattr(openai.AsyncStream, "close", track_close)
+
+    def on_delta(text):
+        raise LLMCancelled("cancelled by the test")
+
+    with pytest.raises(LLMCancelled):
+        client.complete(MSGS, "primary", on_delta=on_delta)
+    assert len(stub.requests) == 1
+    assert [metric.status for metric in client.metrics] == ["cancelled"]
+    # the pooled connection is released right away
+    assert len(closed) == 1
+
+def test_responses_are_served_from_the_cache(stub, make_client, tmp_path):
+    client = make_client(cache=LLMResponseCache(str(tmp_path)))
+    first = client.complete(MSGS, "primary")
+    deltas = []
+    second = client.complete(MSGS, "primary", on_delta=deltas.append)
+
+    assert second.content == first.content == "".join(deltas)
+    assert len(stub.requests) == 1
+    assert client.metrics[-1].status == "cache"
+
+    client.complete(MSGS, "primary", use_cache=False)
+    assert len(stub.requests) == 2
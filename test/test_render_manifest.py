@@ -0,0 +1,80 @@
+import os
+
+# project imports
+from utils.render_manifest import RenderManifest, line_hash
+
+EMOTIONS = [0.3, 0.05, 0.05, 0.05, 0.05, 0.05]
+
+
+def render(manifest: RenderManifest, contents):
+    """
+    record every line as rendered, the segment file holds the line content
+    """
+    hashes = [line_hash(content, "voice", "voice-hash", EMOTIONS, "cfg") for content in contents]
+    for line_id, (content, hash_value) in enumerate(zip(contents, hashes)):
+        with open(manifest.segment_path(line_id), "w") as f:
+            f.write(content)
+        manifest.record(line_id, hash_value, content, "voice", EMOTIONS, "cfg")
+    return hashes
+
+def segment(manifest: RenderManifest, line_id: int) -> str:
+    with open(manifest.segment_path(line_id)) as f:
+        return f.read()
+
+
+def test_line_hash_depends_on_everything_rendered():
+    base = line_hash("hello", "voice", "voice-hash", EMOTIONS, "cfg")
+    assert base == line_hash("hello", "voice", "voice-hash", list(EMOTIONS), "cfg")
+    assert base != line_hash("hello!", "voice", "voice-hash", EMOTIONS, "cfg")
+    assert base != line_hash("hello", "other", "voice-hash", EMOTIONS, "cfg")
+    assert base != line_hash("hello", "voice", "edited", EMOTIONS, "cfg")
+    assert base != line_hash("hello", "voice", "voice-hash", [0.9] + EMOTIONS[1:], "cfg")
+    assert base != line_hash("hello", "voice", "voice-hash", EMOTIONS, "cfg 2")
+    assert base != line_hash("hello", "voice", "voice-hash", EMOTIONS, "cfg", prev_hash="prev")
+
+def test_save_and_load(tmp_path):
+    manifest = RenderManifest(str(tmp_path))
+    hashes = render(manifest, ["a", "b"])
+    manifest.save()
+
+    loaded = RenderManifest.load(str(tmp_path))
+    assert loaded.is_rendered(0, hashes[0]) and loaded.is_rendered(1, hashes[1])
+    assert not loaded.is_rendered(1, hashes[0])
+    assert not loaded.is_rendered(2, hashes[0])
+
+    os.remove(loaded.segment_path(1))
+    assert not loaded.is_rendered(1, hashes[1])
+
+def test_load_missing_or_corrupted(tmp_path):
+    assert RenderManifest.load(str(tmp_path)).lines == []
+    (tmp_path / "manifest.json").write_text("{not json")
+    assert RenderManifest.load(str(tmp_path)).lines == []
+
+def test_reconcile_relocates_moved_lines(tmp_path):
+    manifest = RenderManifest(str(tmp_path))
+    old_hashes = render(manifest, ["a", "b", "c"])
+    new_line = line_hash("new", "voice", "voice-hash", EMOTIONS, "cfg")
+
+    # insert a line at the front and drop "b"
+    rendered = manifest.reconcile([new_line, old_hashes[0], old_hashes[2]])
+
+    assert rendered == {1, 2}
+    assert segment(manifest, 1) == "a" and segment(manifest, 2) == "c"
+    assert manifest.is_rendered(1, old_hashes[0]) and manifest.is_rendered(2, old_hashes[2])
+    assert not manifest.is_rendered(0, new_line)
+    assert not any(name.endswith(".move") for name in os.listdir(tmp_path))
+
+def test_reconcile_swapped_lines(tmp_path):
+    manifest = RenderManifest(str(tmp_path))
+    hashes = render(manifest, ["a", "b"])
+
+    assert manifest.reconcile([hashes[1], hashes[0]]) == {0, 1}
+    assert segment(manifest, 0) == "b" and segment(manifest, 1) == "a"
+
+def test_truncate(tmp_path):
+    manifest = RenderManifest(str(tmp_path))
+    hashes = render(manifest, ["a", "b", "c"])
+    manifest.truncate(1)
+
+    assert len(manifest.lines) == 1
+    assert not manifest.is_rendered(1, hashes[1])
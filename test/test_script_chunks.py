@@ -0,0 +1,43 @@
+import pytest
+
+# project imports
+from utils.script_chunks import section_hint, section_minutes, split_chapters
+
+
+def test_split_chapters_at_paragraphs():
+    chapters = "\n\n".join(["a" * 40, "b" * 40, "c" * 40])
+
+    assert split_chapters(chapters, 0) == [chapters]
+    assert split_chapters(chapters, 1000) == [chapters]
+    assert split_chapters(chapters, 90) == ["a" * 40 + "\n\n" + "b" * 40, "c" * 40]
+
+def test_split_long_paragraphs():
+    sections = split_chapters("First sentence. " * 10 + "\n\n" + "x" * 50, 40)
+
+    assert all(len(section) <= 40 for section in sections)
+    assert sections[-1] == "x" * 10
+
+@pytest.mark.parametrize("lengths, podcast_len", [
+    ([100, 100, 100], 10),
+    ([100, 200, 700], 7.3),
+    ([1, 1, 1, 1000], 3),
+    ([0, 0], 1),
+    ([100] * 7, 1),
+])
+def test_section_minutes_add_up(lengths, podcast_len):
+    minutes = section_minutes(["x" * length for length in lengths], podcast_len)
+
+    assert round(sum(minutes), 6) == podcast_len
+    assert all(minute >= min(0.5, podcast_len // 0.1 // len(lengths) / 10) for minute in minutes)
+
+def test_section_minutes_proportional():
+    assert section_minutes(["x" * 100, "x" * 300], 11) == [3.0, 8.0]
+
+def test_section_hint():
+    sections = ["intro text", "middle text", "end text"]
+
+    assert "Start the episode" in section_hint(0, sections, 2)
+    assert "next part will discuss: middle text" in section_hint(0, sections, 2)
+    middle = section_hint(1, sections, 2)
+    assert "previous part discussed: ...intro text" in middle and "end text" in middle
+    assert "end the episode" in section_hint(2, sections, 2)
@@ -0,0 +1,57 @@
+# project imports
+from utils.script_parser import ScriptParser, parse_script
+from utils.script_store import default_emotions
+
+EMOTIONS = "[0.3, 0.05, 0.05, 0.05, 0.05, 0.05]"
+
+
+def test_parses_the_prompted_format():
+    rows, errors = parse_script(f"Speaker 1: Emotion: {EMOTIONS}: context: Welcome to the show!")
+
+    assert errors == []
+    assert len(rows) == 1
+    assert (rows[0].speaker, rows[0].speaker_id, rows[0].content) == ("Speaker 1", 1, "Welcome to the show!")
+    assert rows[0].emotions_arr == [0.3, 0.05, 0.05, 0.05, 0.05, 0.05]
+
+def test_parses_llm_variations():
+    text = "\n".join([
+        "- **Speaker 1**: hello",
+        "1. Speaker 2: numbered",
+        "2) [Speaker 1]: numbered with a bracket",
+        "SPEAKER_2 - Emotions=[0.1,0.1,0.1,0.1,0.1,0.1], text: upper case",
+        "Speaker1: no space",
+    ])
+    rows, errors = parse_script(text)
+
+    assert errors == []
+    assert [(row.speaker_id, row.content) for row in rows] == [
+        (1, "hello"), (2, "numbered"), (1, "numbered with a bracket"), (2, "upper case"), (1, "no space"),
+    ]
+    assert rows[0].emotions_arr == default_emotions()
+
+def test_keeps_the_written_speaker_label():
+    rows, _ = parse_script("Host 1 (Alice): hi\nguest 2: hello\nspk3: hey")
+    assert [row.speaker for row in rows] == ["Host 1", "Guest 2", "Speaker 3"]
+
+def test_reports_malformed_speaker_lines():
+    text = "\n".join([
+        "Here is your podcast script:",
+        "**Speaker**: no id",
+        "Line 4 - Speaker 1: speaker not at the start",
+        "Speaker 1: Emotion: [0.1, 0.2]: too few emotions",
+        "Speaker 2: Emotion: [a, b, c, d, e, f]: not numbers",
+        "Speaker 1:",
+        "Speaker 2: valid",
+    ])
+    rows, errors = parse_script(text)
+
+    assert [row.content for row in rows] == ["valid"]
+    assert [error.line_no for error in errors] == [1, 2, 3, 4, 5]
+
+def test_feed_returns_lines_once_complete():
+    parser = ScriptParser()
+    assert parser.feed("Speaker 1: hel") == []
+    assert parser.feed("lo\nSpeaker 2: wor")[0].content == "hello"
+    assert parser.feed("ld") == []
+    assert [row.content for row in parser.close()] == ["world"]
+    assert parser.close() == []
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+# project imports
+from utils.script_store import ScriptRow, ScriptStore, default_emotions, normalize_emotions
+
+EMOTIONS = [0.3, 0.05, 0.05, 0.05, 0.05, 0.05]
+
+
+def row(speaker_id: int, content: str, speaker: str = None) -> ScriptRow:
+    return ScriptRow(speaker or f"Speaker {speaker_id}", speaker_id, content, list(EMOTIONS))
+
+def contents(store: ScriptStore):
+    return [line.content for line in store]
+
+
+def test_round_trips_lines():
+    lines = [row(1, "hello"), row(2, "héllo wörld"), row(1, "")]
+    store = ScriptStore.from_lines(lines)
+
+    assert len(store) == 3
+    assert list(store) == lines
+    assert store[-1] == lines[-1]
+    assert store[1:] == lines[1:]
+    with pytest.raises(IndexError):
+        store[3]
+
+def test_edits():
+    store = ScriptStore.from_lines([row(1, "a"), row(2, "b"), row(1, "c")])
+    store.insert(1, row(2, "inserted"))
+    store.update(0, row(2, "updated"))
+    store.delete(2)
+    store.append(row(1, "appended"))
+    store.insert(len(store), row(2, "at the end"))
+
+    assert contents(store) == ["updated", "inserted", "c", "appended", "at the end"]
+    assert [line.speaker_id for line in store] == [2, 2, 1, 1, 2]
+    with pytest.raises(IndexError):
+        store.update(5, row(1, "out of range"))
+    with pytest.raises(IndexError):
+        store.insert(6, row(1, "out of range"))
+
+def test_keeps_speaker_labels():
+    store = ScriptStore.from_lines([row(1, "a", "Host 1"), row(2, "b", "Guest 2")])
+    store.insert(1, row(3, "c", "Host 3"))
+    store.delete(0)
+
+    assert [line.speaker for line in store] == ["Host 3", "Guest 2"]
+    assert [line["speaker"] for line in ScriptStore.from_dicts(store.to_dicts()).to_dicts()] == ["Host 3", "Guest 2"]
+
+def test_from_dicts_fills_missing_fields():
+    store = ScriptStore.from_dicts([
+        {"speaker_id": 2, "content": "no label, no emotions"},
+        {"speaker_id": "1", "content": "short emotions", "emotion_arr": [0.9]},
+    ])
+
+    assert store[0].speaker == "Speaker 2"
+    assert store[0].emotions_arr == default_emotions()
+    assert store[1].speaker_id == 1
+    assert store[1].emotions_arr == normalize_emotions([0.9])
+    assert store[1].emotions_arr[0] == 0.9
+    assert ScriptStore.from_dicts(None).to_dicts() == []
+
+def test_version_and_json_cache():
+    store = ScriptStore.from_lines([row(1, "a")])
+    etag, json_bytes = store.etag, store.to_json()
+
+    assert store.to_json() is json_bytes
+    assert json.loads(json_bytes) == store.to_dicts()
+
+    store.append(row(2, "b"))
+    assert store.etag != etag
+    assert json.loads(store.to_json())[-1]["content"] == "b"
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import struct
+import threading
+from typing import AsyncIterator, Optional, Set, Tuple
+
+import torch
+
+# data size used in the header of a wav stream whose length is not known yet
+STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+
+
+def wav_header(sampling_rate: int, num_channels: int = 1, bits_per_sample: int = 16, data_size: int = STREAMING_DATA_SIZE) -> bytes:
+    """
+    build a 44 byte RIFF / WAVE header for 16 bit PCM audio
+
+    Args:
+        sampling_rate (int): sampling rate of the audio
+        num_channels (int, optional): no. of channels. Defaults to 1.
+        bits_per_sample (int, optional): bits per sample. Defaults to 16.
+        data_size (int, optional): size of the PCM data in bytes. Defaults to the max size for streams.
+
+    Returns:
+        bytes: wav header
+    """
+    byte_rate = sampling_rate * num_channels * bits_per_sample // 8
+    block_align = num_channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, num_channels, sampling_rate, byte_rate, block_align, bits_per_sample,
+        b"data", data_size,
+    )
+
+def wav_to_pcm16(wav: torch.Tensor) -> bytes:
+    """
+    convert a float waveform [channels, samples] to interleaved 16 bit PCM bytes
+    """
+    pcm = (wav.detach().float().clamp(-1.0, 1.0) * 32767.0).to(torch.int16)
+    return pcm.t().contiguous().cpu().numpy().tobytes()
+
+
+class PodcastAudioStream:
+    """
+    podcast audio that grows line by line while the podcast is rendering.
+
+    The PCM data lives in the file written by the incremental wav writer, the stream
+    only tracks how many bytes are available. http clients read the audio rendered so
+    far from the file and wait for new lines on their event loop, the render wakes them
+    with call_soon_threadsafe.
+    """
+
+    def __init__(self, sampling_rate: int, pcm_path: str, num_channels: int = 1, data_offset: int = 44):
+        self.sampling_rate = sampling_rate
+        self.pcm_path = pcm_path
+        self.num_channels = num_channels
+        self.data_offset = data_offset
+
+        self._available = 0
+        self._finished = False
+        self.error: Optional[str] = None
+        self._cond = threading.Condition()
+        # (loop, event) of the async readers waiting for new bytes
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def available_bytes(self) -> int:
+        with self._cond:
+            return self._available
+
+    @property
+    def finished(self) -> bool:
+        with self._cond:
+            return self._finished
+
+    def extend(self, num_bytes: int) -> None:
+        """
+        notify that num_bytes more PCM bytes of the next line were written to the file
+        """
+        with self._cond:
+            self._available += num_bytes
+            self._cond.notify_all()
+            self._wake_waiters()
+
+    def finish(self, pcm_path: Optional[str] = None, error: Optional[str] = None) -> None:
+        """
+        mark the stream as complete, no more lines will be appended
+
+        Args:
+            pcm_path (Optional[str], optional): new location of the file once it was moved. Defaults to None.
+            error (Optional[str], optional): why the render stopped, when it failed. Defaults to None.
+        """
+        with self._cond:
+            if pcm_path is not None:
+                self.pcm_path = pcm_path
+            self.error = error
+            self._finished = True
+            self._cond.notify_all()
+            self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        # called with _cond held
+        for loop, event in list(self._waiters):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # the reader loop is closed
+                self._waiters.discard((loop, event))
+
+    def wait_for_bytes(self, offset: int, timeout: Optional[float] = None) -> Tuple[int, bool]:
+        """
+        block until more than offset bytes are available or the stream is finished
+
+        Returns:
+            Tuple[int, bool]: no. of available bytes, whether the stream is finished
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: offset < self._available or self._finished, timeout=timeout)
+            return self._available, self._finished
+
+    async def iter_wav(self, timeout: float = 5.0, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+        """
+        async iterator over the streamed wav file: header first, then the PCM rendered so far
+        """
+        yield wav_header(self.sampling_rate, self.num_channels)
+
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            self._waiters.add(waiter)
+        new_bytes = waiter[1]
+
+        sent = 0
+        f = None
+        try:
+            while True:
+                # cleared before reading the state, so bytes added in between wake the next wait
+                new_bytes.clear()
+                with self._cond:
+                    available, finished = self._available, self._finished
+                if available <= sent and not finished:
+                    try:
+                        await asyncio.wait_for(new_bytes.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                if available > sent:
+                    if f is None:
+                        # the open handle stays valid when the finished file is moved to final.wav
+                        with self._cond:
+                            pcm_path = self.pcm_path
+                        f = open(pcm_path, "rb")
+                    f.seek(self.data_offset + sent)
+                    data = f.read(min(available - sent, chunk_size))
+                    if not data:
+                        break
+                    sent += len(data)
+                    yield data
+                elif finished:
+                    if self.error is not None:
+                        logging.info(f"Audio stream ended early, the render failed: {self.error}")
+                    break
+        except FileNotFoundError:
+            logging.info(f"Audio stream file removed: {self.pcm_path}")
+        finally:
+            with self._cond:
+                self._waiters.discard(waiter)
+            if f is not None:
+                f.close()
@@ -0,0 +1,78 @@
+from typing import List, Sequence
+
+import torch
+
+
+def bucket_lines_by_length(
+        texts: Sequence[str],
+        max_batch_size: int,
+        policy: str = "length",
+        max_length_ratio: float = 1.5,
+    ) -> List[List[int]]:
+    """
+    group script lines into batches for a single generate call
+
+    Args:
+        texts (Sequence[str]): text content of each script line
+        max_batch_size (int): max no. of lines in a batch
+        policy (str, optional): "none" batches lines in script order,
+            "length" batches lines of similar text length to reduce conditioning padding. Defaults to "length".
+        max_length_ratio (float, optional): max ratio between the longest and shortest
+            text in a batch when using the "length" policy. Defaults to 1.5.
+
+    Returns:
+        List[List[int]]: batches of line indices
+    """
+    if max_batch_size < 1:
+        raise ValueError(f"max_batch_size must be >= 1 but provided {max_batch_size}")
+
+    if policy == "none":
+        indices = list(range(len(texts)))
+        return [indices[i:i + max_batch_size] for i in range(0, len(indices), max_batch_size)]
+
+    if policy != "length":
+        raise ValueError(f"Unknown length bucketing policy: {policy}")
+
+    # sort by length and cut a new batch once it is full or the lengths diverge too much
+    order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+    batches = []
+    batch = []
+    for idx in order:
+        if batch:
+            shortest = max(len(texts[batch[0]]), 1)
+            if len(batch) >= max_batch_size or len(texts[idx]) / shortest > max_length_ratio:
+                batches.append(batch)
+                batch = []
+        batch.append(idx)
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+def stack_conditioning(conditionings: List[torch.Tensor]) -> torch.Tensor:
+    """
+    stack per-line prefix conditionings into one batched conditioning
+
+    Each conditioning is the [2, seq_len, d_model] (cond, uncond) output of `prepare_conditioning`.
+    Shorter conditionings are left padded with zeros so the audio tokens of every line start at
+    the same position. The result is laid out as [cond_1 .. cond_B, uncond_1 .. uncond_B]
+    which is the layout expected by the model for classifier free guidance.
+
+    Args:
+        conditionings (List[torch.Tensor]): per-line prefix conditionings
+
+    Returns:
+        torch.Tensor: batched prefix conditioning of shape [2 * B, max_seq_len, d_model]
+    """
+    max_len = max(cond.shape[1] for cond in conditionings)
+    padded = []
+    for cond in conditionings:
+        pad_len = max_len - cond.shape[1]
+        if pad_len > 0:
+            padding = cond.new_zeros((cond.shape[0], pad_len, cond.shape[2]))
+            cond = torch.cat([padding, cond], dim=1)
+        padded.append(cond)
+
+    cond_rows = [cond[:1] for cond in padded]
+    uncond_rows = [cond[1:] for cond in padded]
+    return torch.cat(cond_rows + uncond_rows, dim=0)
@@ -0,0 +1,140 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+import torch
+from zonos.conditioning import make_cond_dict
+
+
+class ConditioningCache:
+    """
+    caches the parts of the prefix conditioning that do not depend on the line text.
+
+    The prefix conditioner embeds every conditioning key separately and only then
+    projects the concatenated embeddings. Per-voice keys (speaker embedding, vqscore_8,
+    fmax, pitch_std, language etc.) are embedded once per voice, emotion vectors are
+    memoized since scripts reuse a handful of them, and only the text (espeak)
+    embedding is computed for every line.
+    """
+
+    def __init__(self, model, max_emotions: int = 256):
+        self.model = model
+        self.max_emotions = max_emotions
+
+        self._voice_parts: Dict[str, Dict] = {}
+        self._uncond_parts: Dict[str, torch.Tensor] = {}
+        self._emotion_parts: "OrderedDict[tuple, torch.Tensor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def _prefix_conditioner(self):
+        return self.model.prefix_conditioner
+
+    @torch.no_grad()
+    def prepare_voice(self, voice_name: str, speaker_embedding, voice_config: Dict, device: str) -> None:
+        """
+        precompute the static conditioning embeddings of a voice
+
+        Args:
+            voice_name (str): name of the voice
+            speaker_embedding (_type_): speaker embedding of the voice
+            voice_config (Dict): speaker params of the voice
+            device (str): device
+        """
+        cond_dict = make_cond_dict(
+            text="",
+            language=voice_config["language_code"],
+            speaker=speaker_embedding,
+            vqscore_8=voice_config["vq_tensor"],
+            fmax=voice_config["fmax"],
+            pitch_std=voice_config["pitch_std"],
+            speaking_rate=voice_config["speaking_rate"],
+            dnsmos_ovrl=voice_config["dnsmos_ovrl"],
+            speaker_noised=voice_config["speaker_noised_bool"],
+            device=device,
+            unconditional_keys=voice_config["uncond_keys"],
+        )
+
+        parts = {}
+        for conditioner in self._prefix_conditioner.conditioners:
+            if conditioner.name in ("espeak", "emotion"):
+                continue
+            parts[conditioner.name] = conditioner(cond_dict.get(conditioner.name))
+
+        with self._lock:
+            self._voice_parts[voice_name] = {
+                "parts": parts,
+                "language": voice_config["language_code"],
+                "skip_emotion": "emotion" in voice_config["uncond_keys"],
+                "device": device,
+            }
+        logging.info(f"Prepared static conditioning for voice: {voice_name}")
+
+    def _uncond_part(self, conditioner) -> torch.Tensor:
+        with self._lock:
+            part = self._uncond_parts.get(conditioner.name)
+        if part is None:
+            part = conditioner(None)
+            with self._lock:
+                self._uncond_parts[conditioner.name] = part
+        return part
+
+    def _emotion_part(self, conditioner, emotions: Sequence[float], device: str) -> torch.Tensor:
+        key = tuple(float(value) for value in emotions)
+        with self._lock:
+            part = self._emotion_parts.get(key)
+            if part is not None:
+                self._emotion_parts.move_to_end(key)
+                return part
+
+        # same normalization as make_cond_dict
+        emotion = torch.tensor(key, device=device).view(1, 1, -1)
+        emotion = emotion / emotion.sum(dim=-1, keepdim=True)
+        part = conditioner(emotion)
+
+        with self._lock:
+            self._emotion_parts[key] = part
+            while len(self._emotion_parts) > self.max_emotions:
+                self._emotion_parts.popitem(last=False)
+        return part
+
+    def _combine(self, parts: List[torch.Tensor]) -> torch.Tensor:
+        max_bsz = max(part.shape[0] for part in parts)
+        parts = [part.expand(max_bsz, -1, -1) for part in parts]
+        return self._prefix_conditioner.norm(self._prefix_conditioner.project(torch.cat(parts, dim=-2)))
+
+    @torch.no_grad()
+    def prepare_conditioning(self, voice_name: str, text: str, emotions: Sequence[float]) -> torch.Tensor:
+        """
+        build the prefix conditioning of a line from the cached voice and emotion embeddings
+
+        Args:
+            voice_name (str): name of a voice prepared with `prepare_voice`
+            text (str): line text
+            emotions (Sequence[float]): emotion vector of the line
+
+        Returns:
+            torch.Tensor: prefix conditioning of shape [2, seq_len, d_model] (cond, uncond)
+        """
+        with self._lock:
+            voice = self._voice_parts.get(voice_name)
+        if voice is None:
+            raise ValueError(f"Conditioning for voice: {voice_name} not prepared!!")
+
+        required_keys = self._prefix_conditioner.required_keys
+        cond_parts = []
+        uncond_parts = []
+        for conditioner in self._prefix_conditioner.conditioners:
+            if conditioner.name == "espeak":
+                part = conditioner(([text], [voice["language"]]))
+            elif conditioner.name == "emotion":
+                part = conditioner(None) if voice["skip_emotion"] else self._emotion_part(conditioner, emotions, voice["device"])
+            else:
+                part = voice["parts"][conditioner.name]
+
+            cond_parts.append(part)
+            # the unconditional branch only keeps the required keys (the text)
+            uncond_parts.append(part if conditioner.name in required_keys else self._uncond_part(conditioner))
+
+        return torch.cat([self._combine(cond_parts), self._combine(uncond_parts)])
@@ -0,0 +1,205 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import torch
+
+
+def hash_file_content(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    compute the sha256 hash of a file's content
+
+    Args:
+        filepath (str): path to the file
+        chunk_size (int, optional): bytes read per iteration. Defaults to 1MB.
+
+    Returns:
+        str: hex digest of the file content
+    """
+    sha = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class SpeakerEmbeddingCache:
+    """
+    two level cache (in-memory LRU + on-disk tensor store) for speaker embeddings.
+
+    Embeddings are keyed by the content hash of the voice file and the TTS model type,
+    so renaming a voice file keeps its embedding while editing the audio gives it a new key.
+    Voice files with the same audio share an entry, so entries are never dropped per file:
+    on-disk entries unused for ttl_s are removed and the least recently used ones are
+    evicted beyond max_disk_items. The atime of an entry file is its last use.
+    """
+
+    def __init__(
+            self,
+            model_type: str,
+            cache_dir: str = "cache/speaker_embeddings",
+            max_items: int = 32,
+            variant: str = "",
+            ttl_s: float = 30 * 24 * 3600,
+            max_disk_items: int = 1024,
+        ):
+        self.model_type = model_type
+        # embeddings computed differently from the same file (e.g. reference window) get their own keys
+        self.variant = variant
+        self.cache_dir = Path(cache_dir)
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+        self.max_disk_items = max_disk_items
+
+        self._memory: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        # voice filepath -> (mtime, size, content hash) to avoid re-hashing unchanged files
+        self._file_hashes: Dict[str, Tuple[float, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _model_tag(self) -> str:
+        tag = self.model_type.replace("/", "--")
+        return f"{tag}_{self.variant}" if self.variant else tag
+
+    def _cache_key(self, content_hash: str) -> str:
+        return f"{content_hash}_{self._model_tag()}"
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pt"
+
+    def content_hash(self, voice_filepath: str) -> str:
+        """
+        content hash of a voice file, memoized on (mtime, size)
+        """
+        stat = os.stat(voice_filepath)
+        with self._lock:
+            memo = self._file_hashes.get(voice_filepath)
+        if memo is not None and memo[0] == stat.st_mtime and memo[1] == stat.st_size:
+            return memo[2]
+
+        content_hash = hash_file_content(voice_filepath)
+        with self._lock:
+            self._file_hashes[voice_filepath] = (stat.st_mtime, stat.st_size, content_hash)
+        return content_hash
+
+    def is_cached(self, content_hash: str) -> bool:
+        """
+        whether the embedding of a voice with this content hash is cached, without loading it
+        """
+        key = self._cache_key(content_hash)
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._disk_path(key).exists()
+
+    def _remember(self, key: str, embedding: torch.Tensor) -> None:
+        with self._lock:
+            self._memory[key] = embedding
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _touch(self, disk_path: Path) -> None:
+        # mark the entry as recently used, the mtime keeps the write time
+        try:
+            os.utime(disk_path, (time.time(), disk_path.stat().st_mtime))
+        except OSError:
+            pass
+
+    def lookup(self, voice_filepath: str, device: Optional[str] = None) -> Optional[torch.Tensor]:
+        """
+        fetch a cached embedding from memory or disk without computing it
+
+        Returns:
+            Optional[torch.Tensor]: speaker embedding or None on cache miss
+        """
+        key = self._cache_key(self.content_hash(voice_filepath))
+        self._touch(self._disk_path(key))
+
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+
+        if embedding is None:
+            disk_path = self._disk_path(key)
+            if not disk_path.exists():
+                return None
+            try:
+                embedding = torch.load(disk_path, map_location="cpu")
+            except Exception as e:
+                logging.warning(f"Corrupted speaker embedding cache file {disk_path}: {e}. Recomputing.")
+                disk_path.unlink(missing_ok=True)
+                return None
+            if device is not None:
+                embedding = embedding.to(device)
+            self._remember(key, embedding)
+
+        return embedding.to(device) if device is not None else embedding
+
+    def store(self, voice_filepath: str, embedding: torch.Tensor) -> None:
+        """
+        store an embedding in memory and persist it to the on-disk tensor store
+        """
+        key = self._cache_key(self.content_hash(voice_filepath))
+        self._remember(key, embedding)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        disk_path = self._disk_path(key)
+        tmp_path = disk_path.with_suffix(".pt.tmp")
+        torch.save(embedding.detach().cpu(), tmp_path)
+        os.replace(tmp_path, disk_path)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """
+        remove the on-disk entries unused for ttl_s and the least recently used ones beyond max_disk_items.
+        entries of deleted voices are dropped this way too.
+        """
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.pt"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_atime > self.ttl_s:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, path))
+
+        # least recently used entries first
+        for _, path in sorted(entries)[:max(0, len(entries) - self.max_disk_items)]:
+            path.unlink(missing_ok=True)
+
+    def get(
+            self,
+            voice_filepath: str,
+            compute_fn: Callable[[str], torch.Tensor],
+            device: Optional[str] = None,
+        ) -> torch.Tensor:
+        """
+        get the speaker embedding for a voice file, computing and caching it on a miss
+
+        Args:
+            voice_filepath (str): path where voice file is stored
+            compute_fn (Callable[[str], torch.Tensor]): computes the embedding from the voice filepath
+            device (Optional[str], optional): device the embedding is returned on. Defaults to None.
+
+        Returns:
+            torch.Tensor: speaker embedding
+        """
+        embedding = self.lookup(voice_filepath, device)
+        if embedding is not None:
+            return embedding
+
+        logging.info(f"Speaker embedding cache miss for: {voice_filepath}")
+        embedding = compute_fn(voice_filepath)
+        if device is not None:
+            embedding = embedding.to(device)
+        self.store(voice_filepath, embedding)
+        return embedding
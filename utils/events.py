@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+# pushed to subscribers when the bus is closed
+CLOSED = None
+
+
+class Subscription:
+    """
+    bounded event buffer of a single client. when the client falls behind the oldest
+    events are dropped, the latest event always carries the full podcast state.
+    """
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, max_events: int = 32):
+        self.channel = channel
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_events)
+        self.num_dropped = 0
+
+    def put(self, event: Optional[Dict]) -> None:
+        # runs on the subscriber event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.num_dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        wait for the next event
+
+        Raises:
+            asyncio.TimeoutError: no event within timeout seconds
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+
+
+class EventBus:
+    """
+    per-podcast publish / subscribe channels.
+
+    the engine publishes from worker threads, subscribers are sse handlers awaiting
+    events on the web app event loop. events are handed over to the subscriber loop
+    with call_soon_threadsafe so publishing never blocks the render.
+    """
+
+    def __init__(self, max_events: int = 32):
+        self.max_events = max_events
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        """
+        subscribe to a channel, must be called from a running event loop
+        """
+        subscription = Subscription(str(channel), asyncio.get_running_loop(), self.max_events)
+        with self._lock:
+            self._subscriptions[subscription.channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if len(subscriptions) == 0:
+                del self._subscriptions[subscription.channel]
+
+        if subscription.num_dropped > 0:
+            logging.info(f"Subscriber of {subscription.channel} dropped {subscription.num_dropped} events")
+
+    def num_subscribers(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(str(channel), ()))
+
+    def publish(self, channel: str, event: Dict) -> None:
+        """
+        publish an event to all subscribers of a channel, safe to call from any thread
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(str(channel), ()))
+
+        for subscription in subscriptions:
+            self._deliver(subscription, event)
+
+    def close(self) -> None:
+        """
+        wake up all subscribers so their streams end
+        """
+        with self._lock:
+            subscriptions = [sub for subs in self._subscriptions.values() for sub in subs]
+
+        for subscription in subscriptions:
+            self._deliver(subscription, CLOSED)
+
+    def _deliver(self, subscription: Subscription, event: Optional[Dict]) -> None:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+        except RuntimeError:
+            # the subscriber loop is closed
+            self.unsubscribe(subscription)
@@ -0,0 +1,275 @@
+import os
+import json
+import tempfile
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted" # job was queued or running when the app stopped
+RESUMED = "resumed" # interrupted job that was queued again as a new job after a restart
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+@dataclass
+class Job:
+    kind: str
+    podcast_uuid: str
+    params: Dict = field(default_factory=dict) # json arguments needed to queue the job again after a restart
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ""
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATES
+
+    def update(self, progress: Optional[float] = None, message: Optional[str] = None) -> None:
+        """
+        report job progress (0 to 1) from inside the job function
+        """
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, float(progress)))
+        if message is not None:
+            self.message = message
+
+    def to_dict(self) -> Dict:
+        # asdict would deep copy the cancel event, which holds a lock
+        return {job_field.name: getattr(self, job_field.name) for job_field in fields(self) if job_field.name != "cancel_event"}
+
+
+class JobScheduler:
+    """
+    runs script and render jobs on per-kind worker pools.
+
+    Script generation is network bound and render jobs are compute bound, so each job
+    kind gets its own pool and jobs of different kinds run concurrently. Jobs are keyed
+    by podcast uuid, only one active job per (podcast, kind) is allowed. Job records are
+    persisted to a json file so their status survives a restart. Jobs that were queued or
+    running when the app stopped are marked interrupted and can be queued again with resume().
+    """
+
+    def __init__(self, pool_sizes: Dict[str, int], store_path: str = "cache/jobs.json", max_history: int = 500):
+        self.store_path = Path(store_path)
+        self.max_history = max_history
+
+        self._executors = {
+            kind: ThreadPoolExecutor(max_workers=max(1, num_workers), thread_name_prefix=f"{kind}-worker")
+            for kind, num_workers in pool_sizes.items()
+        }
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # serializes writes of the job records, snapshots are taken under _lock
+        self._persist_lock = threading.Lock()
+        # ids of the jobs cancelled by shutdown(), they end up interrupted rather than cancelled
+        self._interrupted_ids = set()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.store_path.exists():
+            return
+
+        try:
+            with open(self.store_path, "r") as f:
+                records = json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not load job records from {self.store_path}: {e}")
+            return
+
+        for record in records:
+            job = Job(**record)
+            if job.is_active:
+                # the app crashed or was killed, shutdown() did not get to mark the job
+                self._mark_interrupted(job)
+            self._jobs[job.id] = job
+
+        logging.info(f"Loaded {len(self._jobs)} job records from {self.store_path}")
+
+    @staticmethod
+    def _mark_interrupted(job: Job) -> None:
+        job.status = INTERRUPTED
+        job.message = "app stopped before the job finished"
+        job.finished_at = time.time()
+
+    def _persist(self) -> None:
+        # the snapshot is taken under the write lock, so the last write always holds the latest state
+        with self._persist_lock:
+            with self._lock:
+                jobs = sorted(self._jobs.values(), key=lambda job: job.created_at)
+                # drop the oldest finished jobs
+                finished = [job for job in jobs if not job.is_active]
+                for job in finished[:max(0, len(jobs) - self.max_history)]:
+                    del self._jobs[job.id]
+                records = [job.to_dict() for job in self._jobs.values()]
+
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=self.store_path.parent, suffix=".tmp", delete=False) as f:
+                json.dump(records, f)
+            os.replace(f.name, self.store_path)
+
+    def _active_job_locked(self, podcast_uuid: str, kind: Optional[str] = None) -> Optional[Job]:
+        for job in self._jobs.values():
+            if job.podcast_uuid == podcast_uuid and job.is_active and (kind is None or job.kind == kind):
+                return job
+        return None
+
+    def active_job(self, podcast_uuid: str, kind: Optional[str] = None) -> Optional[Job]:
+        with self._lock:
+            return self._active_job_locked(podcast_uuid, kind)
+
+    def submit(self, kind: str, podcast_uuid: str, fn: Callable[[Job], object], params: Optional[Dict] = None) -> Optional[Job]:
+        """
+        queue a job. fn receives the job to report progress and check for cancellation.
+        params are persisted with the job record, so the job can be queued again by resume().
+
+        Returns:
+            Optional[Job]: the queued job or None if the podcast already has an active job of that kind
+        """
+        if kind not in self._executors:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        # check and insert at once, concurrent submits must not both pass the check
+        with self._lock:
+            if self._active_job_locked(podcast_uuid, kind) is not None:
+                logging.info(f"A {kind} job is already queued or running for podcast: {podcast_uuid} !!")
+                return None
+            job = Job(kind=kind, podcast_uuid=podcast_uuid, params=dict(params or {}))
+            self._jobs[job.id] = job
+        self._persist()
+
+        self._executors[kind].submit(self._run, job, fn)
+        logging.info(f"Queued {kind} job: {job.id} for podcast: {podcast_uuid}")
+        return job
+
+    def _cancelled_status(self, job: Job) -> str:
+        return INTERRUPTED if job.id in self._interrupted_ids else CANCELLED
+
+    def _run(self, job: Job, fn: Callable[[Job], object]) -> None:
+        if job.cancelled:
+            job.status = self._cancelled_status(job)
+            job.finished_at = time.time()
+            self._persist()
+            return
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._persist()
+
+        try:
+            fn(job)
+            job.status = self._cancelled_status(job) if job.cancelled else COMPLETED
+            if job.status == COMPLETED:
+                job.progress = 1.0
+        except Exception as e:
+            logging.exception(f"{job.kind} job: {job.id} failed")
+            job.status = FAILED
+            job.error = str(e)
+
+        job.finished_at = time.time()
+        self._persist()
+        logging.info(f"{job.kind} job: {job.id} {job.status}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs_for_podcast(self, podcast_uuid: str) -> List[Job]:
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.podcast_uuid == podcast_uuid]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        request cancellation. queued jobs never start, running jobs stop at their next check.
+        """
+        job = self.get(job_id)
+        if job is None or not job.is_active:
+            return False
+
+        job.cancel_event.set()
+        logging.info(f"Cancellation requested for {job.kind} job: {job.id}")
+        return True
+
+    def resume(self, resubmit: Callable[[Job], Optional[Job]]) -> int:
+        """
+        queue the jobs interrupted by the last shutdown or crash again, oldest first.
+        resubmit gets the interrupted job record and queues a new job from its kind, podcast
+        uuid and params, it returns None when the job can not be queued anymore.
+
+        Returns:
+            int: no. of resumed jobs
+        """
+        with self._lock:
+            jobs = sorted(
+                [job for job in self._jobs.values() if job.status == INTERRUPTED],
+                key=lambda job: job.created_at,
+            )
+
+        num_resumed = 0
+        for job in jobs:
+            try:
+                new_job = resubmit(job)
+            except Exception as e:
+                logging.warning(f"Could not resume {job.kind} job: {job.id}: {e}")
+                new_job = None
+
+            if new_job is not None:
+                job.status = RESUMED
+                job.message = f"resumed as job {new_job.id}"
+                num_resumed += 1
+            else:
+                job.status = FAILED
+                job.error = "could not be resumed after a restart"
+        self._persist()
+
+        if len(jobs) > 0:
+            logging.info(f"Resumed {num_resumed} of {len(jobs)} interrupted jobs")
+        return num_resumed
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """
+        stop the worker pools. with cancel, running jobs are stopped at their next check and
+        queued jobs are dropped, both are recorded as interrupted so resume() can queue them again.
+        """
+        if cancel:
+            with self._lock:
+                jobs = [job for job in self._jobs.values() if job.is_active and not job.cancelled]
+                self._interrupted_ids.update(job.id for job in jobs)
+            for job in jobs:
+                job.cancel_event.set()
+
+        for executor in self._executors.values():
+            executor.shutdown(wait=True, cancel_futures=cancel)
+
+        # the futures of queued jobs were dropped, their records are still queued
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status != QUEUED:
+                    continue
+                if self._cancelled_status(job) == INTERRUPTED:
+                    self._mark_interrupted(job)
+                else:
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+        self._persist()
@@ -0,0 +1,70 @@
+import threading
+from typing import List, Optional
+
+# project imports
+from utils.util import ScriptLine
+
+
+class LiveScript:
+    """
+    podcast script that grows while the llm is still writing it.
+
+    The script job appends lines as they are parsed from the streamed response and the
+    render job waits for new lines, so voice over starts on the first line while the
+    rest of the script is generated.
+    """
+
+    def __init__(self, lines: Optional[List[ScriptLine]] = None, closed: bool = False):
+        self._lines: List[ScriptLine] = list(lines) if lines is not None else []
+        self._closed = closed
+        self._failed = False
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._lines)
+
+    def __getitem__(self, idx):
+        with self._cond:
+            return self._lines[idx]
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed
+
+    @property
+    def failed(self) -> bool:
+        with self._cond:
+            return self._failed
+
+    def lines(self) -> List[ScriptLine]:
+        with self._cond:
+            return list(self._lines)
+
+    def append(self, script_line: ScriptLine) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot add lines to a closed script")
+            self._lines.append(script_line)
+            self._cond.notify_all()
+
+    def close(self, failed: bool = False) -> None:
+        """
+        mark the script as complete. a failed script is not rendered to the end.
+        """
+        with self._cond:
+            self._closed = True
+            self._failed = failed
+            self._cond.notify_all()
+
+    def wait_for_lines(self, num_lines: int, timeout: Optional[float] = None) -> int:
+        """
+        block until the script has more than num_lines lines or is closed
+
+        Returns:
+            int: no. of lines in the script
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._lines) > num_lines or self._closed, timeout=timeout)
+            return len(self._lines)
@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def request_key(msgs: List[Dict], model: str) -> str:
+    """
+    content address of an llm request: hash of the full chat messages and the model
+    """
+    payload = json.dumps({"model": model, "msgs": msgs}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    persistent cache of llm responses keyed by the request content.
+
+    Each response is a json file in cache_dir. Entries older than ttl_s are ignored and
+    removed, and the least recently used entries are evicted once the cache grows beyond
+    max_bytes. The mtime of a file is its write time, the atime its last use.
+    """
+
+    def __init__(self, cache_dir: str = "cache/llm_responses", ttl_s: float = 7 * 24 * 3600, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, msgs: List[Dict], model: str) -> Optional[str]:
+        """
+        cached response content or None on a miss
+        """
+        path = self._path(request_key(msgs, model))
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Could not read cached LLM response {path}: {e}")
+            return None
+
+        if time.time() - entry["created_at"] > self.ttl_s:
+            with self._lock:
+                path.unlink(missing_ok=True)
+            return None
+
+        try:
+            # mark the entry as recently used, the mtime keeps the write time
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except OSError:
+            pass
+        return entry["content"]
+
+    def put(self, msgs: List[Dict], model: str, content: str, served_by: Optional[str] = None) -> None:
+        """
+        store a response
+
+        Args:
+            msgs (List[Dict]): chat messages of the request
+            model (str): requested model
+            content (str): response content
+            served_by (Optional[str], optional): model that produced the response, when a fallback model answered. Defaults to None.
+        """
+        key = request_key(msgs, model)
+        entry = {
+            "key": key,
+            "model": model,
+            "served_by": served_by or model,
+            "created_at": time.time(),
+            "content": content,
+        }
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path(key).with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl_s:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        # least recently used entries first
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
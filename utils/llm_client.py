@@ -0,0 +1,316 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import yaml
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, APIStatusError, RateLimitError
+
+# project imports
+from configs.default import DefaultLLMParams
+from utils.llm_cache import LLMResponseCache
+
+# overrides the base url, e.g. to run against a local OpenAI compatible server
+BASE_URL_ENV = "OPENROUTER_BASE_URL"
+
+
+def load_llm_models(path: str = "configs/llm_models.yaml") -> List[str]:
+    """
+    load the llm models offered in the ui
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r") as f:
+        data = yaml.safe_load(f) or {}
+    return list(data.get("openrouter_api", {}).get("models", []))
+
+
+class LLMError(RuntimeError):
+    """
+    raised when no model returned a response
+    """
+
+
+class LLMCancelled(Exception):
+    """
+    raised by an on_delta callback to stop a streamed request, it is not retried
+    """
+
+
+@dataclass
+class LLMResult:
+    content: str
+    model: str
+    latency_s: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 1
+
+
+@dataclass
+class LLMRequestMetric:
+    model: str
+    status: str # "ok", "cache", "empty", "retry" or "error"
+    latency_s: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+    timestamp: float = 0.0
+
+
+class LLMClient:
+    """
+    shared client for the OpenAI compatible chat api used for script generation.
+
+    A single AsyncOpenAI client with a pooled http connection runs on a background event
+    loop, so the script job workers (threads) and async code share connections. Requests
+    have timeouts, transient errors are retried with exponential backoff and the next
+    fallback model is tried when a model keeps failing or returns nothing. Responses are
+    served from the response cache when the same request was answered before.
+    """
+
+    def __init__(self, params: DefaultLLMParams, api_key: Optional[str] = None, cache: Optional[LLMResponseCache] = None):
+        self.params = params
+        self.api_key = api_key
+        self.cache = cache
+        self.base_url = os.environ.get(BASE_URL_ENV, params.base_url)
+        self.metrics = deque(maxlen=params.max_metrics)
+        # the models offered in the ui, fallbacks are picked from these
+        self.available_models = load_llm_models()
+
+        self._client: Optional[AsyncOpenAI] = None
+        self._metrics_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+    def _get_client(self) -> AsyncOpenAI:
+        # created lazily on the client loop, the api key may be set after startup
+        if self._client is None:
+            api_key = self.api_key or os.environ.get("OPENROUTER_API_KEY")
+            if not api_key:
+                raise EnvironmentError("The OPENROUTER_API_KEY environment variable is not set.")
+
+            http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.params.timeout_s, connect=self.params.connect_timeout_s),
+                limits=httpx.Limits(
+                    max_connections=self.params.max_connections,
+                    max_keepalive_connections=self.params.max_connections,
+                ),
+            )
+            self._client = AsyncOpenAI(
+                base_url=self.base_url,
+                api_key=api_key,
+                http_client=http_client,
+                max_retries=0, # retries and fallback are handled here
+            )
+        return self._client
+
+    def fallback_models(self, model: str) -> List[str]:
+        """
+        models to try in order, starting with the requested one. the preferred fallbacks come first,
+        then the other models of configs/llm_models.yaml, up to max_fallbacks. preferred fallbacks
+        that are no longer offered in the yaml are skipped.
+        """
+        models = [model]
+        for fallback in self.params.fallback_models + self.available_models:
+            if len(models) > self.params.max_fallbacks:
+                break
+            if fallback in models or (self.available_models and fallback not in self.available_models):
+                continue
+            models.append(fallback)
+        return models
+
+    def _record(self, metric: LLMRequestMetric) -> None:
+        metric.timestamp = time.time()
+        with self._metrics_lock:
+            self.metrics.append(metric)
+
+    def metrics_summary(self) -> Dict:
+        """
+        latency and token usage of the recent requests, per model
+        """
+        with self._metrics_lock:
+            metrics = list(self.metrics)
+
+        summary = {}
+        for metric in metrics:
+            model_summary = summary.setdefault(metric.model, {
+                "requests": 0, "errors": 0, "total_latency_s": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+            })
+            model_summary["requests"] += 1
+            model_summary["errors"] += metric.status not in ("ok", "cache")
+            model_summary["total_latency_s"] += metric.latency_s
+            model_summary["prompt_tokens"] += metric.prompt_tokens
+            model_summary["completion_tokens"] += metric.completion_tokens
+
+        for model_summary in summary.values():
+            model_summary["avg_latency_s"] = model_summary.pop("total_latency_s") / model_summary["requests"]
+        return {"models": summary, "recent": [asdict(metric) for metric in metrics[-20:]]}
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, (APITimeoutError, APIConnectionError, RateLimitError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+
+    def _backoff_s(self, attempt: int) -> float:
+        backoff_s = min(self.params.max_backoff_s, self.params.backoff_s * (2 ** attempt))
+        return backoff_s * (0.5 + random.random() / 2)
+
+    async def _request(self, model_name: str, msgs: List[Dict], on_delta: Optional[Callable[[str], None]], state: Dict, **kwargs):
+        client = self._get_client()
+        if on_delta is None:
+            completion = await client.chat.completions.create(
+                extra_headers={"X-Title": "Open-PodCraft"},
+                model=model_name,
+                messages=msgs,
+                **kwargs,
+            )
+            usage = getattr(completion, "usage", None)
+            content = completion.choices[0].message.content if completion.choices else None
+            return content, getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+        stream = await client.chat.completions.create(
+            extra_headers={"X-Title": "Open-PodCraft"},
+            model=model_name,
+            messages=msgs,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs,
+        )
+        parts = []
+        prompt_tokens, completion_tokens = 0, 0
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    prompt_tokens = chunk.usage.prompt_tokens or 0
+                    completion_tokens = chunk.usage.completion_tokens or 0
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+
+                text = chunk.choices[0].delta.content
+                parts.append(text)
+                state["emitted"] = True
+                on_delta(text)
+        finally:
+            # a cancelled or broken off stream would hold its pooled connection until garbage collection
+            await stream.close()
+        return "".join(parts), prompt_tokens, completion_tokens
+
+    async def acomplete(
+            self, 
+            msgs: List[Dict], 
+            model: str, 
+            on_delta: Optional[Callable[[str], None]] = None, 
+            use_cache: bool = True, 
+            **kwargs,
+        ) -> LLMResult:
+        """
+        chat completion with retries and model fallback
+
+        Args:
+            msgs (List[Dict]): chat messages
+            model (str): preferred model
+            on_delta (Optional[Callable[[str], None]], optional): stream the response, called with each text delta. Defaults to None.
+            use_cache (bool, optional): serve the response from the cache if possible, a new response is cached either way. Defaults to True.
+
+        Raises:
+            LLMError: none of the models returned a response, or a streamed response broke off
+
+        Returns:
+            LLMResult: response content along with the model that produced it
+        """
+        if self.cache is not None and use_cache:
+            content = self.cache.get(msgs, model)
+            if content is not None:
+                self._record(LLMRequestMetric(model, "cache", 0.0))
+                logging.info(f"LLM response of {model} served from the cache")
+                if on_delta is not None:
+                    on_delta(content)
+                return LLMResult(content, model, 0.0, attempts=0)
+
+        attempts = 0
+        last_error = None
+        # once text was streamed to the caller, a retry would repeat it
+        state = {"emitted": False}
+        for model_name in self.fallback_models(model):
+            for retry in range(self.params.max_retries + 1):
+                attempts += 1
+                start_t = time.perf_counter()
+                try:
+                    content, prompt_tokens, completion_tokens = await self._request(model_name, msgs, on_delta, state, **kwargs)
+                except LLMCancelled:
+                    self._record(LLMRequestMetric(model_name, "cancelled", time.perf_counter() - start_t))
+                    raise
+                except Exception as e:
+                    latency_s = time.perf_counter() - start_t
+                    last_error = e
+                    if state["emitted"]:
+                        self._record(LLMRequestMetric(model_name, "error", latency_s, error=str(e)))
+                        raise LLMError(f"Response stream from {model_name} broke off: {e}") from e
+
+                    transient = self._is_transient(e) and retry < self.params.max_retries
+                    self._record(LLMRequestMetric(model_name, "retry" if transient else "error", latency_s, error=str(e)))
+                    if not transient:
+                        logging.info(f"LLM request to {model_name} failed: {e}")
+                        break
+
+                    backoff_s = self._backoff_s(retry)
+                    logging.info(f"LLM request to {model_name} failed: {e}. Retrying in {backoff_s:.1f}s")
+                    await asyncio.sleep(backoff_s)
+                    continue
+
+                latency_s = time.perf_counter() - start_t
+                if content is None or len(content) < 2:
+                    last_error = LLMError(f"Empty response from {model_name}")
+                    self._record(LLMRequestMetric(model_name, "empty", latency_s, prompt_tokens, completion_tokens))
+                    logging.info(f"Did not receive a response from {model_name}")
+                    break
+
+                self._record(LLMRequestMetric(model_name, "ok", latency_s, prompt_tokens, completion_tokens))
+                if self.cache is not None:
+                    self.cache.put(msgs, model, content, served_by=model_name)
+                logging.info(
+                    f"LLM response received from {model_name} in {latency_s:.1f}s "
+                    f"({prompt_tokens} prompt tokens, {completion_tokens} completion tokens)"
+                )
+                return LLMResult(content, model_name, latency_s, prompt_tokens, completion_tokens, attempts)
+
+            if model_name != self.fallback_models(model)[-1]:
+                logging.info(f"Falling back to the next model after {model_name} failed")
+
+        raise LLMError(f"No response from models {self.fallback_models(model)}: {last_error}")
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """
+        schedule a coroutine on the client loop from a worker thread
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        run a coroutine on the client loop from a worker thread and wait for its result
+        """
+        return self.submit(coro).result(timeout)
+
+    def complete(self, msgs: List[Dict], model: str, on_delta: Optional[Callable[[str], None]] = None, use_cache: bool = True, **kwargs) -> LLMResult:
+        """
+        blocking version of acomplete for the script job workers.
+        on_delta is called from the client loop thread and must not block.
+        """
+        return self.run(self.acomplete(msgs, model, on_delta, use_cache, **kwargs))
+
+    def close(self) -> None:
+        if self._client is not None:
+            self.run(self._client.close(), timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
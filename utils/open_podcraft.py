@@ -4,46 +4,74 @@ import sys
 import torch
 import torchaudio
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Union
 import logging
 import time
 import threading
+import asyncio
+import queue
 from dotenv import load_dotenv
 
 # fix package path for imports to work
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from openai import OpenAI
 from zonos.model import Zonos
-from zonos.conditioning import make_cond_dict
 
 # project imports
-from utils.util import process_script_from_txt, check_available_voices, ScriptLine, setup_logging, load_prompts, process_podcast_script_from_llm
+from utils.util import ScriptLine, setup_logging, load_prompts
+from utils.script_parser import ScriptParser, ScriptParseError
+from utils.script_store import ScriptStore
+from utils.embedding_cache import SpeakerEmbeddingCache
+from utils.voice_registry import VoiceRegistry
+from utils.voice_ingest import normalize_voice
+from utils.reference_audio import load_reference_audio
+from utils.batching import bucket_lines_by_length, stack_conditioning
+from utils.conditioning_cache import ConditioningCache
+from utils.audio_stream import PodcastAudioStream
+from utils.wav_writer import IncrementalWavWriter, assemble_wav_mmap
+from utils.job_queue import Job, JobScheduler
+from utils.session import PodcastSession, DEFAULT_VOICES, default_flags
+from utils.render_manifest import RenderManifest, config_hash, line_hash
+from utils.events import EventBus
+from utils.llm_client import LLMClient, LLMError, LLMCancelled
+from utils.llm_cache import LLMResponseCache
+from utils.live_script import LiveScript
+from utils.script_chunks import split_chapters, section_minutes, section_hint
 from configs.utils import load_config
 from configs.default import DefaultConfig
 
 load_dotenv()  # loads variables from .env
 setup_logging()
 
+CODE_FRAMES_PER_S = 86 # audio code frames per second of the zonos autoencoder
+SILENCE_TAIL_FRAMES = 17 # ~0.2s of trailing silence kept when a line is ended on silence
+
 class OpenPodCraft:
+    """
+    shared podcast engine: the tts model, caches and job workers.
+    per-podcast state lives in PodcastSession objects.
+    """
     def __init__(self):
 
         logging.info("Initializing OpenPodCraft...")
         
-        self.podcast_speaker_queue = []
-        self.chapters = None
-        prompts = load_prompts()
-        self.curr_prompt = prompts[0]
-        self.curr_podcast_uuid = None
+        self.prompts = load_prompts()
 
         self.config = load_config()
-        self.available_voices = check_available_voices(["static/voices", "static/voices/custom"])
+        # speaker embeddings are cached across podcast runs
+        voice_params = self.config.voice_params
+        self.embedding_cache = SpeakerEmbeddingCache(
+            self.config.model_type,
+            variant=f"ref{voice_params.reference_window_s:g}s" if voice_params.reference_window_s > 0 else "",
+        )
+        # the voice library is indexed once and updated on upload, delete and by the watcher
+        self.voices = VoiceRegistry(self.config.voice_params.voice_dirs, self.embedding_cache)
+        self.voices.start_watcher(self.config.voice_params.watch_interval_s)
+        self.available_voices = self.voices
         
         # self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
-        self.llm_model_type = "google/gemini-2.0-flash-thinking-exp:free" #"deepseek/deepseek-chat:free" #"deepseek/deepseek-r1:free"
-
         # TTS model from Zyphra
         logging.info(f"Initializing TTS model: {self.config.model_type}")
         logging.info(f"On the first run, the TTS models are downloaded, which may take around 10 minutes.")
@@ -51,88 +79,45 @@ class OpenPodCraft:
         self.model.bfloat16()
         self.model.eval()
 
-        self.voices = {}
-        self.audio_buffers = []
-        self.silence_audio_path = "assets/voices/silence_100ms.wav"
+        self.conditioning_cache = ConditioningCache(self.model)
 
-        self.thread_queue = []
-        self.flags = {
-            "is_generating_script": False,
-            "is_script_available": False,
-            "is_generating_podcast": False,
-            "is_podcast_available": False,
-            "interupt_generation": False
-        }
-        self.user_prompt = None
-        self.num_speakers = 2
-        self.podcast_len = 10 # mins
-
-        # TODO: imeplement gui to change this
-        # setting default voices
-        self.set_voice(1, "zonos_britishmale_amped")
-        self.set_voice(2, "zonos_britishfemale")
+        self.silence_audio_path = "assets/voices/silence_100ms.wav"
+        self.prefix_codes_cache = {}
+        self.silence_tokens = None
+
+        # render and script jobs run on the scheduler worker pools
+        self.model_lock = threading.Lock()
+        self.scheduler = JobScheduler({
+            "script": self.config.job_params.script_workers,
+            "render": self.config.job_params.render_workers,
+            "voice": self.config.job_params.voice_workers,
+        })
+        # progress of each podcast is pushed to its ui subscribers
+        self.events = EventBus()
+        # shared llm connection pool for all script jobs
+        llm_params = self.config.llm_params
+        llm_cache = LLMResponseCache(ttl_s=llm_params.cache_ttl_s, max_bytes=llm_params.cache_max_mb * 1024 * 1024) if llm_params.cache_responses else None
+        self.llm_client = LLMClient(llm_params, cache=llm_cache)
 
         torch.manual_seed(421)
-    
-    def reset(self):
+
+    def create_session(self, podcast_uuid:str) -> PodcastSession:
         """
-        reset the podcast info stored in variables
+        create a podcast session with the default prompt and voices
         """
-
-        self.podcast_speaker_queue = []
-        self.chapters = None
-        self.curr_podcast_uuid = None
-
-        self.available_voices = check_available_voices(["static/voices", "static/voices/custom"])
-        self.audio_buffers = []
-
-        self.flags = {
-            "is_generating_script": False,
-            "is_script_available": False,
-            "is_generating_podcast": False,
-            "is_podcast_available": False,
-            "interupt_generation": False
-        }
-
+        session = PodcastSession(podcast_uuid, self.prompts[0])
+        for speaker_id, voice_name in DEFAULT_VOICES.items():
+            if voice_name in self.available_voices:
+                session.set_voice(speaker_id, voice_name, self.available_voices)
+        return session
     
-    def set_voice(self, speaker_id:int, voice_name:str):
-
-        if not isinstance(speaker_id, int):
-            raise ValueError(f"Speaker ID must be of type int but provided {type(speaker_id)}")
-
-        if not voice_name in self.available_voices:
-            raise ValueError(f"{voice_name} voice not found!!")
-        
-        self.voices[speaker_id] = voice_name
-    
-    def get_podcast_script_as_dict(self) -> List[Dict]:
-        queue = []
-        for script_line in self.podcast_speaker_queue:
-            queue.append(
-                {
-                    "speaker": script_line.speaker,
-                    "speaker_id": script_line.speaker_id,
-                    "content": script_line.content,
-                    "emotion_arr": script_line.emotions_arr
-                }
-            )
-        return queue      
-
-    def set_podcast_script_from_dict(self, dict_script_queue:List[Dict]) -> None:
-
-        if len(dict_script_queue) > 0:
-            self.podcast_speaker_queue = []
-            for script_dict in dict_script_queue:
-                self.podcast_speaker_queue.append(
-                    ScriptLine(
-                        speaker = script_dict["speaker"],
-                        speaker_id = script_dict["speaker_id"],
-                        content = script_dict["content"],
-                        emotions_arr = script_dict["emotion_arr"],
-                    )
-                )  
-
-            self.flags["is_script_available"]  = True 
+    def publish_state(self, session:PodcastSession, event:str, **data):
+        """
+        push a state transition of a podcast to its subscribers, along with the current flags
+        """
+        if session is None:
+            return
+        self.events.publish(session.podcast_uuid, {"event": event, **session.flags, **data})
     
     def generate_chapters(self, files:List, context:str, prompt:str) -> str:
         raise NotImplementedError("Generating chapters from files not yet implemented !!")
@@ -144,25 +129,128 @@ class OpenPodCraft:
             user_prompt:str = None, 
             podcast_len:int = 10,
             num_speakers:int = 2,
-            llm_model_type:str = "deepseek/deepseek-r1:free"
+            llm_model_type:str = "deepseek/deepseek-r1:free",
+            job:Job = None,
+            session:PodcastSession = None,
+            on_line:Callable = None,
+            force_regenerate:bool = False,
         ):
+        """
+        generate the podcast script with the LLM.
+        the response is streamed and script lines are published as soon as they are complete.
 
-        logging.info(f"Generating podcast script from API using model :{llm_model_type}")
+        Args:
+            on_line (Callable, optional): called with each script line as soon as it is parsed. Defaults to None.
+            force_regenerate (bool, optional): request a new script even if the same request was cached. Defaults to False.
 
-        self.podcast_speaker_queue = []
-        self.flags["is_script_available"] = False 
-        api_key = os.environ.get("OPENROUTER_API_KEY")
-        if not api_key:
-            raise EnvironmentError("The OPENROUTER_API_KEY environment variable is not set.")
+        Returns:
+            List[ScriptLine]: podcast script lines or None if the LLM did not respond or the job was cancelled
+        """
 
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-        )
+        logging.info(f"Generating podcast script from API using model :{llm_model_type}")
 
+        flags = session.flags if session is not None else default_flags()
+        speaker_queue = []
+        flags["is_script_available"] = False 
         if user_prompt is None:
             user_prompt = "No additonal requirements"
 
+        # long chapters are scripted in sections concurrently
+        sections = split_chapters(chapters, self.config.llm_params.section_chars)
+        if len(sections) > 1:
+            logging.info(f"Chapters split into {len(sections)} sections, generating their scripts concurrently")
+
+        logging.info(f"Requested response from: {str(llm_model_type)}")
+        logging.info("Waiting for LLM response. Please wait it might take several minutes !!")
+        flags["is_generating_script"] = True
+        self.publish_state(session, "script_started")
+        parser = ScriptParser()
+        # deltas are parsed on the llm client loop, the lines are handed over to this thread. live script
+        # updates and the render job submission (which writes the job records) never stall other streams
+        ready_lines = queue.Queue()
+
+        def on_delta(parse_fn:Callable, text:str):
+            # stops the streamed request once the script job is cancelled
+            if job is not None and job.cancelled:
+                raise LLMCancelled("script job cancelled")
+            queue_lines(parse_fn(text))
+
+        def queue_lines(script_lines:List[ScriptLine]):
+            if len(script_lines) > 0:
+                ready_lines.put(script_lines)
+
+        def wait_for_lines(future):
+            # add the lines as they arrive until the request is done
+            while True:
+                try:
+                    script_lines = ready_lines.get(timeout=0.1)
+                except queue.Empty:
+                    # lines are queued before the future is done
+                    if future.done() and ready_lines.empty():
+                        return future.result()
+                    continue
+                add_lines(script_lines)
+
+        def add_lines(script_lines:List[ScriptLine]):
+            for script_line in script_lines:
+                speaker_queue.append(script_line)
+                self.publish_state(
+                    session, "script_line", line=len(speaker_queue) - 1,
+                    speaker=script_line.speaker, speaker_id=script_line.speaker_id,
+                    content=script_line.content, emotion_arr=script_line.emotions_arr,
+                )
+                if on_line is not None:
+                    on_line(script_line)
+
+        try:
+            if len(sections) == 1:
+                msgs = self.build_script_msgs(chapters, prompt, user_prompt, podcast_len, num_speakers)
+                wait_for_lines(self.llm_client.submit(self.llm_client.acomplete(
+                    msgs, llm_model_type, on_delta=lambda text: on_delta(parser.feed, text), use_cache=not force_regenerate
+                )))
+                # the response may not end with a new line
+                add_lines(parser.close())
+                parse_errors = parser.errors
+            else:
+                parse_errors = wait_for_lines(self.llm_client.submit(self.generate_script_sections(
+                    sections, prompt, user_prompt, podcast_len, num_speakers, llm_model_type, queue_lines,
+                    use_cache=not force_regenerate, job=job,
+                )))
+        except LLMCancelled:
+            logging.info("Script generation cancelled !!")
+            flags["is_generating_script"] = False
+            self.publish_state(session, "script_cancelled")
+            return None
+        except LLMError as e:
+            logging.info(f"Did not receive a response from LLM: {e}. Try again !!")
+            flags["is_generating_script"] = False
+            self.publish_state(session, "script_failed")
+            return None
+        except Exception:
+            flags["is_generating_script"] = False
+            self.publish_state(session, "script_failed")
+            raise
+
+        flags["is_script_available"] = True if len(speaker_queue) > 0 else False
+        flags["is_generating_script"] = False
+        if len(parse_errors) > 0:
+            logging.info(f"Skipped {len(parse_errors)} malformed script lines")
+        logging.info(f"Generated podcast script with {len(speaker_queue)} lines")
+        self.publish_state(session, "script_finished", num_lines=len(speaker_queue), num_errors=len(parse_errors))
+        return speaker_queue
+
+    def build_script_msgs(
+            self, 
+            chapters:str, 
+            prompt:Dict, 
+            user_prompt:str, 
+            podcast_len, 
+            num_speakers, 
+            section_hint:str = None,
+        ) -> List[Dict]:
+        """
+        chat messages requesting the podcast script of the chapters (or a section of them)
+        """
         # create msg
         msgs = [
             {
@@ -178,52 +266,92 @@ class OpenPodCraft:
                 "content": f"Prompt: \n {prompt['context']} \n Additonal Requirements (strict): {str(user_prompt)} \n \n end of prompt"
             }
         ]
+        if section_hint is not None:
+            msgs.append({
+                "role": "user",
+                "content": f"Continuity (strict): \n {section_hint} \n end of continuity"
+            })
+        return msgs
+
+    async def generate_script_sections(
+            self,
+            sections:List[str],
+            prompt:Dict,
+            user_prompt:str,
+            podcast_len,
+            num_speakers,
+            llm_model_type:str,
+            add_lines:Callable,
+            use_cache:bool = True,
+            job:Job = None,
+        ) -> List[ScriptParseError]:
+        """
+        generate the scripts of the chapter sections concurrently (map) and stitch them in order (reduce).
+        lines are passed to add_lines in script order, add_lines must not block: lines of the first unfinished section as they
+        are streamed, lines of later sections once all sections before them are complete.
+        runs on the llm client loop.
 
-        logging.info(f"Requested response from: {str(llm_model_type)}")
-        logging.info("Waiting for LLM response. Please wait it might take several minutes !!")
-        self.flags["is_generating_script"] = True
-        completion = client.chat.completions.create(
-            extra_headers={
-                # "HTTP-Referer": "<YOUR_SITE_URL>", # Optional. Site URL for rankings on openrouter.ai.
-                "X-Title": "Open-PodCraft", # Optional. Site title for rankings on openrouter.ai.
-            },
-            extra_body={},
-            model=llm_model_type,
-            messages=msgs,
-        )
-        logging.info("LLM response received")
-
-        if completion.choices is None:
-            logging.info(f"Did not receive a response from LLM. Try again !!")
-            self.flags["is_generating_script"] = False
-            return False
-
-        llm_response = completion.choices[0].message.content
-        if llm_response is None or len(llm_response) < 2:
-            logging.info(f"Did not receive a response from LLM. Try again !!")
-            self.flags["is_generating_script"] = False
-            return False
-
-        # generate podcast script speaker queue  from raw llm response
-        process_podcast_script_from_llm(
-            llm_response,
-            queue = self.podcast_speaker_queue,
-        )
-
-        self.flags["is_script_available"] = True if len(self.podcast_speaker_queue) > 0 else False
-        self.flags["is_generating_script"] = False
-
-        print(self.podcast_speaker_queue)
-        if len(self.thread_queue) > 0:
-            self.thread_queue.pop()
-        return True
-
-    def fetch_speaker_info(self, speaker_queue:List[ScriptLine]):
+        Returns:
+            List[ScriptParseError]: malformed lines of all sections
+        """
+        num_sections = len(sections)
+        num_speakers = int(num_speakers)
+        minutes = section_minutes(sections, float(podcast_len))
+        parsers = [ScriptParser() for _ in sections]
+        section_lines = [[] for _ in sections]
+        finished = [False] * num_sections
+        next_section = 0
+        semaphore = asyncio.Semaphore(self.config.llm_params.max_parallel_sections)
+
+        def emit_ready_lines():
+            nonlocal next_section
+            while next_section < num_sections:
+                lines, section_lines[next_section] = section_lines[next_section], []
+                add_lines(lines)
+                if not finished[next_section]:
+                    break
+                next_section += 1
+
+        def on_delta(section_id:int, text:str):
+            if job is not None and job.cancelled:
+                raise LLMCancelled("script job cancelled")
+            section_lines[section_id].extend(parsers[section_id].feed(text))
+            if section_id == next_section:
+                emit_ready_lines()
+
+        async def generate_section(section_id:int):
+            async with semaphore:
+                start_t = time.perf_counter()
+                msgs = self.build_script_msgs(
+                    sections[section_id], prompt, user_prompt, minutes[section_id], num_speakers,
+                    section_hint=section_hint(section_id, sections, num_speakers),
+                )
+                await self.llm_client.acomplete(
+                    msgs, llm_model_type, on_delta=lambda text: on_delta(section_id, text), use_cache=use_cache
+                )
+                logging.info(f"Script of section {section_id + 1}/{num_sections} generated in {time.perf_counter() - start_t:.1f}s")
+
+            section_lines[section_id].extend(parsers[section_id].close())
+            finished[section_id] = True
+            emit_ready_lines()
+
+        tasks = [asyncio.ensure_future(generate_section(section_id)) for section_id in range(num_sections)]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            # a script with a missing section is not usable
+            for task in tasks:
+                task.cancel()
+            raise
+        return [error for parser in parsers for error in parser.errors]
+
+    def fetch_speaker_info(self, speaker_queue:List[ScriptLine], voices:Dict):
         """
         checks for speakers and asigned voices in the queue
 
         Args:
             speaker_queue (List[ScriptLine]): sequence of lines in the podcast corresponding to each speaker
+            voices (Dict): speaker id to voice name
 
         Returns:
             int, list: no. of sepakers, list of voice names
@@ -232,19 +360,21 @@ class OpenPodCraft:
         ids = set()
         voice_names = set()
         for script_line in speaker_queue:
-            if script_line.speaker_id not in self.voices:
-                raise ValueError(f"Speaker ID : {script_line.speaker_id} is not present in voices you have set! {self.voices}")
+            if script_line.speaker_id not in voices:
+                raise ValueError(f"Speaker ID : {script_line.speaker_id} is not present in voices you have set! {voices}")
             
             if not script_line.speaker_id in ids:
                 ids.add(script_line.speaker_id)
-                voice_names.add(self.voices[script_line.speaker_id])
+                voice_names.add(voices[script_line.speaker_id])
         
         return len(ids), voice_names
     
     def get_speaker_embedding(self, voice_filepath, model, device:torch.device):
         """
         get the speaker embedding from voice file (.wav, .mp3) 
-        to be used for audio generation
+        to be used for audio generation. embeddings are served from the
+        embedding cache and only computed when the voice file is new or changed.
+        long clips are embedded from their reference window with the most speech.
 
         Args:
             voice_filepath (str): path where voice file is stored
@@ -254,10 +384,17 @@ class OpenPodCraft:
         Returns:
             _type_: speaker embedding
         """
-        wav, sampling_rate = torchaudio.load(voice_filepath)
-        speaker_embedding = model.make_speaker_embedding(wav, sampling_rate)    
-        speaker_embedding = speaker_embedding.to(device)  
-        return speaker_embedding
+        voice_params = self.config.voice_params
+
+        def compute_embedding(filepath: str):
+            wav, sampling_rate = load_reference_audio(filepath, voice_params.reference_window_s, voice_params.vad_frame_ms)
+            # renders and voice ingests share the model
+            with self.model_lock:
+                return model.make_speaker_embedding(wav, sampling_rate)
+
+        embedding = self.embedding_cache.get(voice_filepath, compute_embedding, device)
+        self.voices.mark_embedded(voice_filepath)
+        return embedding
 
     def get_speaker_embeddings_and_params(self, voice_names, configs:Dict):
 
@@ -314,9 +451,32 @@ class OpenPodCraft:
 
         return speakers_embedding, speakers_params
     
+    def encode_audio_prefix(self, wav_prefix, sr_prefix:int):
+        """
+        encode a prefix waveform into audio prefix codes
+
+        Args:
+            wav_prefix (torch.Tensor): prefix waveform [channels, samples]
+            sr_prefix (int): sampling rate of the prefix waveform
+
+        Returns:
+            _type_: audio_prefix_codes
+        """
+        wav_prefix = wav_prefix.mean(0, keepdim=True)
+        if sr_prefix != self.model.autoencoder.sampling_rate:
+            wav_prefix = torchaudio.functional.resample(wav_prefix, sr_prefix, self.model.autoencoder.sampling_rate)
+        wav_prefix = wav_prefix.to(self.device, dtype=torch.float32)
+
+        with torch.autocast(self.device, dtype=torch.float32):
+            audio_prefix_codes = self.model.autoencoder.encode(wav_prefix.unsqueeze(0))
+        
+        return audio_prefix_codes
+
     def get_audio_prefix(self, prefix_audio_path: str, overlap_time_ms: int = 100):
         """
-        audio prefix is used for smooth transitioning of audio chunks
+        audio prefix is used for smooth transitioning of audio chunks.
+        prefix codes are cached per (path, mtime, overlap, sampling rate) since the
+        same prefix file is encoded for every line.
 
         Args:
             prefix_audio_path (str): path to prefix audio file
@@ -325,6 +485,11 @@ class OpenPodCraft:
         Returns:
             _type_: audio_prefix_codes
         """
+        sampling_rate = self.model.autoencoder.sampling_rate
+        cache_key = (str(prefix_audio_path), os.path.getmtime(prefix_audio_path), overlap_time_ms, sampling_rate)
+        audio_prefix_codes = self.prefix_codes_cache.get(cache_key)
+        if audio_prefix_codes is not None:
+            return audio_prefix_codes
 
         # get metadata of the audio file
         metadata = torchaudio.info(prefix_audio_path)
@@ -335,25 +500,170 @@ class OpenPodCraft:
 
         # load prefix audio with last overlap_time_s
         wav_prefix, sr_prefix = torchaudio.load(prefix_audio_path, frame_offset=frame_offset)
-        wav_prefix = wav_prefix.mean(0, keepdim=True)
-        wav_prefix = torchaudio.functional.resample(wav_prefix, sr_prefix, self.model.autoencoder.sampling_rate)
-        wav_prefix = wav_prefix.to(self.device, dtype=torch.float32)
+        audio_prefix_codes = self.encode_audio_prefix(wav_prefix, sr_prefix)
 
-        with torch.autocast(self.device, dtype=torch.float32):
-            audio_prefix_codes = self.model.autoencoder.encode(wav_prefix.unsqueeze(0))
-        
+        self.prefix_codes_cache[cache_key] = audio_prefix_codes
         return audio_prefix_codes
 
-    def generate_podcast(
-            self, 
-            speaker_queue:List[ScriptLine],            
-            output_dir:str,
-            audio_overlap_duration_ms: int = 500,
-        ):
+    def get_audio_prefix_from_wav(self, wav, overlap_time_ms: int = 100):
+        """
+        audio prefix from the tail of an already decoded waveform, kept in memory
+
+        Args:
+            wav (torch.Tensor): decoded waveform [channels, samples] at the model sampling rate
+            overlap_time_ms (int, optional): amount of time to overlap previous audio chunk. Defaults to 100.
+
+        Returns:
+            _type_: audio_prefix_codes
+        """
+        sampling_rate = self.model.autoencoder.sampling_rate
+        num_samples = int((overlap_time_ms / 1000) * sampling_rate)
+        return self.encode_audio_prefix(wav[:, -num_samples:], sampling_rate)
+
+    def prepare_line_conditioning(self, speaker_line:ScriptLine, voice_name:str):
+        """
+        build the prefix conditioning for a single podcast script line.
+        the voice and emotion parts are served from the conditioning cache,
+        only the text part is computed per line.
+
+        Args:
+            speaker_line (ScriptLine): script line to be voiced
+            voice_name (str): voice assigned to the line, prepared in the conditioning cache
+
+        Returns:
+            torch.Tensor: prefix conditioning of shape [2, seq_len, d_model]
+        """
+        return self.conditioning_cache.prepare_conditioning(voice_name, speaker_line.content, self.line_emotions(speaker_line))
+
+    def line_token_budget(self, text:str) -> int:
+        """
+        max new tokens of a line: the speech length of its text estimated from the speaking rate,
+        with a safety margin. short interjections do not pay for the full default budget.
+        """
+        gen_params = self.config.generation_params
+        num_chars = sum(char.isalnum() for char in text)
+        speech_s = num_chars * gen_params.phonemes_per_char / max(1, self.config.conditioning_params.speaking_rate)
+        budget_s = min(gen_params.max_line_s, max(gen_params.min_line_s, speech_s * gen_params.token_budget_margin))
+        return int(budget_s * CODE_FRAMES_PER_S)
+
+    def get_silence_tokens(self) -> torch.Tensor:
+        """
+        first codebook tokens of the encoded silence prefix audio, generated frames with these tokens are silent
+        """
+        if self.silence_tokens is None:
+            silence_codes = self.get_audio_prefix(self.silence_audio_path)
+            self.silence_tokens = torch.unique(silence_codes[:, 0])
+        return self.silence_tokens
+
+    def generate_codes(self, prefix_conditioning, audio_prefix_codes, batch_size:int = 1, max_new_tokens:int = CODE_FRAMES_PER_S * 30):
+        """
+        generate audio codes for a batch of lines and track where each line ends.
+        a line ends at its eos token or after silence_stop_s of silence. generation stops
+        once every line of the batch has ended.
+
+        Args:
+            prefix_conditioning (torch.Tensor): batched prefix conditioning [2 * batch_size, seq_len, d_model]
+            audio_prefix_codes (torch.Tensor): audio prefix codes [batch_size, n_codebooks, prefix_len]
+            batch_size (int, optional): no. of lines in the batch. Defaults to 1.
+            max_new_tokens (int, optional): token budget of the batch. Defaults to the model default of 30s.
 
-        num_speakers, voice_names = self.fetch_speaker_info(speaker_queue)
-        logging.info(f"{num_speakers} speakers are used in the podcast with the following voices {voice_names}")
+        Returns:
+            torch.Tensor, list: audio codes, no. of valid code frames for each line
+        """
+        prefix_len = 0 if audio_prefix_codes is None else audio_prefix_codes.shape[-1]
+        # code frame where each line ends and the step at which that was detected
+        end_steps = [None] * batch_size
+        done_steps = [None] * batch_size
+
+        silence_frames = int(self.config.generation_params.silence_stop_s * CODE_FRAMES_PER_S)
+        silence_tokens = self.get_silence_tokens() if silence_frames > 0 else None
+        silence_runs = [0] * batch_size
+        has_spoken = [False] * batch_size
+
+        def track_end(frame, step, max_steps):
+            # frame is [batch_size, n_codebooks, 1]. eos is only predicted by the first codebook
+            first_codes = frame[:, 0, 0]
+            eos_rows = (first_codes == self.model.eos_token_id).nonzero().flatten().tolist()
+            for row in eos_rows:
+                if end_steps[row] is None:
+                    end_steps[row] = done_steps[row] = step
+
+            if silence_tokens is not None:
+                is_silent = torch.isin(first_codes, silence_tokens.to(first_codes.device)).tolist()
+                for row in range(batch_size):
+                    if end_steps[row] is not None:
+                        continue
+                    # the silence of the audio prefix before the line starts does not count
+                    if not is_silent[row]:
+                        has_spoken[row] = True
+                        silence_runs[row] = 0
+                    elif has_spoken[row]:
+                        silence_runs[row] += 1
+                    if silence_runs[row] >= silence_frames:
+                        end_steps[row] = step - silence_runs[row] + min(silence_runs[row], SILENCE_TAIL_FRAMES)
+                        done_steps[row] = step
+
+            if any(done_step is None for done_step in done_steps):
+                return True
+            # the other codebooks are delayed by one step each, let them finish the last frames
+            return step < max(done_steps) + frame.shape[1]
+
+        codes = self.model.generate(
+            prefix_conditioning=prefix_conditioning,
+            audio_prefix_codes=audio_prefix_codes,
+            max_new_tokens=max_new_tokens,
+            # cfg_scale=config.generation_params.cfg_scale,
+            batch_size=batch_size,
+            # sampling_params=dict(min_p=config.generation_params.min_p),
+            callback=track_end,
+        )
+
+        num_frames = codes.shape[-1]
+        lengths = [num_frames if step is None else min(num_frames, prefix_len + step) for step in end_steps]
+        return codes, lengths
+
+    def line_emotions(self, speaker_line:ScriptLine):
+        """
+        emotion vector of a script line, the last two emotions (other, neutral) are fixed
+        """
+        return (
+            float(speaker_line.emotions_arr[0]), 
+            float(speaker_line.emotions_arr[1]), 
+            float(speaker_line.emotions_arr[2]), 
+            float(speaker_line.emotions_arr[3]), 
+            float(speaker_line.emotions_arr[4]), 
+            float(speaker_line.emotions_arr[5]), 
+            float(0.1), 
+            float(0.1)
+        )
+
+    def get_line_hashes(self, speaker_queue:List[ScriptLine], voices:Dict, prev_hash:str = "") -> List[str]:
+        """
+        hash the inputs of every line to find lines whose rendered output can be reused.
+        prev_hash is the hash of the line before the first one, when hashing a script in parts.
+        """
+        cfg_hash = config_hash(self.config)
+        voice_hashes = {}
+        hashes = []
+        for speaker_line in speaker_queue:
+            voice_name = voices[speaker_line.speaker_id]
+            if voice_name not in voice_hashes:
+                voice_hashes[voice_name] = self.embedding_cache.content_hash(str(self.available_voices[voice_name]))
+
+            hash_value = line_hash(
+                speaker_line.content, voice_name, voice_hashes[voice_name],
+                self.line_emotions(speaker_line), cfg_hash,
+                # a carried prefix makes every line depend on the line before it
+                prev_hash if self.config.render_params.carry_prefix else "",
+            )
+            hashes.append(hash_value)
+            prev_hash = hash_value
+        return hashes
 
+    def prepare_voices(self, voice_names):
+        """
+        prepare the speaker conditioning of the voices in the conditioning cache
+        """
         # make speakerembedding for each unique voice
         # TODO: make speaker params unique for each speaker
         # TODO: time this section
@@ -361,145 +671,458 @@ class OpenPodCraft:
         speakers_embedding, speakers_params = self.get_speaker_embeddings_and_params(
             voice_names, configs
         )
+        for voice_name in voice_names:
+            self.conditioning_cache.prepare_voice(
+                voice_name, speakers_embedding[voice_name], speakers_params[voice_name], self.device
+            )
+
+    def generate_podcast(
+            self, 
+            speaker_queue:Union[List[ScriptLine], LiveScript],
+            output_dir:str,
+            audio_overlap_duration_ms: int = 500,
+            voices:Dict = None,
+            job:Job = None,
+            session:PodcastSession = None,
+        ):
+        """
+        voice over the podcast script and assemble final.wav
+
+        Args:
+            speaker_queue (Union[List[ScriptLine], LiveScript]): script lines. lines of a live script
+                are rendered in order as the llm writes them
+            output_dir (str): podcast output directory
+        """
+        if voices is None:
+            voices = dict(session.voices) if session is not None else dict(DEFAULT_VOICES)
+        flags = session.flags if session is not None else default_flags()
+        render_params = self.config.render_params
+        sampling_rate = self.model.autoencoder.sampling_rate
+        final_path = os.path.join(output_dir, "final.wav")
+
+        live = isinstance(speaker_queue, LiveScript) and not speaker_queue.closed
+        if isinstance(speaker_queue, LiveScript) and not live:
+            speaker_queue = speaker_queue.lines()
+        if not live:
+            num_speakers, voice_names = self.fetch_speaker_info(speaker_queue, voices)
+            logging.info(f"{num_speakers} speakers are used in the podcast with the following voices {voice_names}")
+
+        # lines whose inputs did not change since the last render are reused from seq_{id}.wav
+        cfg_hash = config_hash(self.config)
+        manifest = RenderManifest.load(output_dir) if render_params.resume else RenderManifest(output_dir)
+        line_hashes = [] if live else self.get_line_hashes(speaker_queue, voices)
+        # after transcript edits rendered lines are matched by their inputs, not their position
+        cached_lines = manifest.reconcile(line_hashes) if render_params.resume and not live else set()
+        if not live:
+            manifest.truncate(len(speaker_queue))
+            manifest.save()
+        pending_lines = [line_id for line_id in range(len(line_hashes)) if line_id not in cached_lines]
+        if len(cached_lines) > 0:
+            logging.info(f"Reusing {len(cached_lines)} of {len(speaker_queue)} rendered lines from {output_dir}, rendering {len(pending_lines)} new or changed lines")
+
+        prepared_voices = {voices[speaker_queue[line_id].speaker_id] for line_id in pending_lines}
+        if len(prepared_voices) > 0:
+            self.prepare_voices(prepared_voices)
+
+        # group lines into batches rendered by a single generate call
+        if render_params.carry_prefix and render_params.max_batch_size > 1:
+            # every line needs the audio of the line before it
+            logging.info("carry_prefix renders lines one at a time. Ignoring max_batch_size!!")
+        max_batch_size = 1 if render_params.carry_prefix else render_params.max_batch_size
+        # streaming needs lines in script order so playback can start after the first batch
+        in_order = render_params.carry_prefix or render_params.stream_output or live
+        batches = bucket_lines_by_length(
+            [speaker_queue[line_id].content for line_id in pending_lines],
+            max_batch_size=max_batch_size,
+            policy="none" if in_order else render_params.length_bucketing,
+            max_length_ratio=render_params.max_length_ratio,
+        )
+        batches = [[pending_lines[idx] for idx in batch] for batch in batches]
+
+        def iter_live_batches(wait_timeout_s:float = 1.0):
+            # batches of the lines written so far. yields an empty batch while waiting for
+            # the llm so interrupts are checked and cached lines are flushed
+            nonlocal num_rendered
+            while True:
+                num_lines = speaker_queue.wait_for_lines(len(line_hashes), timeout=wait_timeout_s)
+                new_lines = [speaker_queue[line_id] for line_id in range(len(line_hashes), num_lines)]
+                if len(new_lines) == 0:
+                    if speaker_queue.closed:
+                        return
+                    yield []
+                    continue
+
+                new_voices = {voices[speaker_line.speaker_id] for speaker_line in new_lines} - prepared_voices
+                if len(new_voices) > 0:
+                    self.prepare_voices(new_voices)
+                    prepared_voices.update(new_voices)
+
+                start_id = len(line_hashes)
+                line_hashes.extend(self.get_line_hashes(new_lines, voices, line_hashes[-1] if start_id > 0 else ""))
+                new_pending = []
+                for line_id in range(start_id, num_lines):
+                    if render_params.resume and manifest.is_rendered(line_id, line_hashes[line_id]):
+                        cached_lines.add(line_id)
+                        num_rendered += 1
+                    else:
+                        new_pending.append(line_id)
+
+                if len(new_pending) == 0:
+                    yield []
+                for idx in range(0, len(new_pending), max_batch_size):
+                    yield new_pending[idx:idx + max_batch_size]
         
         # generating voice over for each line in the script
         prefix_audio_path = self.silence_audio_path
-        self.audio_buffers = []
-        self.flags["is_generating_podcast"] = True
-        self.flags["is_podcast_available"] = False
-        for line_id, speaker_line in enumerate(speaker_queue):
-            logging.info(f"Performing voice over for podcast script line: {line_id}")
-
-            if self.flags["interupt_generation"]:
-                self.flags["interupt_generation"] = False
+        prev_wav, prev_wav_line = None, None
+
+        # lines rendered in script order are appended to final.wav as they are produced,
+        # out of order lines are assembled from their seq_{id}.wav files through a memory map
+        assembly = render_params.assembly
+        if assembly == "auto":
+            assembly = "append" if in_order else "mmap"
+        writer = IncrementalWavWriter(final_path, sampling_rate) if assembly == "append" else None
+        if render_params.stream_output and writer is None:
+            logging.info("Streaming requires the append assembly. Podcast will not be streamed!!")
+
+        # audio_buffers only holds lines waiting for the lines before them to be appended
+        audio_buffers = {}
+        audio_stream = PodcastAudioStream(sampling_rate, writer.partial_path) if render_params.stream_output and writer is not None else None
+        if session is not None:
+            session.audio_stream = audio_stream
+        next_line_id = 0
+        num_rendered = len(cached_lines)
+
+        def flush_lines():
+            # append every line that is complete up to now in script order
+            nonlocal next_line_id
+            if writer is None:
                 return
-
-            start_t = time.perf_counter()
-            voice_name = self.voices[speaker_line.speaker_id]
-            speaker_embedding = speakers_embedding[voice_name]
-            voice_config = speakers_params[voice_name]
-
-            emotion_tensor = torch.tensor(
-                [[
-                    float(speaker_line.emotions_arr[0]), 
-                    float(speaker_line.emotions_arr[1]), 
-                    float(speaker_line.emotions_arr[2]), 
-                    float(speaker_line.emotions_arr[3]), 
-                    float(speaker_line.emotions_arr[4]), 
-                    float(speaker_line.emotions_arr[5]), 
-                    float(0.1), 
-                    float(0.1)
-                ]], 
-                    device=self.device
-            )
-            
-            cond_dict = make_cond_dict(
-                text=speaker_line.content,
-                language=voice_config["language_code"],
-                speaker=speaker_embedding,
-                emotion=emotion_tensor,
-                vqscore_8=voice_config["vq_tensor"],
-                fmax=voice_config["fmax"],
-                pitch_std=voice_config["pitch_std"],
-                speaking_rate=voice_config["speaking_rate"],
-                dnsmos_ovrl=voice_config["dnsmos_ovrl"],
-                speaker_noised=voice_config["speaker_noised_bool"],
-                device=self.device,
-                unconditional_keys=voice_config["uncond_keys"],
-            )
-            conditioning = self.model.prepare_conditioning(cond_dict)
-
-            audio_prefix_codes = self.get_audio_prefix(prefix_audio_path, audio_overlap_duration_ms)
-            # generating the audio
-            codes = self.model.generate(
-                prefix_conditioning=conditioning,
-                audio_prefix_codes=audio_prefix_codes,
-                # max_new_tokens=max_new_tokens,
-                # cfg_scale=config.generation_params.cfg_scale,
-                # batch_size=1,
-                # sampling_params=dict(min_p=config.generation_params.min_p),
-            )
-
-            if self.flags["interupt_generation"]:
-                self.flags["interupt_generation"] = False
+            while next_line_id < len(speaker_queue):
+                if next_line_id in audio_buffers:
+                    wav = audio_buffers.pop(next_line_id)
+                elif next_line_id in cached_lines:
+                    wav, _ = torchaudio.load(manifest.segment_path(next_line_id))
+                else:
+                    break
+                num_bytes = writer.write(wav)
+                if audio_stream is not None:
+                    audio_stream.extend(num_bytes)
+                next_line_id += 1
+            if audio_stream is not None and next_line_id > 0 and not flags["is_podcast_streaming"]:
+                flags["is_podcast_streaming"] = True
+                self.publish_state(session, "render_streaming")
+
+        flags["is_generating_podcast"] = True
+        render_error = "render failed"
+        try:
+            flags["is_podcast_available"] = False
+            flags["is_podcast_streaming"] = False
+            self.publish_state(session, "render_started", num_lines=len(speaker_queue), num_cached=len(cached_lines))
+            render_start_t = time.perf_counter()
+            flush_lines()
+            for batch in (iter_live_batches() if live else batches):
+                if self.is_interrupted(flags, job):
+                    manifest.save()
+                    self.abort_final_audio(flags, audio_stream, writer)
+                    self.publish_state(session, "render_cancelled")
+                    return
+
+                if len(batch) == 0:
+                    flush_lines()
+                    continue
+                logging.info(f"Performing voice over for podcast script lines: {batch}")
+
+                start_t = time.perf_counter()
+                conditionings = []
+                for line_id in batch:
+                    speaker_line = speaker_queue[line_id]
+                    conditionings.append(
+                        self.prepare_line_conditioning(speaker_line, voices[speaker_line.speaker_id])
+                    )
+                prefix_conditioning = stack_conditioning(conditionings)
+                # the batch runs until its longest line is done
+                max_new_tokens = max(self.line_token_budget(speaker_queue[line_id].content) for line_id in batch)
+
+                # with carry_prefix batches hold a single line
+                carried = render_params.carry_prefix and batch[0] > 0
+                if carried:
+                    if prev_wav_line != batch[0] - 1:
+                        prev_wav, _ = torchaudio.load(manifest.segment_path(batch[0] - 1))
+                    audio_prefix_codes = self.get_audio_prefix_from_wav(prev_wav, audio_overlap_duration_ms)
+                else:
+                    audio_prefix_codes = self.get_audio_prefix(prefix_audio_path, audio_overlap_duration_ms)
+                audio_prefix_codes = audio_prefix_codes.expand(len(batch), -1, -1)
+                # generating the audio. the model is shared by all render workers
+                with self.model_lock:
+                    codes, lengths = self.generate_codes(prefix_conditioning, audio_prefix_codes, len(batch), max_new_tokens)
+
+                if self.is_interrupted(flags, job):
+                    manifest.save()
+                    self.abort_final_audio(flags, audio_stream, writer)
+                    self.publish_state(session, "render_cancelled")
+                    return
+
+                with self.model_lock:
+                    wavs = self.model.autoencoder.decode(codes).cpu()
+                samples_per_frame = wavs.shape[-1] // codes.shape[-1]
+                # a carried prefix is the tail of the previous line, drop it to not repeat it
+                start_sample = audio_prefix_codes.shape[-1] * samples_per_frame if carried else 0
+                for row, line_id in enumerate(batch):
+                    # lines that finished early are padded up to the longest line in the batch
+                    wav = wavs[row][:, start_sample:lengths[row] * samples_per_frame]
+                    if writer is not None:
+                        audio_buffers[line_id] = wav
+                    if render_params.carry_prefix:
+                        prev_wav, prev_wav_line = wav, line_id
+
+                    speaker_line = speaker_queue[line_id]
+                    torchaudio.save(manifest.segment_path(line_id), wav, sampling_rate)
+                    manifest.record(
+                        line_id, line_hashes[line_id], speaker_line.content,
+                        voices[speaker_line.speaker_id], self.line_emotions(speaker_line), cfg_hash,
+                    )
+                # checkpoint after every batch so an interrupted render can resume
+                manifest.save()
+                logging.info(f"Completed voice over for podcast script lines: {batch} in {time.perf_counter()-start_t}s")
+                num_rendered += len(batch)
+                if job is not None:
+                    job.update(progress=num_rendered / len(speaker_queue), message=f"rendered {num_rendered} of {len(speaker_queue)} lines")
+
+                # eta from the lines rendered in this run, cached lines take no time
+                num_pending = len(speaker_queue) - num_rendered
+                rendered_now = num_rendered - len(cached_lines)
+                eta_s = None
+                if rendered_now > 0:
+                    eta_s = round((time.perf_counter() - render_start_t) / rendered_now * num_pending, 1)
+                self.publish_state(
+                    session, "line_rendered",
+                    line=batch[-1], num_rendered=num_rendered, num_lines=len(speaker_queue), eta_s=eta_s,
+                )
+
+                flush_lines()
+
+            if live and speaker_queue.failed:
+                logging.info("Script generation failed. Discarding the podcast audio!!")
+                manifest.save()
+                self.abort_final_audio(flags, audio_stream, writer)
+                self.publish_state(session, "render_cancelled")
                 return
 
-            wavs = self.model.autoencoder.decode(codes).cpu()
-            self.audio_buffers.append(wavs[0])
-            # if line_id > 0:
-            #     # overlap_slice_index = int((audio_overlap_duration_ms / 1000) * self.model.autoencoder.sampling_rate)
-            #     # self.audio_buffers.append(wavs[0][:, overlap_slice_index:])
-            # else:
-            #     self.audio_buffers.append(wavs[0])
-
-            audio_save_path = os.path.join(output_dir, f"seq_{line_id}.wav")
-            torchaudio.save(audio_save_path, wavs[0], self.model.autoencoder.sampling_rate)
-            # prefix_audio_path = audio_save_path
-            logging.info(f"Completed voice over for podcast script line: {line_id} in {time.perf_counter()-start_t}s")
-
-        final_audio= torch.cat(self.audio_buffers, dim=-1)
-        self.audio_buffers = [] # clear audio buffer
-        torchaudio.save(os.path.join(output_dir, "final.wav"), final_audio, self.model.autoencoder.sampling_rate)
-        logging.info(f"Saving the entire podcast to: {os.path.join(output_dir, 'final.wav')}")
-        self.flags["is_generating_podcast"] = False
-        self.flags["is_podcast_available"] = True
-
-        self.thread_queue.pop()
+            if live:
+                flush_lines()
+                manifest.truncate(len(speaker_queue))
+            if writer is not None:
+                writer.close()
+            else:
+                assemble_wav_mmap(
+                    [manifest.segment_path(line_id) for line_id in range(len(speaker_queue))],
+                    final_path,
+                    sampling_rate,
+                )
+            manifest.save()
+            logging.info(f"Saving the entire podcast to: {final_path}")
+            self.finish_audio_stream(flags, audio_stream, final_path)
+            flags["is_generating_podcast"] = False
+            flags["is_podcast_available"] = True
+            self.publish_state(session, "render_finished", num_lines=len(speaker_queue))
+        except BaseException as e:
+            render_error = str(e) or type(e).__name__
+            raise
+        finally:
+            # the finish and cancel paths reset the flag, it is only still set when the render failed
+            if flags["is_generating_podcast"]:
+                manifest.save()
+                self.abort_final_audio(flags, audio_stream, writer, error=render_error)
+                self.publish_state(session, "render_failed", error=render_error)
     
-    def run_in_thread(self, fn_name:str) -> bool:
+    def finish_audio_stream(self, flags:Dict, audio_stream:PodcastAudioStream = None, final_path:str = None, error:str = None):
+        """
+        close the live audio stream so streaming clients stop waiting for lines
+        """
+        if audio_stream is not None:
+            audio_stream.finish(final_path, error=error)
+        flags["is_podcast_streaming"] = False
+
+    def abort_final_audio(self, flags:Dict, audio_stream:PodcastAudioStream = None, writer:IncrementalWavWriter = None, error:str = None):
+        """
+        discard the partially assembled podcast audio after an interrupt or a failed render
+        """
+        self.finish_audio_stream(flags, audio_stream, error=error)
+        if writer is not None:
+            writer.abort()
+        flags["is_generating_podcast"] = False
+
+    def is_interrupted(self, flags:Dict, job:Job = None) -> bool:
+        """
+        check if the running generation was interrupted or its job cancelled
+        """
+        if flags["interupt_generation"]:
+            flags["interupt_generation"] = False
+            return True
+        return job is not None and job.cancelled
+
+    def submit_job(
+            self, 
+            session:PodcastSession, 
+            kind:str, 
+            on_script_ready:Callable = None, 
+            speaker_queue:Union[List[ScriptLine], LiveScript] = None,
+            force_regenerate:bool = False,
+        ) -> Optional[Job]:
+        """
+        queue a script or render job for a podcast session on the job scheduler.
+        the job works on a snapshot of the session state at submission time.
+
+        Args:
+            session (PodcastSession): podcast session
+            kind (str): "script" or "render"
+            on_script_ready (Callable, optional): called with (podcast_uuid, script lines) when a script job succeeds
+            speaker_queue (Union[List[ScriptLine], LiveScript], optional): script to render instead of the session script
+            force_regenerate (bool, optional): bypass the llm response cache of a script job
 
-        if len(self.thread_queue) > 0:
-            logging.info("Background threads running. Please stop other threads / processes !!")
-            return False
+        Returns:
+            Optional[Job]: queued job or None if the job could not be queued
+        """
+        podcast_uuid = session.podcast_uuid
 
-        if fn_name == "generate_podcast_script":
-            if self.chapters is None:
+        if kind == "script":
+            if session.chapters is None:
                 logging.info(f"Chapters not found!! Try adding chapters fist.")
-                return False
+                return None
             
-            thread = threading.Thread(
-                target=self.generate_podcast_script,
-                args=[self.chapters, self.curr_prompt, self.user_prompt, self.podcast_len, self.num_speakers,  self.llm_model_type],
-                daemon=True, 
-            )
+            args = [session.chapters, session.curr_prompt, session.user_prompt, session.podcast_len, session.num_speakers,  session.llm_model_type]
+            params = {"force_regenerate": force_regenerate}
+
+            def run(job:Job):
+                # start the voice over on the first line while the llm writes the rest
+                live_script = LiveScript() if self.config.render_params.render_while_scripting else None
+
+                def on_line(script_line:ScriptLine):
+                    live_script.append(script_line)
+                    if len(live_script) == 1:
+                        self.submit_job(session, "render", speaker_queue=live_script)
+
+                speaker_queue = None
+                try:
+                    speaker_queue = self.generate_podcast_script(
+                        *args, job=job, session=session, on_line=on_line if live_script is not None else None,
+                        force_regenerate=force_regenerate,
+                    )
+                finally:
+                    if live_script is not None:
+                        live_script.close(failed=speaker_queue is None or len(speaker_queue) == 0 or job.cancelled)
+
+                # a cancelled script is not saved
+                if job.cancelled:
+                    logging.info(f"Script job: {job.id} cancelled, discarding the script")
+                    session.flags["is_script_available"] = len(session.podcast_speaker_queue) > 0
+                    return
+                if speaker_queue is None:
+                    raise RuntimeError("Did not receive a response from LLM")
+
+                session.podcast_speaker_queue = ScriptStore.from_lines(speaker_queue)
+                if on_script_ready is not None:
+                    on_script_ready(podcast_uuid, session.podcast_speaker_queue)
         
-        elif fn_name == "generate_podcast":
-            if len(self.podcast_speaker_queue) == 0:
+        elif kind == "render":
+            if speaker_queue is None:
+                speaker_queue = list(session.podcast_speaker_queue)
+            if not isinstance(speaker_queue, LiveScript) and len(speaker_queue) == 0:
                 logging.info(f"No prodcast script in queue!! Did you generate the script ?")
-                return False
+                return None
 
-            output_dir = os.path.join("static", "audio_outputs", "podcast-"+str(self.curr_podcast_uuid))
+            output_dir = session.output_dir
             # output_dir = "outputs/" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             os.makedirs(output_dir, exist_ok=True)
-            
-            thread = threading.Thread(
-                target=self.generate_podcast,
-                args=[self.podcast_speaker_queue, output_dir],
-                daemon=True, 
-            )
+            voices = dict(session.voices)
+            # a live render is started again by its script job
+            params = {"live": isinstance(speaker_queue, LiveScript)}
+
+            def run(job:Job):
+                self.generate_podcast(speaker_queue, output_dir, voices=voices, job=job, session=session)
         
         else:
-            logging.info(f"Unknown function provided: {fn_name}")
-            return False
+            logging.info(f"Unknown job kind provided: {kind}")
+            return None
 
-        # start the thread and store it
-        self.thread_queue.append(thread)
-        thread.start()
-        return True
+        return self.scheduler.submit(kind, podcast_uuid, run, params)
 
-    def stop_all_threads(self):
-        active_threads = len(self.thread_queue)
-        if active_threads > 0:
-            logging.info(f"{active_threads} background threads running. Terminating all threads !!")
+    def resume_jobs(self, get_session:Callable, on_script_ready:Callable = None) -> int:
+        """
+        queue the jobs that were interrupted when the app stopped again.
+        renders continue from their manifest, script jobs start over.
 
-            for thread in self.thread_queue:
-                thread.join()
-                del thread           
-            
-        else:
-            logging.info(f"stop_threads : No background threads running. XD")
-                
-        return True if len(self.thread_queue) == 0 else False
+        Args:
+            get_session (Callable): returns the session of a podcast uuid or None if the podcast was deleted
+            on_script_ready (Callable, optional): passed on to resumed script jobs
+
+        Returns:
+            int: no. of resumed jobs
+        """
+        def resubmit(job:Job) -> Optional[Job]:
+            if job.kind == "voice":
+                if not Path(job.params["upload_path"]).exists():
+                    return None
+                return self.submit_voice_ingest(job.params["upload_path"], job.params["voice_path"])
+
+            session = get_session(job.podcast_uuid)
+            if session is None:
+                return None
+            if job.kind == "script":
+                return self.submit_job(
+                    session, "script", on_script_ready=on_script_ready,
+                    force_regenerate=job.params.get("force_regenerate", False),
+                )
+            # jobs are resumed oldest first, a resumed script job starts its live render itself
+            if job.params.get("live") and self.scheduler.active_job(job.podcast_uuid, "script") is not None:
+                return None
+            return self.submit_job(session, "render")
+
+        return self.scheduler.resume(resubmit)
+
+    def submit_voice_ingest(self, upload_path:str, voice_path:str) -> Optional[Job]:
+        """
+        queue the ingestion of an uploaded voice: normalize the audio into the voice library
+        and precompute its speaker embedding, so the first render with the voice does not pay for it.
+        the job is keyed by the voice filename.
+
+        Args:
+            upload_path (str): raw uploaded audio file, removed once the job finishes
+            voice_path (str): wav file of the voice in the custom voice directory
+
+        Returns:
+            Optional[Job]: queued job or None if the voice is already being ingested
+        """
+        voice_params = self.config.voice_params
+
+        def run(job:Job):
+            try:
+                job.update(0.1, "normalizing audio")
+                normalize_voice(upload_path, voice_path, voice_params)
+                self.voices.add(voice_path)
+                if job.cancelled:
+                    return
+
+                job.update(0.5, "computing speaker embedding")
+                self.get_speaker_embedding(str(voice_path), self.model, self.device)
+                job.update(1.0, "voice ready")
+            finally:
+                Path(upload_path).unlink(missing_ok=True)
+
+        params = {"upload_path": upload_path, "voice_path": voice_path}
+        return self.scheduler.submit("voice", Path(voice_path).name, run, params)
+
+    def cancel_job(self, job_id:str) -> bool:
+        return self.scheduler.cancel(job_id)
+
+    def stop_all_threads(self):
+        logging.info("Stopping job scheduler. Cancelling all queued and running jobs !!")
+        self.events.close()
+        self.voices.stop_watcher()
+        self.scheduler.shutdown(cancel=True)
+        self.llm_client.close()
+        return True
       
 
 if __name__ == "__main__":
@@ -516,14 +1139,13 @@ if __name__ == "__main__":
     open_pc = OpenPodCraft()
     
     # set voices
-    open_pc.set_voice(1, "zonos_americanmale")
-    open_pc.set_voice(2, "zonos_britishfemale")
+    voices = {1: "zonos_americanmale", 2: "zonos_britishfemale"}
 
     output_dir = "outputs/" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     os.makedirs(output_dir, exist_ok=True)
 
     # generate and process popcast script
-    open_pc.generate_podcast_script(chapters, prompt)
+    speaker_queue = open_pc.generate_podcast_script(chapters, prompt)
 
     # # generate podcast
-    open_pc.generate_podcast(open_pc.podcast_speaker_queue, output_dir=output_dir)
\ No newline at end of file
+    open_pc.generate_podcast(speaker_queue, output_dir=output_dir, voices=voices)
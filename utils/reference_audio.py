@@ -0,0 +1,101 @@
+import logging
+from typing import Tuple
+
+import torch
+import torchaudio
+
+
+def frame_energies_db(filepath: str, frame_ms: int = 30, block_s: float = 30.0) -> Tuple[torch.Tensor, int, int]:
+    """
+    per frame energy of an audio file. the file is read in blocks, so long clips are never
+    fully held in memory.
+
+    Args:
+        filepath (str): audio file
+        frame_ms (int, optional): analysis frame length. Defaults to 30.
+        block_s (float, optional): seconds read per block. Defaults to 30.0.
+
+    Returns:
+        Tuple[torch.Tensor, int, int]: frame energies in dB, frame length in samples, sample rate
+    """
+    info = torchaudio.info(filepath)
+    sample_rate = info.sample_rate
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    # whole frames per block, so frames never straddle two blocks
+    block_len = max(1, int(block_s * sample_rate) // frame_len) * frame_len
+
+    energies = []
+    frame_offset = 0
+    while True:
+        wav, _ = torchaudio.load(filepath, frame_offset=frame_offset, num_frames=block_len)
+        num_frames = wav.shape[-1] // frame_len
+        if num_frames > 0:
+            frames = wav.mean(dim=0)[:num_frames * frame_len].reshape(num_frames, frame_len)
+            energies.append(10 * torch.log10(frames.pow(2).mean(dim=1) + 1e-10))
+        if wav.shape[-1] < block_len:
+            break
+        frame_offset += block_len
+
+    energies = torch.cat(energies) if energies else torch.empty(0)
+    return energies, frame_len, sample_rate
+
+def voiced_frames(energies_db: torch.Tensor, margin_db: float = 10.0, dynamic_range_db: float = 40.0) -> torch.Tensor:
+    """
+    energy based voice activity: frames well above the noise floor of the clip.
+    the noise floor is the 10th percentile of the frame energies.
+    """
+    noise_floor_db = torch.quantile(energies_db, 0.1)
+    threshold_db = torch.maximum(noise_floor_db + margin_db, energies_db.max() - dynamic_range_db)
+    return energies_db > threshold_db
+
+def select_reference_window(filepath: str, window_s: float, frame_ms: int = 30) -> Tuple[int, int, int]:
+    """
+    pick the window of the clip with the most speech
+
+    Args:
+        filepath (str): voice file
+        window_s (float): length of the reference window in seconds
+        frame_ms (int, optional): voice activity frame length. Defaults to 30.
+
+    Returns:
+        Tuple[int, int, int]: start sample, no. of samples (-1 for the full clip), sample rate
+    """
+    energies_db, frame_len, sample_rate = frame_energies_db(filepath, frame_ms)
+    window_frames = int(window_s * sample_rate) // frame_len
+    if window_frames <= 0 or len(energies_db) <= window_frames:
+        return 0, -1, sample_rate
+
+    voiced = voiced_frames(energies_db).to(torch.float32)
+    # no. of voiced frames of every window, ties go to the louder window
+    voiced_counts = voiced.unfold(0, window_frames, 1).sum(dim=1)
+    window_energies = energies_db.unfold(0, window_frames, 1).mean(dim=1)
+    scores = voiced_counts + torch.sigmoid(window_energies / 10) # energy term < 1 frame
+    start_frame = int(torch.argmax(scores))
+    return start_frame * frame_len, window_frames * frame_len, sample_rate
+
+def load_reference_audio(filepath: str, window_s: float, frame_ms: int = 30) -> Tuple[torch.Tensor, int]:
+    """
+    load the best window_s seconds of a voice file for the speaker embedding. only the
+    selected window is decoded, clips shorter than the window are loaded whole.
+
+    Args:
+        filepath (str): voice file
+        window_s (float): length of the reference window in seconds, 0 loads the full clip
+        frame_ms (int, optional): voice activity frame length. Defaults to 30.
+
+    Returns:
+        Tuple[torch.Tensor, int]: audio, sample rate
+    """
+    if window_s <= 0:
+        return torchaudio.load(filepath)
+
+    try:
+        frame_offset, num_frames, _ = select_reference_window(filepath, window_s, frame_ms)
+    except Exception as e:
+        # e.g. formats without frame accurate seeking
+        logging.warning(f"Could not select a reference window of {filepath}, using the full clip: {e}")
+        return torchaudio.load(filepath)
+
+    if num_frames > 0:
+        logging.info(f"Reference window of {filepath}: {num_frames} samples from sample {frame_offset}")
+    return torchaudio.load(filepath, frame_offset=frame_offset, num_frames=num_frames)
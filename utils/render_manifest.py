@@ -0,0 +1,153 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from dataclasses import asdict
+from typing import Dict, List, Optional, Sequence, Set
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def config_hash(config) -> str:
+    """
+    hash of the config fields that change the rendered audio
+    """
+    data = asdict(config)
+    relevant = {
+        key: data[key] for key in (
+            "uncondition_toggles", "conditioning_params", "generation_params",
+            "language_code", "model_type", "speaker_noised_bool",
+        )
+    }
+    relevant["carry_prefix"] = data["render_params"]["carry_prefix"]
+    relevant["reference_window_s"] = data["voice_params"]["reference_window_s"]
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+def line_hash(content: str, voice_name: str, voice_hash: str, emotions: Sequence[float], cfg_hash: str, prev_hash: str = "") -> str:
+    """
+    hash of everything a rendered line depends on
+
+    Args:
+        content (str): line text
+        voice_name (str): voice assigned to the line
+        voice_hash (str): content hash of the voice file
+        emotions (Sequence[float]): emotion vector of the line
+        cfg_hash (str): config hash
+        prev_hash (str, optional): hash of the previous line, when the line audio depends on it. Defaults to "".
+
+    Returns:
+        str: line hash
+    """
+    payload = json.dumps([content, voice_name, voice_hash, [float(e) for e in emotions], cfg_hash, prev_hash])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RenderManifest:
+    """
+    record of the rendered seq_{id}.wav outputs of a podcast, stored next to them as manifest.json.
+    a line whose hash matches its manifest entry and whose output exists is not rendered again.
+    """
+
+    def __init__(self, output_dir: str, lines: Optional[List[Dict]] = None):
+        self.output_dir = output_dir
+        self.lines: List[Optional[Dict]] = lines if lines is not None else []
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.output_dir, MANIFEST_FILENAME)
+
+    @classmethod
+    def load(cls, output_dir: str) -> "RenderManifest":
+        path = os.path.join(output_dir, MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            return cls(output_dir)
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls(output_dir, data.get("lines", []))
+        except Exception as e:
+            logging.warning(f"Could not read render manifest {path}: {e}. Rendering all lines.")
+            return cls(output_dir)
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"lines": self.lines}, f)
+        os.replace(tmp_path, self.path)
+
+    def segment_path(self, line_id: int) -> str:
+        return os.path.join(self.output_dir, f"seq_{line_id}.wav")
+
+    def is_rendered(self, line_id: int, hash_value: str) -> bool:
+        if line_id >= len(self.lines) or self.lines[line_id] is None:
+            return False
+        return self.lines[line_id]["hash"] == hash_value and os.path.exists(self.segment_path(line_id))
+
+    def record(self, line_id: int, hash_value: str, content: str, voice_name: str, emotions: Sequence[float], cfg_hash: str) -> None:
+        while len(self.lines) <= line_id:
+            self.lines.append(None)
+
+        self.lines[line_id] = {
+            "index": line_id,
+            "hash": hash_value,
+            "content_hash": hashlib.sha256(content.encode()).hexdigest(),
+            "voice": voice_name,
+            "emotion": [float(e) for e in emotions],
+            "config_hash": cfg_hash,
+            "file": f"seq_{line_id}.wav",
+        }
+
+    def truncate(self, num_lines: int) -> None:
+        """
+        drop entries of lines that are no longer in the script
+        """
+        del self.lines[num_lines:]
+
+    def reconcile(self, hashes: List[str]) -> Set[int]:
+        """
+        match the lines of an edited script to the rendered lines by hash instead of position.
+        rendered outputs of lines that moved (e.g. after inserting or deleting a line) are
+        relocated to their new seq_{id}.wav, so only new or changed lines have to be rendered.
+
+        Args:
+            hashes (List[str]): line hashes of the new script, in script order
+
+        Returns:
+            Set[int]: ids of the lines that do not need to be rendered
+        """
+        rendered = set()
+        sources = {}
+        for line_id, entry in enumerate(self.lines):
+            if entry is not None and os.path.exists(self.segment_path(line_id)):
+                sources.setdefault(entry["hash"], line_id)
+
+        moves = {}
+        for line_id, hash_value in enumerate(hashes):
+            if self.is_rendered(line_id, hash_value):
+                rendered.add(line_id)
+            elif hash_value in sources:
+                moves[line_id] = sources[hash_value]
+        if len(moves) == 0:
+            return rendered
+
+        # copy every source first, a target file can be the source of another move
+        tmp_paths = {}
+        for src_id in set(moves.values()):
+            tmp_paths[src_id] = self.segment_path(src_id) + ".move"
+            shutil.copyfile(self.segment_path(src_id), tmp_paths[src_id])
+
+        entries = {src_id: dict(self.lines[src_id]) for src_id in tmp_paths}
+        for line_id, src_id in moves.items():
+            shutil.copyfile(tmp_paths[src_id], self.segment_path(line_id))
+            while len(self.lines) <= line_id:
+                self.lines.append(None)
+            self.lines[line_id] = dict(entries[src_id], index=line_id, file=f"seq_{line_id}.wav")
+            rendered.add(line_id)
+
+        for tmp_path in tmp_paths.values():
+            os.remove(tmp_path)
+
+        logging.info(f"Relocated {len(moves)} rendered lines to their new position in the script")
+        return rendered
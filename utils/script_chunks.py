@@ -0,0 +1,102 @@
+import re
+import math
+from typing import List
+
+
+def split_chapters(chapters: str, max_chars: int) -> List[str]:
+    """
+    split the chapters into sections of at most max_chars characters.
+    sections end at paragraph boundaries where possible, long paragraphs are split at sentences.
+
+    Args:
+        chapters (str): source text of the podcast
+        max_chars (int): max section size in characters, 0 disables splitting
+
+    Returns:
+        List[str]: sections in document order
+    """
+    chapters = chapters.strip()
+    if max_chars <= 0 or len(chapters) <= max_chars:
+        return [chapters]
+
+    units = []
+    for paragraph in re.split(r"\n\s*\n", chapters):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+
+        # a paragraph longer than a section is split into sentences, sentences into fixed size parts
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            units.extend(sentence[idx:idx + max_chars] for idx in range(0, len(sentence), max_chars))
+
+    sections = []
+    section = ""
+    for unit in units:
+        if section and len(section) + len(unit) + 2 > max_chars:
+            sections.append(section)
+            section = ""
+        section = f"{section}\n\n{unit}" if section else unit
+    if section:
+        sections.append(section)
+    return sections
+
+def section_minutes(sections: List[str], podcast_len: float, min_minutes: float = 0.5) -> List[float]:
+    """
+    share of the podcast duration of each section, proportional to its length. the shares are
+    split in steps of 0.1 minutes with the largest remainder method, so they add up to podcast_len.
+
+    Args:
+        sections (List[str]): chapter sections
+        podcast_len (float): podcast duration in minutes
+        min_minutes (float, optional): floor of every section, lowered when the podcast is too short for it. Defaults to 0.5.
+
+    Returns:
+        List[float]: minutes of each section
+    """
+    num_sections = len(sections)
+    total_units = max(0, round(podcast_len * 10))
+    min_units = min(round(min_minutes * 10), total_units // num_sections)
+    spare_units = total_units - min_units * num_sections
+
+    total_chars = sum(len(section) for section in sections)
+    shares = [
+        spare_units * len(section) / total_chars if total_chars > 0 else spare_units / num_sections
+        for section in sections
+    ]
+    units = [math.floor(share) for share in shares]
+    # the units lost to rounding down go to the sections with the largest remainders
+    by_remainder = sorted(range(num_sections), key=lambda idx: shares[idx] - units[idx], reverse=True)
+    for idx in by_remainder[:spare_units - sum(units)]:
+        units[idx] += 1
+    return [(min_units + unit) / 10 for unit in units]
+
+def section_hint(section_id: int, sections: List[str], num_speakers: int, preview_chars: int = 300) -> str:
+    """
+    continuity instructions for the script of a section, so the separately generated
+    sections read as a single conversation between the same speakers once stitched
+    """
+    num_sections = len(sections)
+    hints = [
+        f"This is part {section_id + 1} of {num_sections} of a single podcast episode, "
+        f"the parts are generated separately and joined in order.",
+        f"Keep the same {num_speakers} speakers with the same speaker ids and personalities in every part.",
+    ]
+
+    if section_id == 0:
+        hints.append("Start the episode with the introduction. Do not end the episode or say goodbye.")
+    elif section_id == num_sections - 1:
+        hints.append("Do not greet or introduce the podcast again, continue the ongoing conversation and end the episode.")
+    else:
+        hints.append("Do not greet, introduce or end the podcast, continue the ongoing conversation.")
+
+    if section_id > 0:
+        previous = sections[section_id - 1][-preview_chars:].strip()
+        hints.append(f"The previous part discussed: ...{previous}")
+    if section_id < num_sections - 1:
+        upcoming = sections[section_id + 1][:preview_chars].strip()
+        hints.append(f"The next part will discuss: {upcoming}... Do not cover it here.")
+
+    return "\n".join(hints)
@@ -0,0 +1,156 @@
+import re
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+# project imports
+from utils.script_store import ScriptRow, NUM_EMOTIONS, default_emotions, speaker_label
+
+# "Speaker {id}: Emotion: {Emotion Array}: context: {speaker content}" and the variations llms write:
+# markdown bullets and bold, numbered lists ("1. ", "2) "), "Speaker1", "SPEAKER_1", "[Speaker 1]",
+# "Host 1 (Alice)", missing emotion array, "Emotions=" / "content:" / "text:" labels and "-" instead
+# of ":" separators
+SCRIPT_LINE_PATTERN = re.compile(
+    r"""
+    ^[\s>*#\-]*(?:\d+[.)]\s*)?[\s*]*\[?\**
+    (?P<role>speaker|host|guest|spk)\s*[_#-]?\s*(?P<id>\d+)
+    \**\]?\s*(?:\([^)]*\))?\**\s*[:\-]\**\s*
+    (?:emotions?\s*[:=]?\s*\[(?P<emotions>[^\]]*)\]\s*[:,\-]?\s*)?
+    (?:(?:context|content|text)\s*[:=]\s*)?
+    (?P<content>.*?)\s*$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+# lines that start like a speaker line, malformed ones are reported instead of silently skipped
+SPEAKER_PREFIX_PATTERN = re.compile(r"^[\s>*#\-]*(?:\d+[.)]\s*)?[\s*]*\[?\**(?:speaker|host|guest|spk)\b", re.IGNORECASE)
+# a speaker with an id anywhere else in the line, e.g. "Line 3 - Speaker 1: .."
+SPEAKER_MENTION_PATTERN = re.compile(r"\b(?:speaker|host|guest|spk)\s*[_#-]?\s*\d+\b", re.IGNORECASE)
+
+
+@dataclass
+class ScriptParseError:
+    line_no: int
+    line: str
+    reason: str
+
+
+class ScriptParser:
+    """
+    single pass parser of podcast script lines, shared by the llm response and script files.
+
+    Every line is matched once against a precompiled pattern that extracts the speaker,
+    emotion array and content. Text can be fed incrementally (e.g. streamed llm tokens),
+    script lines are returned as soon as their line is complete. Lines that look like
+    speaker lines but can not be parsed are collected in errors.
+    """
+
+    def __init__(self, emotions: Optional[Sequence[float]] = None):
+        self.default_emotions = list(emotions) if emotions is not None else default_emotions()
+        self.errors: List[ScriptParseError] = []
+        self._buffer = ""
+        self._line_no = 0
+
+    def parse_line(self, line: str, line_no: int = 0) -> Optional[ScriptRow]:
+        """
+        parse a single line
+
+        Returns:
+            Optional[ScriptRow]: script line or None if the line is not a (valid) speaker line
+        """
+        match = SCRIPT_LINE_PATTERN.match(line)
+        if match is None:
+            if SPEAKER_PREFIX_PATTERN.match(line):
+                self._error(line_no, line, "speaker line without speaker id")
+            elif SPEAKER_MENTION_PATTERN.search(line):
+                self._error(line_no, line, "speaker not at the start of the line")
+            return None
+
+        content = match.group("content")
+        if not content:
+            self._error(line_no, line, "speaker line without content")
+            return None
+
+        emotions = self.default_emotions
+        emotions_str = match.group("emotions")
+        if emotions_str is not None:
+            try:
+                emotions = [float(value) for value in emotions_str.split(",")]
+            except ValueError:
+                self._error(line_no, line, f"invalid emotion array: [{emotions_str}]")
+                return None
+            if len(emotions) < NUM_EMOTIONS:
+                self._error(line_no, line, f"expected {NUM_EMOTIONS} emotion values, got {len(emotions)}")
+                return None
+
+        speaker_id = int(match.group("id"))
+        role = match.group("role").lower()
+        return ScriptRow(
+            # the label as written, "Host 1" stays "Host 1". "SPEAKER_1" and "spk1" become "Speaker 1"
+            speaker=speaker_label(speaker_id) if role in ("speaker", "spk") else f"{role.title()} {speaker_id}",
+            speaker_id=speaker_id,
+            content=content,
+            emotions_arr=emotions[:NUM_EMOTIONS],
+        )
+
+    def _error(self, line_no: int, line: str, reason: str) -> None:
+        self.errors.append(ScriptParseError(line_no, line, reason))
+        logging.info(f"Skipping script line {line_no}: {reason} ({line.strip()})")
+
+    def _parse_next(self, line: str) -> Optional[ScriptRow]:
+        line_no = self._line_no
+        self._line_no += 1
+        return self.parse_line(line, line_no) if line and not line.isspace() else None
+
+    def feed(self, text: str) -> List[ScriptRow]:
+        """
+        add a chunk of text
+
+        Returns:
+            List[ScriptRow]: script lines completed by this chunk
+        """
+        if "\n" not in text:
+            self._buffer += text
+            return []
+
+        *lines, self._buffer = (self._buffer + text).split("\n")
+        script_lines = []
+        for line in lines:
+            script_line = self._parse_next(line)
+            if script_line is not None:
+                script_lines.append(script_line)
+        return script_lines
+
+    def close(self) -> List[ScriptRow]:
+        """
+        parse the last line once the text is complete
+        """
+        line, self._buffer = self._buffer, ""
+        script_line = self._parse_next(line)
+        return [script_line] if script_line is not None else []
+
+
+def parse_script(text: str) -> Tuple[List[ScriptRow], List[ScriptParseError]]:
+    """
+    parse a complete script
+
+    Returns:
+        Tuple[List[ScriptRow], List[ScriptParseError]]: script lines, malformed lines
+    """
+    parser = ScriptParser()
+    script_lines = parser.feed(text) + parser.close()
+    return script_lines, parser.errors
+
+def process_podcast_script_from_llm(llm_response: str, queue: List[ScriptRow]) -> List[ScriptParseError]:
+    """
+    process the response from llm to extract the speaker and content for the podcast script
+    """
+    script_lines, errors = parse_script(llm_response)
+    queue.extend(script_lines)
+    return errors
+
+def process_script_from_txt(script_filepath: str, queue: List[ScriptRow]) -> List[ScriptParseError]:
+    """
+    process the script file to extract the speaker and content
+    """
+    with open(script_filepath, "r") as f:
+        return process_podcast_script_from_llm(f.read(), queue)
@@ -0,0 +1,230 @@
+import sys
+import json
+import uuid
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+# project imports
+from configs.default import DefaultEmotionParams
+
+NUM_EMOTIONS = 6 # [Happiness, Sadness, Disgust, Fear, Surprise, Anger]
+
+
+def default_emotions() -> List[float]:
+    emotion_params = DefaultEmotionParams()
+    return [
+        emotion_params.happiness, emotion_params.sadness, emotion_params.disgust,
+        emotion_params.fear, emotion_params.surprise, emotion_params.anger,
+    ]
+
+DEFAULT_EMOTIONS = tuple(default_emotions())
+
+
+class ScriptRow(NamedTuple):
+    """
+    read only view of a script line, has the same fields as ScriptLine without the validation
+    """
+    speaker: str
+    speaker_id: int
+    content: str
+    emotions_arr: List[float]
+
+
+def speaker_label(speaker_id: int) -> str:
+    return f"Speaker {speaker_id}"
+
+
+def normalize_emotions(emotions: Optional[Sequence[float]]) -> List[float]:
+    """
+    emotion vector of a line, missing emotions (e.g. in older transcripts) are filled with the defaults
+    """
+    emotions = [float(value) for value in list(emotions or [])[:NUM_EMOTIONS]]
+    return emotions + list(DEFAULT_EMOTIONS[len(emotions):])
+
+
+def row_to_dict(row: ScriptRow) -> Dict:
+    """
+    script line in the format stored in the database and served to the ui
+    """
+    return {
+        "speaker": row.speaker,
+        "speaker_id": row.speaker_id,
+        "content": row.content,
+        "emotion_arr": row.emotions_arr,
+    }
+
+
+class ScriptStore:
+    """
+    columnar podcast script.
+
+    Speaker ids and emotions are kept in flat typed arrays and the line contents in a single
+    string indexed by offsets. The speaker label of each line ("Speaker 1", "Host 1", ..) is
+    kept as written, as interned strings. Lines are read as ScriptRow tuples, and the json served to
+    the ui is built once per script version and then reused as bytes.
+    """
+
+    def __init__(self):
+        self._speaker_ids = array("l")
+        self._speakers: List[str] = []
+        self._emotions = array("d")
+        self._offsets = array("q", [0])
+        self._text_parts: List[str] = []
+        self._text: Optional[str] = ""
+        self._json: Optional[bytes] = None
+        self._lock = threading.Lock()
+        # the store id and version identify the script content for change tracking and etags
+        self.store_id = uuid.uuid4().hex
+        self.version = 0
+
+    @classmethod
+    def from_lines(cls, lines: Iterable) -> "ScriptStore":
+        """
+        build from ScriptLine like objects (speaker_id, content and emotions_arr attributes)
+        """
+        store = cls()
+        store.extend(lines)
+        return store
+
+    @classmethod
+    def from_dicts(cls, dict_lines: Optional[Iterable[Dict]]) -> "ScriptStore":
+        """
+        build from the json transcript stored in the database
+        """
+        store = cls()
+        for line in dict_lines or []:
+            store._append(int(line["speaker_id"]), line["content"], line.get("emotion_arr"), line.get("speaker"))
+        store._changed()
+        return store
+
+    def __len__(self) -> int:
+        return len(self._speaker_ids)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.store_id}-{self.version}"'
+
+    def _get_text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._text_parts)
+            self._text_parts = [self._text]
+        return self._text
+
+    def _row(self, idx: int) -> ScriptRow:
+        speaker_id = self._speaker_ids[idx]
+        return ScriptRow(
+            speaker=self._speakers[idx],
+            speaker_id=speaker_id,
+            content=self._get_text()[self._offsets[idx]:self._offsets[idx + 1]],
+            emotions_arr=self._emotions[idx * NUM_EMOTIONS:(idx + 1) * NUM_EMOTIONS].tolist(),
+        )
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._row(row_idx) for row_idx in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("script line index out of range")
+        return self._row(idx)
+
+    def __iter__(self) -> Iterator[ScriptRow]:
+        for idx in range(len(self)):
+            yield self._row(idx)
+
+    @staticmethod
+    def _emotion_values(emotions: Optional[Sequence[float]]) -> array:
+        return array("d", normalize_emotions(emotions))
+
+    @staticmethod
+    def _speaker(speaker: Optional[str], speaker_id: int) -> str:
+        return sys.intern(speaker) if speaker else speaker_label(speaker_id)
+
+    def _append(self, speaker_id: int, content: str, emotions: Optional[Sequence[float]], speaker: Optional[str] = None) -> None:
+        self._speaker_ids.append(speaker_id)
+        self._speakers.append(self._speaker(speaker, speaker_id))
+        self._emotions.extend(self._emotion_values(emotions))
+        self._text_parts.append(content)
+        self._text = None
+        self._offsets.append(self._offsets[-1] + len(content))
+
+    def _insert(self, idx: int, speaker_id: int, content: str, emotions: Optional[Sequence[float]], speaker: Optional[str] = None) -> None:
+        text = self._get_text()
+        start = self._offsets[idx]
+        self._text = text[:start] + content + text[start:]
+        self._text_parts = [self._text]
+        self._offsets = self._offsets[:idx + 1] + array("q", [start + len(content)]) + array(
+            "q", (offset + len(content) for offset in self._offsets[idx + 1:])
+        )
+        self._speaker_ids.insert(idx, speaker_id)
+        self._speakers.insert(idx, self._speaker(speaker, speaker_id))
+        self._emotions[idx * NUM_EMOTIONS:idx * NUM_EMOTIONS] = self._emotion_values(emotions)
+
+    def _delete(self, idx: int) -> None:
+        text = self._get_text()
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        self._text = text[:start] + text[end:]
+        self._text_parts = [self._text]
+        self._offsets = self._offsets[:idx + 1] + array(
+            "q", (offset - (end - start) for offset in self._offsets[idx + 2:])
+        )
+        del self._speaker_ids[idx]
+        del self._speakers[idx]
+        del self._emotions[idx * NUM_EMOTIONS:(idx + 1) * NUM_EMOTIONS]
+
+    def _check_index(self, idx: int, allow_end: bool = False) -> None:
+        if not 0 <= idx < len(self) + allow_end:
+            raise IndexError("script line index out of range")
+
+    def _changed(self) -> None:
+        self._json = None
+        self.version += 1
+
+    def append(self, line) -> None:
+        with self._lock:
+            self._append(line.speaker_id, line.content, line.emotions_arr, line.speaker)
+            self._changed()
+
+    def extend(self, lines: Iterable) -> None:
+        with self._lock:
+            for line in lines:
+                self._append(line.speaker_id, line.content, line.emotions_arr, line.speaker)
+            self._changed()
+
+    def insert(self, idx: int, line) -> None:
+        """
+        insert a line before line idx, idx = len(store) appends
+        """
+        with self._lock:
+            self._check_index(idx, allow_end=True)
+            self._insert(idx, line.speaker_id, line.content, line.emotions_arr, line.speaker)
+            self._changed()
+
+    def update(self, idx: int, line) -> None:
+        with self._lock:
+            self._check_index(idx)
+            self._delete(idx)
+            self._insert(idx, line.speaker_id, line.content, line.emotions_arr, line.speaker)
+            self._changed()
+
+    def delete(self, idx: int) -> None:
+        with self._lock:
+            self._check_index(idx)
+            self._delete(idx)
+            self._changed()
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        transcript in the format stored in the database and served to the ui
+        """
+        return [row_to_dict(row) for row in self]
+
+    def to_json(self) -> bytes:
+        """
+        json encoded transcript, cached until the script changes
+        """
+        with self._lock:
+            if self._json is None:
+                self._json = json.dumps(self.to_dicts()).encode()
+            return self._json
@@ -0,0 +1,217 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+# project imports
+from utils.script_store import ScriptStore
+
+# TODO: imeplement gui to change this
+DEFAULT_VOICES = {
+    1: "zonos_britishmale_amped",
+    2: "zonos_britishfemale",
+}
+
+def default_flags() -> Dict[str, bool]:
+    return {
+        "is_generating_script": False,
+        "is_script_available": False,
+        "is_generating_podcast": False,
+        "is_podcast_available": False,
+        "is_podcast_streaming": False,
+        "interupt_generation": False
+    }
+
+
+class PodcastSession:
+    """
+    lightweight editing and render state of a single podcast.
+    the heavy resources (tts model, caches, job workers) live on the shared OpenPodCraft engine.
+    """
+
+    def __init__(self, podcast_uuid: str, prompt: Dict):
+        self.podcast_uuid = str(podcast_uuid)
+        self.chapters = None
+        self.podcast_speaker_queue = ScriptStore()
+        # version of the script last written to the database
+        self.saved_script_version = self.script_version
+        self.voices: Dict[int, str] = {}
+        self.flags = default_flags()
+
+        self.curr_prompt = prompt
+        self.user_prompt = None
+        self.num_speakers = 2
+        self.podcast_len = 10 # mins
+        self.llm_model_type = "google/gemini-2.0-flash-thinking-exp:free" #"deepseek/deepseek-chat:free" #"deepseek/deepseek-r1:free"
+
+        self.audio_stream = None
+        self.last_access = time.monotonic()
+
+    @property
+    def output_dir(self) -> str:
+        return os.path.join("static", "audio_outputs", "podcast-" + self.podcast_uuid)
+
+    @property
+    def final_audio_path(self) -> str:
+        return os.path.join(self.output_dir, "final.wav")
+
+    @property
+    def is_busy(self) -> bool:
+        return self.flags["is_generating_script"] or self.flags["is_generating_podcast"]
+
+    @property
+    def script_version(self) -> Tuple[str, int]:
+        return self.podcast_speaker_queue.store_id, self.podcast_speaker_queue.version
+
+    @property
+    def is_script_dirty(self) -> bool:
+        return self.saved_script_version != self.script_version
+
+    def mark_script_saved(self, version: Tuple[str, int]) -> None:
+        self.saved_script_version = version
+
+    def touch(self) -> None:
+        self.last_access = time.monotonic()
+
+    def set_voice(self, speaker_id:int, voice_name:str, available_voices:Dict):
+
+        if not isinstance(speaker_id, int):
+            raise ValueError(f"Speaker ID must be of type int but provided {type(speaker_id)}")
+
+        if not voice_name in available_voices:
+            raise ValueError(f"{voice_name} voice not found!!")
+
+        self.voices[speaker_id] = voice_name
+
+    def get_podcast_script_as_dict(self) -> List[Dict]:
+        return self.podcast_speaker_queue.to_dicts()
+
+    def get_podcast_script_json(self) -> bytes:
+        return self.podcast_speaker_queue.to_json()
+
+    def set_podcast_script_from_dict(self, dict_script_queue:List[Dict]) -> None:
+
+        if dict_script_queue is not None and len(dict_script_queue) > 0:
+            self.podcast_speaker_queue = ScriptStore.from_dicts(dict_script_queue)
+            self.flags["is_script_available"]  = True
+
+
+class SessionRegistry:
+    """
+    bounded registry of podcast sessions with idle eviction.
+
+    Sessions are created on first access through the loader (which restores them from
+    the database) and evicted when idle for longer than idle_timeout_s or when the
+    registry is full. Sessions that are busy rendering or scripting are never evicted.
+    """
+
+    def __init__(
+            self,
+            loader: Callable[[str], Optional[PodcastSession]],
+            max_sessions: int = 64,
+            idle_timeout_s: float = 1800.0,
+            in_use: Callable[[PodcastSession], bool] = None,
+        ):
+        self.loader = loader
+        self.max_sessions = max_sessions
+        self.idle_timeout_s = idle_timeout_s
+        self.in_use = in_use
+
+        self._sessions: "OrderedDict[str, PodcastSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictor: Optional[threading.Thread] = None
+        self._stop_evictor = threading.Event()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _is_in_use(self, session: PodcastSession) -> bool:
+        return session.is_busy or (self.in_use is not None and self.in_use(session))
+
+    def peek(self, podcast_uuid: str) -> Optional[PodcastSession]:
+        """
+        get a loaded session without creating it or refreshing its access time
+        """
+        with self._lock:
+            return self._sessions.get(str(podcast_uuid))
+
+    def get(self, podcast_uuid: str) -> Optional[PodcastSession]:
+        """
+        get the session of a podcast, loading it if needed
+
+        Returns:
+            Optional[PodcastSession]: session or None if the podcast does not exist
+        """
+        podcast_uuid = str(podcast_uuid)
+        with self._lock:
+            session = self._sessions.get(podcast_uuid)
+            if session is not None:
+                self._sessions.move_to_end(podcast_uuid)
+                session.touch()
+                return session
+
+        session = self.loader(podcast_uuid)
+        if session is None:
+            return None
+
+        with self._lock:
+            # another request may have loaded the session in the meantime
+            session = self._sessions.setdefault(podcast_uuid, session)
+            self._sessions.move_to_end(podcast_uuid)
+            session.touch()
+            self._evict_locked()
+        return session
+
+    def remove(self, podcast_uuid: str) -> None:
+        with self._lock:
+            self._sessions.pop(str(podcast_uuid), None)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_locked()
+
+    def start_evictor(self, interval_s: float) -> None:
+        """
+        evict idle sessions periodically, a quiet server loads no new sessions that would trigger it
+        """
+        if self._evictor is not None or interval_s <= 0:
+            return
+
+        def evict():
+            while not self._stop_evictor.wait(interval_s):
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    logging.warning(f"Session eviction failed: {e}")
+
+        self._evictor = threading.Thread(target=evict, name="session-evictor", daemon=True)
+        self._evictor.start()
+
+    def stop_evictor(self) -> None:
+        self._stop_evictor.set()
+        if self._evictor is not None:
+            self._evictor.join(timeout=5)
+            self._evictor = None
+
+    def _evict_locked(self) -> int:
+        now = time.monotonic()
+        evicted = 0
+        for podcast_uuid, session in list(self._sessions.items()):
+            if now - session.last_access > self.idle_timeout_s and not self._is_in_use(session):
+                del self._sessions[podcast_uuid]
+                evicted += 1
+
+        # least recently used sessions first
+        for podcast_uuid, session in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if not self._is_in_use(session):
+                del self._sessions[podcast_uuid]
+                evicted += 1
+
+        if evicted > 0:
+            logging.info(f"Evicted {evicted} podcast sessions. {len(self._sessions)} sessions loaded")
+        return evicted
@@ -1,12 +1,10 @@
-from pathlib import Path
 from pydantic import BaseModel
 import re
-import ast
 import logging
 from datetime import datetime
 import yaml
 
-from typing import List, Dict
+from typing import List
 
 class ScriptLine(BaseModel):
     speaker: str
@@ -15,111 +13,6 @@ class ScriptLine(BaseModel):
     emotions_arr: List = []
 
 
-def process_podcast_script_from_llm(llm_response: str, queue: list[ScriptLine]) -> None:
-    """
-    process the response from llm to extract the speaker and content for the podcast script
-    """
-
-    llm_response_list = llm_response.split("\n")
-    print(llm_response_list)
-    
-    speaker_pattern = r"Speaker\s+(\d+):"
-    emotion_pattern = r"Emotion:\s*(\[[^\]]+\])"
-    context_pattern = r"context:\s*(.+)"
-
-    for line_id, line in enumerate(llm_response_list):
-        if not line:
-            continue
-        
-        try:
-            # Extract speaker ID
-            speaker_match = re.search(speaker_pattern, line)
-            speaker_id = speaker_match.group(1) if speaker_match else None
-
-            # Extract emotion list string and convert it to an actual Python list
-            emotion_match = re.search(emotion_pattern, line)
-            if emotion_match:
-                emotion_list_str = emotion_match.group(1)
-                # Safely evaluate the list string to a Python list
-                emotion_list = ast.literal_eval(emotion_list_str)
-            else:
-                emotion_list = None
-
-            # Extract context
-            context_match = re.search(context_pattern, line)
-            context = context_match.group(1).strip() if context_match else None
-            
-            # TODO: make it robust to script speaker name variations
-            # for now should do the work
-            # check if the line contains a colon to separate speaker ID and content
-            if speaker_id is not None or context is not None:
-                queue.append(
-                    ScriptLine(
-                        speaker=f"Speaker {speaker_id}", 
-                        speaker_id=int(speaker_id), 
-                        content=context.strip(),
-                        emotions_arr=emotion_list,
-                    )
-                )
-        except:
-            logging.info(f"Error processing script line: {line_id} with content: {line} !!")
-            logging.info(f"Skipping line {line_id} processing!!")
-            continue
-
-def process_script_from_txt(script_filepath: str, queue: list[ScriptLine], speaker_match_expr:str = r"Speaker\s+(\S+)") -> None:
-    """
-    process the script file to extract the speaker and content
-    """
-    # load the script file
-    with open(script_filepath, "r") as f:
-        script_lines = f.readlines()
-    
-    speaker_pattern = r"Speaker\s+(\d+):"
-    emotion_pattern = r"Emotion:\s*(\[[^\]]+\])"
-    context_pattern = r"context:\s*(.+)"
-
-    for line in script_lines:
-        if not line:
-            continue
-
-        # Extract speaker ID
-        speaker_match = re.search(speaker_pattern, line)
-        speaker_id = speaker_match.group(1) if speaker_match else None
-
-        # Extract emotion list string and convert it to an actual Python list
-        emotion_match = re.search(emotion_pattern, line)
-        if emotion_match:
-            emotion_list_str = emotion_match.group(1)
-            # Safely evaluate the list string to a Python list
-            emotion_list = ast.literal_eval(emotion_list_str)
-        else:
-            emotion_list = None
-
-        # Extract context
-        context_match = re.search(context_pattern, line)
-        context = context_match.group(1).strip() if context_match else None
-        
-        # check if the line contains a colon to separate speaker ID and content
-        if speaker_id is not None or context is not None:
-            queue.append(
-                ScriptLine(
-                    speaker=f"Speaker {speaker_id}", 
-                    speaker_id=int(speaker_id), 
-                    content=context.strip(),
-                    emotions_arr=emotion_list,
-                )
-            )
-
-def check_available_voices(dirs_path: List[str]):
-    voices = {}
-    for dir in dirs_path:
-        directory = Path(dir)
-        if directory.exists():
-            for file in directory.iterdir():
-                if file.is_file() and file.suffix.lower() in [".wav", ".mp3"]:
-                    voices[file.stem] = str(file)     
-    return voices
-
 def get_speaker_id(text:str, match_expr:str = r"Speaker\s+(\S+)"):
     match = re.match(match_expr, text)
     if match:
@@ -182,27 +75,3 @@ def load_prompts(filename:str = "assets/prompts.yaml"):
     with open(filename, "r") as file:
         prompts = yaml.safe_load(file)
     return prompts
-
-def get_wav_files(directory: Path) -> List[Dict[str, str]]:
-    """
-    Retrieve all .wav files from the specified directory.
-
-    Args:
-        directory (Path): The directory path to search for .wav files.
-
-    Returns:
-        List[Dict[str, str]]: A list of dictionaries where each dictionary contains:
-            - "filename": the base name of the file (without extension)
-            - "filepath": the full path to the file as a string.
-    """
-    if not directory.exists() or not directory.is_dir():
-        return []
-
-    return [
-        {
-            "filename": file.stem,
-            "filepath": str(file)
-        }
-        for file in directory.iterdir()
-        if file.is_file() and file.suffix.lower() == ".wav"
-    ]
\ No newline at end of file
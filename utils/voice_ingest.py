@@ -0,0 +1,58 @@
+import os
+import logging
+from pathlib import Path
+
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence
+
+# project imports
+from configs.default import DefaultVoiceParams
+
+
+def trim_silence(audio: AudioSegment, silence_thresh_db: float) -> AudioSegment:
+    """
+    strip the leading and trailing silence of a recording
+    """
+    start_ms = detect_leading_silence(audio, silence_threshold=silence_thresh_db)
+    end_ms = detect_leading_silence(audio.reverse(), silence_threshold=silence_thresh_db)
+    if start_ms + end_ms >= len(audio):
+        return audio
+    return audio[start_ms:len(audio) - end_ms]
+
+def normalize_voice(src_path: str, dst_path: str, params: DefaultVoiceParams) -> float:
+    """
+    convert an uploaded recording into a reference voice: decoded from any format ffmpeg
+    reads, mono, resampled, silence trimmed, loudness normalized and capped to the
+    reference length. the wav is written to a temp file and moved into place so the
+    voice index never sees a partial file.
+
+    Args:
+        src_path (str): uploaded audio file
+        dst_path (str): wav file of the voice
+        params (DefaultVoiceParams): voice params
+
+    Returns:
+        float: duration of the voice in seconds
+    """
+    try:
+        audio = AudioSegment.from_file(src_path)
+    except Exception as e:
+        raise ValueError(f"Unsupported or invalid audio format: {e}")
+
+    audio = audio.set_channels(1).set_frame_rate(params.sample_rate)
+    audio = trim_silence(audio, params.silence_thresh_db)
+    if len(audio) < params.min_duration_s * 1000:
+        raise ValueError(f"Voice recording is too short: {len(audio) / 1000:.1f}s, at least {params.min_duration_s}s of speech is needed")
+    audio = audio[:int(params.max_duration_s * 1000)]
+    # a silent recording has -inf dBFS
+    if audio.dBFS != float("-inf"):
+        audio = audio.apply_gain(params.loudness_dbfs - audio.dBFS)
+
+    dst_path = Path(dst_path)
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst_path.with_name(f".{dst_path.name}.tmp")
+    audio.export(tmp_path, format="wav")
+    os.replace(tmp_path, dst_path)
+
+    logging.info(f"Normalized voice: {dst_path} ({len(audio) / 1000:.1f}s, {params.sample_rate}Hz mono)")
+    return len(audio) / 1000
@@ -0,0 +1,253 @@
+import os
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import torchaudio
+
+# project imports
+from utils.embedding_cache import SpeakerEmbeddingCache, hash_file_content
+
+VOICE_SUFFIXES = (".wav", ".mp3")
+
+
+@dataclass
+class VoiceInfo:
+    name: str
+    filepath: str
+    voice_dir: str
+    size: int
+    mtime: float
+    content_hash: str
+    duration_s: Optional[float] = None
+    sample_rate: Optional[int] = None
+    num_channels: Optional[int] = None
+    has_embedding: bool = False
+
+
+def normalize_path(filepath) -> str:
+    return os.path.normpath(str(filepath))
+
+
+class VoiceRegistry(Mapping):
+    """
+    in-memory index of the voice library, maps voice names to their filepaths.
+
+    The voice directories are scanned once and the metadata of each voice (duration,
+    sample rate, content hash, embedding cache status) is kept in memory. Uploads and
+    deletes update the index incrementally, an optional polling watcher picks up files
+    changed outside the app. A rescan only reads the files whose size or mtime changed.
+    When two directories contain a voice with the same name the later directory wins.
+    """
+
+    def __init__(self, voice_dirs: List[str], embedding_cache: Optional[SpeakerEmbeddingCache] = None):
+        self.voice_dirs = [normalize_path(voice_dir) for voice_dir in voice_dirs]
+        self.embedding_cache = embedding_cache
+
+        self._by_path: Dict[str, VoiceInfo] = {}
+        self._by_name: Dict[str, VoiceInfo] = {}
+        self._dir_mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watcher = threading.Event()
+
+        self.scan()
+
+    # mapping of voice name -> filepath, a drop-in for the old available_voices dict
+    def __getitem__(self, name: str) -> str:
+        return self._by_name[name].filepath
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._by_name))
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._by_name
+
+    def info(self, name: str) -> Optional[VoiceInfo]:
+        return self._by_name.get(name)
+
+    def _dir_of(self, filepath: str) -> Optional[str]:
+        voice_dir = os.path.dirname(filepath)
+        return voice_dir if voice_dir in self.voice_dirs else None
+
+    def _read_info(self, filepath: str, stat: os.stat_result) -> VoiceInfo:
+        if self.embedding_cache is not None:
+            # shares the (mtime, size) hash memo with the embedding cache
+            content_hash = self.embedding_cache.content_hash(filepath)
+        else:
+            content_hash = hash_file_content(filepath)
+
+        voice = VoiceInfo(
+            name=Path(filepath).stem,
+            filepath=filepath,
+            voice_dir=self._dir_of(filepath),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            content_hash=content_hash,
+        )
+        try:
+            audio_info = torchaudio.info(filepath)
+            voice.sample_rate = audio_info.sample_rate
+            voice.num_channels = audio_info.num_channels
+            if audio_info.num_frames > 0:
+                voice.duration_s = audio_info.num_frames / audio_info.sample_rate
+        except Exception as e:
+            logging.warning(f"Could not read audio info of voice: {filepath}: {e}")
+
+        if self.embedding_cache is not None:
+            voice.has_embedding = self.embedding_cache.is_cached(content_hash)
+        return voice
+
+    def _index_file(self, filepath: str) -> Optional[VoiceInfo]:
+        """
+        (re)index a voice file, the metadata is only read again when the file changed
+        """
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            voice = self._by_path.get(filepath)
+        if voice is not None and voice.mtime == stat.st_mtime and voice.size == stat.st_size:
+            return voice
+
+        voice = self._read_info(filepath, stat)
+        with self._lock:
+            self._by_path[filepath] = voice
+        return voice
+
+    def _rebuild_names(self) -> None:
+        dir_order = {voice_dir: idx for idx, voice_dir in enumerate(self.voice_dirs)}
+        voices = sorted(self._by_path.values(), key=lambda voice: dir_order[voice.voice_dir])
+        self._by_name = {voice.name: voice for voice in voices}
+
+    def _scan_dir(self, voice_dir: str) -> None:
+        directory = Path(voice_dir)
+        filepaths = set()
+        if directory.is_dir():
+            self._dir_mtimes[voice_dir] = directory.stat().st_mtime
+            for file in directory.iterdir():
+                if file.suffix.lower() in VOICE_SUFFIXES and file.is_file():
+                    filepaths.add(normalize_path(file))
+        else:
+            self._dir_mtimes.pop(voice_dir, None)
+
+        for filepath in filepaths:
+            self._index_file(filepath)
+        with self._lock:
+            for filepath in [path for path, voice in self._by_path.items() if voice.voice_dir == voice_dir]:
+                if filepath not in filepaths:
+                    del self._by_path[filepath]
+            self._rebuild_names()
+
+    def scan(self) -> None:
+        """
+        index all voice directories
+        """
+        for voice_dir in self.voice_dirs:
+            self._scan_dir(voice_dir)
+        logging.info(f"Indexed {len(self)} voices in {self.voice_dirs}")
+
+    def add(self, filepath) -> Optional[VoiceInfo]:
+        """
+        index a new or changed voice file. called after a voice upload.
+        """
+        filepath = normalize_path(filepath)
+        if self._dir_of(filepath) is None:
+            logging.warning(f"Voice file: {filepath} is not in a voice directory")
+            return None
+
+        with self._lock:
+            self._by_path.pop(filepath, None) # force reading the metadata again
+        voice = self._index_file(filepath)
+        with self._lock:
+            self._rebuild_names()
+        return voice
+
+    def remove(self, filepath) -> bool:
+        """
+        drop a voice file from the index. called after a voice is deleted.
+        """
+        filepath = normalize_path(filepath)
+        with self._lock:
+            removed = self._by_path.pop(filepath, None) is not None
+            self._rebuild_names()
+        return removed
+
+    def mark_embedded(self, filepath) -> None:
+        """
+        record that the speaker embedding of a voice is in the embedding cache
+        """
+        with self._lock:
+            voice = self._by_path.get(normalize_path(filepath))
+            if voice is not None:
+                voice.has_embedding = True
+
+    def list_voices(self, voice_dir: Optional[str] = None, suffixes: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        voices of the library, or of a single voice directory, sorted by name.
+        suffixes limits the listing to those file types, e.g. (".wav",)
+
+        Returns:
+            List[Dict]: voice metadata with "filename" (voice name) and "filepath" keys
+        """
+        voice_dir = normalize_path(voice_dir) if voice_dir is not None else None
+        with self._lock:
+            voices = [
+                voice for voice in self._by_path.values()
+                if (voice_dir is None or voice.voice_dir == voice_dir)
+                and (suffixes is None or Path(voice.filepath).suffix.lower() in suffixes)
+            ]
+        return [
+            {"filename": voice.name, **asdict(voice)}
+            for voice in sorted(voices, key=lambda voice: voice.name)
+        ]
+
+    def poll(self) -> bool:
+        """
+        rescan the directories whose entries changed since the last scan
+
+        Returns:
+            bool: True if a directory was rescanned
+        """
+        changed = False
+        for voice_dir in self.voice_dirs:
+            try:
+                mtime = os.stat(voice_dir).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime != self._dir_mtimes.get(voice_dir):
+                logging.info(f"Voice directory changed, rescanning: {voice_dir}")
+                self._scan_dir(voice_dir)
+                changed = True
+        return changed
+
+    def start_watcher(self, interval_s: float) -> None:
+        """
+        poll the voice directories for files added or removed outside the app
+        """
+        if self._watcher is not None or interval_s <= 0:
+            return
+
+        def watch():
+            while not self._stop_watcher.wait(interval_s):
+                try:
+                    self.poll()
+                except Exception as e:
+                    logging.warning(f"Voice directory watcher failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="voice-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop_watcher.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
@@ -0,0 +1,97 @@
+import os
+import logging
+from typing import List
+
+import numpy as np
+import torch
+import torchaudio
+
+from utils.audio_stream import wav_header, wav_to_pcm16
+
+WAV_HEADER_SIZE = 44
+
+
+class IncrementalWavWriter:
+    """
+    writes a 16 bit PCM wav file line by line.
+
+    Audio is appended to `<filepath>.partial` as it is rendered and the RIFF header is
+    fixed up on close, when the partial file is moved to its final location. Only the
+    line being written is held in memory.
+    """
+
+    def __init__(self, filepath: str, sampling_rate: int, num_channels: int = 1):
+        self.filepath = filepath
+        self.partial_path = filepath + ".partial"
+        self.sampling_rate = sampling_rate
+        self.num_channels = num_channels
+        self.data_size = 0
+
+        self._file = open(self.partial_path, "wb")
+        self._file.write(wav_header(sampling_rate, num_channels))
+
+    def write(self, wav: torch.Tensor) -> int:
+        """
+        append a waveform [channels, samples] to the file
+
+        Returns:
+            int: no. of PCM bytes written
+        """
+        pcm = wav_to_pcm16(wav)
+        self._file.write(pcm)
+        self._file.flush()
+        self.data_size += len(pcm)
+        return len(pcm)
+
+    def close(self) -> None:
+        """
+        fix up the RIFF header and move the file to its final location
+        """
+        self._file.seek(0)
+        self._file.write(wav_header(self.sampling_rate, self.num_channels, data_size=self.data_size))
+        self._file.close()
+        os.replace(self.partial_path, self.filepath)
+
+    def abort(self) -> None:
+        """
+        discard the partially written file
+        """
+        self._file.close()
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+
+
+def assemble_wav_mmap(segment_paths: List[str], filepath: str, sampling_rate: int, num_channels: int = 1) -> None:
+    """
+    assemble wav segments into one 16 bit PCM wav file through a memory map.
+    segments are loaded one at a time so peak memory is bounded by the longest segment.
+
+    Args:
+        segment_paths (List[str]): paths of the wav segments in playback order
+        filepath (str): path of the assembled wav file
+        sampling_rate (int): sampling rate of the segments
+        num_channels (int, optional): no. of channels. Defaults to 1.
+    """
+    num_frames = [torchaudio.info(path).num_frames for path in segment_paths]
+    total_frames = sum(num_frames)
+    data_size = total_frames * num_channels * 2
+
+    partial_path = filepath + ".partial"
+    with open(partial_path, "wb") as f:
+        f.write(wav_header(sampling_rate, num_channels, data_size=data_size))
+        f.truncate(WAV_HEADER_SIZE + data_size)
+
+    if total_frames > 0:
+        pcm = np.memmap(partial_path, dtype="<i2", mode="r+", offset=WAV_HEADER_SIZE, shape=(total_frames, num_channels))
+        offset = 0
+        for path, frames in zip(segment_paths, num_frames):
+            wav, sr = torchaudio.load(path)
+            if sr != sampling_rate:
+                raise ValueError(f"Segment {path} has sampling rate {sr}, expected {sampling_rate}")
+            pcm[offset:offset + frames] = (wav.clamp(-1.0, 1.0) * 32767.0).to(torch.int16).t().numpy()
+            offset += frames
+        pcm.flush()
+        del pcm
+
+    os.replace(partial_path, filepath)
+    logging.info(f"Assembled {len(segment_paths)} segments into: {filepath}")